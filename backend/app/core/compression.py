@@ -0,0 +1,169 @@
+"""
+Response Compression
+
+Responsibility: gzip and brotli Content-Encoding for API responses.
+
+- CompressionMiddleware compresses complete responses at or above a size
+  threshold whose Content-Type is on an allowlist, at cheap per-request
+  levels. Streamed responses and responses that already carry a
+  Content-Encoding pass through untouched.
+- Content served from the snapshot is compressed ahead of time at the
+  highest levels (see responses.Encoded), so compression CPU is paid once
+  per content version; the middleware skips those responses.
+
+Brotli is preferred over gzip when the client accepts both. Whichever
+path sets Content-Encoding also gives the response's ETag an encoding
+suffix (encoded_etag); uncompressed responses keep the plain ETag.
+"""
+
+import gzip
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+GZIP = "gzip"
+BROTLI = "br"
+ENCODINGS = (BROTLI, GZIP)  # Preference order
+
+# Content types worth compressing; everything else (images, already
+# compressed formats) is sent as-is
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-msgpack",
+    "text/",
+)
+
+# Levels for bodies compressed once ahead of time, where size matters more
+# than CPU
+PRECOMPRESS_LEVELS = {BROTLI: 11, GZIP: 9}
+
+COMPRESSED_RESPONSES = registry.counter(
+    "http_compressed_responses_total",
+    "Compressed responses by encoding and when they were compressed (request, ahead)",
+    ("encoding", "source"),
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """The Content-Encoding to use for an Accept-Encoding header, if any."""
+    if not accept_encoding:
+        return None
+    qualities: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name.lower()] = q
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = qualities.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress `body` with a Content-Encoding at the given level."""
+    if encoding == BROTLI:
+        compressed: bytes = brotli.compress(body, quality=level)
+        return compressed
+    if encoding == GZIP:
+        # Fixed mtime so the same body always compresses to the same bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    The ETag of a response once `encoding` is applied to it.
+
+    Strong validators must differ between content codings (RFC 9110
+    8.8.3), so the coding is appended inside the quotes.
+    """
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether responses of this Content-Type are on the allowlist."""
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with gzip or brotli."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        """
+        Args:
+            app: The wrapped application
+            minimum_size: Smallest body, in bytes, worth compressing
+            gzip_level: gzip level for per-request compression
+            brotli_quality: brotli quality for per-request compression
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {GZIP: gzip_level, BROTLI: brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            held, start = start, None
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                await send(held)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.levels[encoding])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            COMPRESSED_RESPONSES.inc(encoding=encoding, source="request")
+            await send(held)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
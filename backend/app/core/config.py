@@ -29,8 +29,98 @@ class Settings(BaseSettings):
     supabase_anon_key: str
 
     # AI API
-    gemini_api_key: str
+    ai_provider: str = "gemini"  # "gemini", "openai" or "stub"
     ai_model: str = "gemini-2.0-flash"
+    gemini_api_key: str = ""
+    openai_api_key: str = ""
+    openai_base_url: str = "https://api.openai.com/v1"
+
+    # Grading token budgets
+    grading_response_overflow: str = "truncate"  # "truncate" or "reject"
+    grading_response_base_tokens: int = 200
+    grading_response_tokens_per_minute: int = 150
+    grading_response_max_tokens: int = 4000
+    grading_max_output_tokens: dict[str, int] = {
+        "quiz": 256,
+        "explain": 700,
+        "debug": 700,
+        "default": 700,
+    }
+
+    # Follow-up questions (generated concurrently with grading)
+    follow_up_enabled: bool = True
+    follow_up_max_output_tokens: int = 80
+    follow_up_grace_seconds: float = 1.0  # Extra wait after grading finishes
+
+    # Token prices for cost estimates (USD per million tokens)
+    ai_prompt_cost_per_million_tokens: float = 0.10
+    ai_output_cost_per_million_tokens: float = 0.40
+
+    # Stub provider (local load testing without network access)
+    ai_stub_latency_ms: float = 800.0
+    ai_stub_latency_sigma: float = 0.3
+    ai_stub_error_rate: float = 0.0
+    ai_stub_seed: int = 0
+
+    # AI call resilience
+    ai_call_timeout_seconds: float = 20.0
+    ai_total_deadline_seconds: float = 45.0
+    ai_max_attempts: int = 3
+    ai_retry_base_delay_seconds: float = 0.5
+    ai_retry_max_delay_seconds: float = 4.0
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_recovery_seconds: float = 30.0
+    ai_hedge_enabled: bool = False
+    ai_hedge_percentile: float = 0.95
+    ai_hedge_min_samples: int = 20
+
+    # Pre-grading (cheap local checks before any AI call)
+    pregrade_enabled: bool = True
+    pregrade_min_similarity: float = 0.04
+    pregrade_min_content_words: int = 4
+    pregrade_max_gibberish_ratio: float = 0.5
+
+    # Fair scheduling of AI grading capacity (per worker)
+    grading_max_concurrency: int = 16
+    grading_max_in_flight_per_user: int = 2
+    grading_max_queue_depth: int = 200
+
+    # In-memory content snapshot (services/content_snapshot.py)
+    content_snapshot_enabled: bool = True
+    content_version_check_seconds: float = 30.0
+    content_cache_max_age_seconds: int = 60  # Cache-Control max-age; 0 always revalidates
+
+    # gzip/brotli response compression (core/compression.py)
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024
+    compression_gzip_level: int = 6  # Per-request levels; pre-rendered content uses the max
+    compression_brotli_quality: int = 4
+
+    # Drill content cache for the submission path (used without a snapshot)
+    drill_cache_ttl_seconds: float = 300.0
+
+    # Write-behind buffering of drill_attempts inserts (services/attempt_buffer.py)
+    attempt_write_behind_enabled: bool = False
+    attempt_buffer_max_rows: int = 100
+    attempt_buffer_max_delay_seconds: float = 1.0
+    attempt_buffer_spill_dir: str = ".attempt_spill"
+    attempt_buffer_fsync: bool = True
+
+    # Client disconnects during grading: "abort" cancels the provider call
+    # and stores nothing, "finish" grades and stores the attempt anyway
+    grading_on_disconnect: str = "abort"
+    grading_disconnect_poll_seconds: float = 0.25
+
+    # Idempotency-Key support for attempt submission
+    idempotency_ttl_seconds: float = 86400.0
+
+    # Near-duplicate grade reuse (see services/duplicate_index.py)
+    duplicate_enabled: bool = True
+    duplicate_max_hamming: int = 3  # Bits out of 64
+    duplicate_min_content_words: int = 12
+    duplicate_audit_rate: float = 0.05
+    duplicate_agreement_tolerance: float = 0.1
+    duplicate_max_entries_per_drill: int = 1000
 
     @property
     def is_production(self) -> bool:
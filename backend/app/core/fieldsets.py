@@ -0,0 +1,64 @@
+"""
+Sparse Fieldsets
+
+Responsibility: Parses `fields=` query parameters so clients can ask for
+only the columns they render. The selection maps straight onto a
+PostgREST select list (or a dict projection for rows served from
+memory), so unrequested columns never leave the database.
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+class Fieldset:
+    """The selectable columns of one resource and its default projection."""
+
+    def __init__(
+        self,
+        allowed: Sequence[str],
+        default: Sequence[str],
+        required: Sequence[str] = ("id",),
+    ):
+        """
+        Args:
+            allowed: Columns a client may request
+            default: Columns returned when `fields` is omitted
+            required: Columns always returned (e.g. keys the server needs)
+        """
+        self.allowed = tuple(allowed)
+        self.default = tuple(default)
+        self.required = tuple(required)
+
+    def parse(self, fields: str | None) -> tuple[str, ...]:
+        """
+        Columns to return for a comma-separated `fields` parameter.
+
+        Raises:
+            HTTPException: 400 naming any column that isn't selectable
+        """
+        if not fields:
+            requested = self.default
+        else:
+            requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+            unknown = sorted(set(requested) - set(self.allowed))
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(unknown)}. "
+                    f"Allowed: {', '.join(self.allowed)}",
+                )
+        # Keep request order, drop duplicates, required columns first
+        return tuple(dict.fromkeys((*self.required, *requested)))
+
+
+def select_list(fields: Sequence[str]) -> str:
+    """PostgREST select list for a parsed fieldset."""
+    return ",".join(fields)
+
+
+def project(row: Mapping[str, Any], fields: Sequence[str]) -> dict[str, Any]:
+    """Copy of `row` restricted to `fields`."""
+    return {field: row[field] for field in fields if field in row}
@@ -0,0 +1,102 @@
+"""
+HTTP Caching for Content Endpoints
+
+Responsibility: ETags, conditional GETs and Cache-Control headers for the
+read-only content routes (tracks, units, drills).
+
+The ETag is the content snapshot's hash, so every content route changes
+its ETag together whenever content is reseeded; JSON and MessagePack
+bodies get distinct ETags, and a compressed body gets an encoding suffix
+where Content-Encoding is set (compression.encoded_etag). A request whose
+If-None-Match matches either form is answered with 304 before the route
+runs: no database work and no body.
+Without a snapshot (disabled or not loaded yet) responses carry no ETag
+and are marked no-cache.
+"""
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.core.compression import encoded_etag, negotiate_encoding
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.responses import wants_msgpack
+from app.services.content_snapshot import ContentSnapshot, get_content_snapshot
+
+# Bump when content response models change, so clients don't reuse bodies
+# cached under the old shape for the same content
+REPRESENTATION_VERSION = "1"
+
+CONDITIONAL_REQUESTS = registry.counter(
+    "content_conditional_requests_total",
+    "Content requests by cache outcome (not_modified, full, uncached)",
+    ("outcome",),
+)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def content_etag(content: ContentSnapshot, msgpack: bool = False) -> str:
+    """Strong ETag for any uncompressed response rendered from this snapshot."""
+    suffix = "-msgpack" if msgpack else ""
+    return f'"{REPRESENTATION_VERSION}-{content.content_hash}{suffix}"'
+
+
+def content_cache_control() -> str:
+    """Cache-Control for content responses that carry an ETag."""
+    max_age = settings.content_cache_max_age_seconds
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+
+async def cached_content(
+    request: Request,
+    response: Response,
+    content: ContentSnapshot | None = Depends(get_content_snapshot),
+) -> ContentSnapshot | None:
+    """
+    Dependency for content routes: the snapshot to serve from, with caching.
+
+    Sets ETag and Cache-Control on the response, or raises a 304 if the
+    client's copy is current. Error responses don't get the headers.
+    Async, like get_content_snapshot, so it runs on the event loop instead
+    of taking a threadpool slot on every content request.
+    """
+    if content is None:
+        CONDITIONAL_REQUESTS.inc(outcome="uncached")
+        response.headers["Cache-Control"] = "no-cache"
+        return None
+
+    headers = {
+        "ETag": content_etag(content, msgpack=wants_msgpack(request)),
+        "Cache-Control": content_cache_control(),
+        # Each format and Content-Encoding has its own ETag
+        "Vary": "Accept, Accept-Encoding",
+    }
+
+    # Whether the body would be compressed isn't known until the route
+    # runs, so a copy held in either form is current
+    candidates = [headers["ETag"]]
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding:
+        candidates.append(encoded_etag(headers["ETag"], encoding))
+    if_none_match = request.headers.get("if-none-match")
+    for etag in candidates:
+        if etag_matches(if_none_match, etag):
+            CONDITIONAL_REQUESTS.inc(outcome="not_modified")
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": etag}
+            )
+
+    CONDITIONAL_REQUESTS.inc(outcome="full")
+    response.headers.update(headers)
+    return content
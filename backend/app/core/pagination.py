@@ -0,0 +1,60 @@
+"""
+Keyset Pagination
+
+Responsibility: Opaque cursors for list endpoints that page by a sort key
+instead of an offset, so a deep page costs the same as the first.
+
+A page is fetched with `limit + 1` rows; if the extra row comes back there
+is a next page, and its cursor (the sort key of the last row returned) is
+sent in the X-Next-Cursor response header. Clients pass it back as
+`?cursor=` and stop when the header is absent.
+"""
+
+import base64
+import json
+from collections.abc import Callable, Sequence
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*key: str) -> str:
+    """Opaque, URL-safe cursor for a row's sort key."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> list[str]:
+    """
+    Sort key from a cursor made by encode_cursor().
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        key = None
+    if not (
+        isinstance(key, list) and len(key) == arity and all(isinstance(v, str) for v in key)
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return key
+
+
+def paginate[T](
+    response: Response,
+    rows: Sequence[T],
+    limit: int,
+    sort_key: Callable[[T], tuple[str, ...]],
+) -> Sequence[T]:
+    """
+    Trim a `limit + 1` fetch to one page, setting X-Next-Cursor if more follow.
+    """
+    if len(rows) <= limit:
+        return rows
+    page = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*sort_key(page[-1]))
+    return page
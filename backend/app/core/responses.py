@@ -0,0 +1,244 @@
+"""
+Responses
+
+Responsibility: Fast response encoding paths and content negotiation.
+
+- Routes with a response_model are already serialized straight to bytes by
+  Pydantic's Rust core (FastAPI 0.130+); they keep FastAPI's default
+  response class (a custom class would switch that fast path off).
+- Routes that return plain dicts use OrjsonResponse instead of the stdlib
+  encoder.
+- Content served from the snapshot is serialized once when the snapshot
+  loads and returned as-is with prerendered().
+- Rows read from our own tables are already in their response model's
+  shape; trusted() serializes them without building or validating models
+  (validation runs only with settings.debug, to catch schema drift).
+- Clients that send `Accept: application/msgpack` get the same schema
+  encoded as MessagePack, on routers built with NegotiatedRoute.
+- Pre-rendered bodies also keep gzip and brotli variants (see
+  core/compression.py), served as-is to clients that accept them.
+"""
+
+from collections.abc import Callable, Coroutine, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, get_args, get_origin
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.compression import (
+    COMPRESSED_RESPONSES,
+    ENCODINGS,
+    PRECOMPRESS_LEVELS,
+    compress,
+    encoded_etag,
+    negotiate_encoding,
+)
+from app.core.config import settings
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = {MSGPACK, "application/x-msgpack"}
+_JSON_TYPES = {JSON, "application/*", "*/*"}
+_REQUIRED = object()
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse encoded with orjson, for routes without a response_model."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    Whether the Accept header prefers MessagePack over JSON.
+
+    MessagePack must be listed explicitly; ties with JSON go to MessagePack.
+    """
+    accept = request.headers.get("accept", "")
+    if "msgpack" not in accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in _MSGPACK_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in _JSON_TYPES:
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def add_vary(response: Response, header: str) -> None:
+    """Add a request header to the response's Vary list."""
+    vary = response.headers.get("vary")
+    if vary is None:
+        response.headers["Vary"] = header
+    elif header.lower() not in {v.strip().lower() for v in vary.split(",")}:
+        response.headers["Vary"] = f"{vary}, {header}"
+
+
+def json_to_msgpack(body: bytes | memoryview) -> bytes:
+    """Re-encode a JSON document as MessagePack."""
+    packed: bytes = msgpack.packb(orjson.loads(body))
+    return packed
+
+
+@dataclass(frozen=True)
+class Encoded:
+    """A response body serialized ahead of time in every supported format."""
+
+    json: bytes
+    msgpack: bytes
+    # Content-Encoding -> the same bodies compressed with it; empty for
+    # bodies below the compression threshold
+    compressed: Mapping[str, "Encoded"] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, body: bytes) -> "Encoded":
+        packed = json_to_msgpack(body)
+        compressed = {}
+        if settings.compression_enabled and len(body) >= settings.compression_min_bytes:
+            compressed = {
+                encoding: cls(
+                    json=compress(body, encoding, PRECOMPRESS_LEVELS[encoding]),
+                    msgpack=compress(packed, encoding, PRECOMPRESS_LEVELS[encoding]),
+                )
+                for encoding in ENCODINGS
+            }
+        return cls(json=body, msgpack=packed, compressed=compressed)
+
+
+def prerendered(body: Encoded, request: Request, response: Response) -> Response:
+    """
+    Serve an already-serialized body in the format and encoding the client
+    accepts.
+
+    Args:
+        body: Pre-encoded body, as produced by the route's response_model
+        request: The request, for content negotiation
+        response: The route's injected Response; headers set on it by
+            dependencies (ETag, Cache-Control, ...) are carried over
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    variant = body.compressed.get(encoding, body) if encoding else body
+    if wants_msgpack(request):
+        served = Response(content=variant.msgpack, media_type=MSGPACK)
+    else:
+        served = Response(content=variant.json, media_type=JSON)
+    served.headers.raw.extend(response.headers.raw)
+    if encoding and variant is not body:
+        served.headers["Content-Encoding"] = encoding
+        if "etag" in served.headers:
+            served.headers["ETag"] = encoded_etag(served.headers["etag"], encoding)
+        COMPRESSED_RESPONSES.inc(encoding=encoding, source="ahead")
+    return served
+
+
+@lru_cache
+def type_adapter(response_model: Any) -> TypeAdapter:
+    """Cached TypeAdapter for a response model (building one is costly)."""
+    return TypeAdapter(response_model)
+
+
+@lru_cache
+def _model_fields(model: type[BaseModel]) -> tuple[tuple[str, Any], ...]:
+    return tuple(
+        (name, _REQUIRED if info.is_required() else info.get_default(call_default_factory=True))
+        for name, info in model.model_fields.items()
+    )
+
+
+def _project(row: Mapping[str, Any], model: type[BaseModel], exclude_unset: bool) -> dict:
+    projected = {}
+    for name, default in _model_fields(model):
+        if name in row:
+            projected[name] = row[name]
+        elif not exclude_unset and default is not _REQUIRED:
+            projected[name] = default
+    return projected
+
+
+def trusted(
+    value: Any, response_model: Any, response: Response, exclude_unset: bool = False
+) -> Response:
+    """
+    Serialize rows from our own schema as `response_model`, unvalidated.
+
+    Each row is restricted to the model's fields (plus defaults for missing
+    ones) and encoded with orjson, instead of building a model per row and
+    having FastAPI validate it again. Values pass through as the database
+    returned them, e.g. timestamps keep PostgREST's formatting. Nested
+    rows are encoded as selected.
+
+    Args:
+        value: A row, or a list of rows for a list[...] response_model
+        response_model: The route's response_model
+        response: The route's injected Response; its headers are carried over
+        exclude_unset: Leave out fields missing from the row, as the
+            route's response_model_exclude_unset would
+
+    Raises:
+        ValidationError: With settings.debug, if the rows don't match
+            response_model
+    """
+    if settings.debug:
+        type_adapter(response_model).validate_python(value)
+
+    content: dict | list[dict]
+    if get_origin(response_model) is list:
+        (model,) = get_args(response_model)
+        content = [_project(row, model, exclude_unset) for row in value]
+    else:
+        content = _project(value, response_model, exclude_unset)
+
+    served = Response(content=orjson.dumps(content), media_type=JSON)
+    served.headers.raw.extend(response.headers.raw)
+    return served
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route that re-encodes successful JSON responses as MessagePack when
+    the client asks for it. Responses are marked `Vary: Accept`.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            response = await handler(request)
+            add_vary(response, "Accept")
+            if not (
+                200 <= response.status_code < 300
+                and response.headers.get("content-type", "").startswith(JSON)
+                and "content-encoding" not in response.headers
+                and wants_msgpack(request)
+            ):
+                return response
+
+            encoded = Response(
+                content=json_to_msgpack(response.body),
+                status_code=response.status_code,
+                media_type=MSGPACK,
+                background=response.background,
+            )
+            for name, value in response.headers.items():
+                if name not in ("content-length", "content-type"):
+                    encoded.headers.append(name, value)
+            return encoded
+
+        return negotiated_handler
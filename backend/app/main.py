@@ -10,8 +10,12 @@ Run with: uvicorn app.main:app --reload
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.supabase import get_supabase_client
 from app.routers import auth, drills, health, tracks, units
+from app.services.attempt_buffer import start_attempt_buffer, stop_attempt_buffer
+from app.services.content_snapshot import start_content_store
 
 # Create FastAPI application
 app = FastAPI(
@@ -30,8 +34,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets web clients revalidate content and follow pagination cursors
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Compress JSON and MessagePack bodies; pre-rendered content arrives
+# already compressed and passes through
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_bytes,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 # Register routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -48,7 +64,10 @@ async def startup_event():
     Application startup handler.
     TODO: Initialize database connections, warm up caches, etc.
     """
-    pass
+    # Serve content from memory; falls back to the database if this fails
+    await start_content_store(get_supabase_client)
+    # Replays attempts spilled by a previous process before serving
+    await start_attempt_buffer(get_supabase_client)
 
 
 @app.on_event("shutdown")
@@ -57,4 +76,5 @@ async def shutdown_event():
     Application shutdown handler.
     TODO: Clean up resources, close connections, etc.
     """
-    pass
+    # Flush buffered attempts; anything that fails stays in the spill file
+    await stop_attempt_buffer()
@@ -5,11 +5,13 @@ Responsibility: Pydantic models for drill-related database entities.
 """
 
 from datetime import datetime
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.core.fieldsets import Fieldset
+
 
 class DrillType(str, Enum):
     """Types of drills supported by the system."""
@@ -27,6 +29,30 @@ class RubricCriterion(BaseModel):
     max_score: int = Field(ge=1, le=10)
 
 
+class QuizMatchMode(StrEnum):
+    """How a quiz response is compared against the accepted answers."""
+
+    CHOICE = "choice"
+    EXACT = "exact"
+    NORMALIZED = "normalized"
+
+
+class QuizChoice(BaseModel):
+    """A selectable option for a multiple-choice quiz."""
+
+    key: str
+    text: str
+
+
+class QuizAnswerKey(BaseModel):
+    """Structured answer used to grade quiz drills locally."""
+
+    match_mode: QuizMatchMode
+    accepted_answers: list[str]
+    choices: list[QuizChoice] = []
+    explanation: str = ""
+
+
 class DrillRubric(BaseModel):
     """Complete rubric for grading a drill."""
 
@@ -35,6 +61,7 @@ class DrillRubric(BaseModel):
     common_mistakes: list[str] = []
     followup_questions: list[str] = []
     model_answer_outline: list[str] = []
+    answer_key: QuizAnswerKey | None = None
 
 
 class Drill(BaseModel):
@@ -104,12 +131,70 @@ class DrillAttempt(BaseModel):
 # API Request/Response Models
 # ============================================================================
 
+class DrillView(BaseModel):
+    """
+    Client-facing drill, restricted to the columns picked with `fields=`.
+    The rubric is never exposed: it holds quiz answer keys.
+    """
+
+    id: str
+    unit_id: str | None = None
+    slug: str | None = None
+    drill_type: DrillType | None = None
+    prompt_markdown: str | None = None
+    difficulty: int | None = None
+    estimated_minutes: int | None = None
+    concept_tags: list[str] | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+DRILL_FIELDS = Fieldset(
+    allowed=tuple(DrillView.model_fields),
+    default=(
+        "id",
+        "unit_id",
+        "slug",
+        "drill_type",
+        "prompt_markdown",
+        "difficulty",
+        "estimated_minutes",
+        "concept_tags",
+    ),
+)
+
+
+class AttemptView(BaseModel):
+    """
+    Attempt history entry, restricted to the columns picked with `fields=`.
+    """
+
+    id: str
+    created_at: datetime
+    drill_id: str | None = None
+    user_response: str | None = None
+    ai_feedback: dict[str, Any] | None = None
+    score: int | None = None
+    max_score: int | None = None
+
+
+# created_at and id are the pagination key, so always returned
+ATTEMPT_FIELDS = Fieldset(
+    allowed=tuple(AttemptView.model_fields),
+    default=("id", "created_at", "drill_id", "score", "max_score"),
+    required=("id", "created_at"),
+)
+
+# Free-text (explain/debug) answers shorter than this are rejected;
+# quiz answers may be a single choice key
+MIN_FREE_TEXT_RESPONSE_LENGTH = 10
+
 
 class DrillAttemptRequest(BaseModel):
     """Request model for submitting a drill attempt."""
 
     user_response: str = Field(
-        min_length=10,
+        min_length=1,
         description="The user's submitted answer to the drill"
     )
 
@@ -8,6 +8,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.models.drill import DrillSummary
+
 
 class Track(BaseModel):
     """
@@ -69,3 +71,20 @@ class UnitWithDrillCount(BaseModel):
     title: str
     summary_markdown: str
     drill_count: int = 0
+
+
+class UnitBundle(UnitWithDrillCount):
+    """
+    Unit with its drill summaries, as nested in a track bundle.
+    """
+
+    drills: list[DrillSummary] = []
+
+
+class TrackBundle(TrackSummary):
+    """
+    Track with its ordered units and their drills.
+    Everything the browse screen needs in one response.
+    """
+
+    units: list[UnitBundle] = []
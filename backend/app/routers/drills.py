@@ -7,25 +7,61 @@ Includes fetching drills, submitting responses, and getting feedback.
 Routes delegate to grading and scheduling services.
 """
 
+import asyncio
+import uuid
+from collections.abc import Coroutine
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Any, Literal
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
 from supabase import Client
 
+from app.core.config import settings
+from app.core.fieldsets import select_list
+from app.core.metrics import registry
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate
+from app.core.responses import NegotiatedRoute, OrjsonResponse, trusted
 from app.core.supabase import get_supabase_client
 from app.core.auth import CurrentUserId
-from app.models.drill import DrillAttemptRequest, DrillAttemptResponse
+from app.models.drill import (
+    ATTEMPT_FIELDS,
+    DRILL_FIELDS,
+    MIN_FREE_TEXT_RESPONSE_LENGTH,
+    AttemptView,
+    DrillAttemptRequest,
+    DrillAttemptResponse,
+)
+from app.services.attempt_buffer import get_attempt_buffer
+from app.services.content_snapshot import ContentSnapshot, get_content_snapshot
+from app.services.drill_cache import get_drill_cache
+from app.services.duplicate_index import get_duplicate_index
 from app.services.grading import GradingService
+from app.services.grading_scheduler import GradingRejected, get_grading_scheduler
+from app.services.idempotency import (
+    IdempotencyKeyConflict,
+    get_idempotency_store,
+    request_fingerprint,
+)
 from app.services.openai_client import OpenAIClient
+from app.services.pregrader import PreGrader
+from app.services.resilience import AIProviderError, AIProviderTimeout, CircuitOpenError
 from app.services.scheduler import calculate_next_review, get_daily_drills
+from app.services.token_budget import ResponseTooLongError
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
+CLIENT_DISCONNECTS = registry.counter(
+    "grading_client_disconnects_total",
+    "Attempt submissions cancelled because the client disconnected mid-grading",
+)
 
-@router.get("/today")
+
+@router.get("/today", response_class=OrjsonResponse)
 async def get_todays_drills(
     user_id: CurrentUserId,
     db: Client = Depends(get_supabase_client),
+    content: ContentSnapshot | None = Depends(get_content_snapshot),
     limit: int = 3,
+    fields: str | None = Query(None, description="Comma-separated drill columns to return"),
 ):
     """
     Get today's personalized drill queue based on spaced repetition.
@@ -38,11 +74,15 @@ async def get_todays_drills(
     Args:
         user_id: Authenticated user's ID (from JWT)
         limit: Maximum number of drills to return (default 3)
+        fields: Drill columns to return (defaults to what the practice
+            screen renders; the rubric is never returned)
     
     Returns:
         List of drills with metadata (reason, mastery, last_attempt)
     """
-    drills = get_daily_drills(user_id, db, limit=limit)
+    drills = get_daily_drills(
+        user_id, db, limit=limit, content=content, fields=DRILL_FIELDS.parse(fields)
+    )
     
     # Format response for frontend
     return {
@@ -53,59 +93,288 @@ async def get_todays_drills(
     }
 
 
+@router.get("/attempts", response_model=list[AttemptView], response_model_exclude_unset=True)
+async def list_attempts(
+    user_id: CurrentUserId,
+    response: Response,
+    db: Client = Depends(get_supabase_client),
+    drill_id: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+):
+    """
+    Get the user's attempt history, newest first.
+
+    Keyset-paginated over (created_at DESC, id) so every page is an index
+    range scan on idx_attempts_user_created, however deep. Pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    With write-behind enabled, the latest attempts can take up to
+    settings.attempt_buffer_max_delay_seconds to appear.
+
+    Args:
+        user_id: Authenticated user's ID (from JWT)
+        drill_id: Only return attempts at this drill
+        limit: Page size
+        cursor: X-Next-Cursor from the previous page
+        fields: Columns to return; defaults to scores without the response
+            text and feedback (id and created_at are always included)
+    """
+    selected = ATTEMPT_FIELDS.parse(fields)
+    query = db.table("drill_attempts").select(select_list(selected)).eq("user_id", user_id)
+    if drill_id:
+        query = query.eq("drill_id", drill_id)
+    if cursor:
+        created_at, attempt_id = decode_cursor(cursor, 2)
+        try:
+            datetime.fromisoformat(created_at)
+            uuid.UUID(attempt_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from None
+        # Rows strictly after the cursor in (created_at DESC, id DESC) order
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt.{attempt_id})'
+        )
+    query = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+    attempts_response = await asyncio.to_thread(query.execute)
+    page = paginate(
+        response, attempts_response.data, limit, lambda a: (a["created_at"], a["id"])
+    )
+    return trusted(page, list[AttemptView], response, exclude_unset=True)
+
+
 @router.post("/{drill_id}/attempts", response_model=DrillAttemptResponse)
 async def submit_drill_attempt(
     drill_id: str,
     request: DrillAttemptRequest,
     user_id: CurrentUserId,
+    response: Response,
+    http_request: Request,
     db: Client = Depends(get_supabase_client),
+    x_grading_priority: Literal["interactive", "batch"] = Header("interactive"),
+    idempotency_key: str | None = Header(None, max_length=255),
 ):
     """
     Submit a response to a drill for AI grading.
 
     Flow:
-    1. Fetch drill with rubric
-    2. Grade response via AI
-    3. Store attempt in drill_attempts
-    4. Update or create user_drill_progress
-    5. Return feedback and new mastery score
+    1. Look up the drill with rubric (content snapshot, in memory)
+    2. Grade response (locally for quizzes, via AI otherwise) while the
+       user's current progress is fetched concurrently
+    3. Store attempt in drill_attempts and upsert user_drill_progress
+       atomically via the record_drill_attempt RPC (one round trip), or
+       buffer the attempt for a bulk insert when write-behind is enabled
+    4. Return feedback and new mastery score
     
+    Scripted or bulk clients should send `X-Grading-Priority: batch` so
+    interactive submissions are graded first.
+
+    Clients that retry should send an `Idempotency-Key` header: a retry
+    with the same key returns the original result (marked with
+    `Idempotent-Replayed: true`) instead of grading and storing again.
+
+    If the client disconnects mid-grading, settings.grading_on_disconnect
+    decides whether the grade is still finished and stored ("finish") or
+    the provider call is cancelled and nothing is stored ("abort"). A grade
+    that has already been produced is always stored.
+
     Requires: Valid JWT token in Authorization header
     """
 
-    # Fetch the drill
-    drill_response = db.table("drills").select("*").eq("id", drill_id).execute()
-    
-    if not drill_response.data:
+    async def submit() -> DrillAttemptResponse:
+        if idempotency_key is None:
+            return await _grade_and_record_attempt(
+                drill_id, request, user_id, db, x_grading_priority
+            )
+
+        try:
+            result, replayed = await get_idempotency_store().run(
+                f"{user_id}:{idempotency_key}",
+                request_fingerprint(drill_id, request.user_response),
+                lambda: _grade_and_record_attempt(
+                    drill_id, request, user_id, db, x_grading_priority
+                ),
+            )
+        except IdempotencyKeyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result
+
+    if settings.grading_on_disconnect == "abort":
+        return await _cancel_on_disconnect(http_request, submit())
+    # Shielded so the grade is stored even if the server cancels the handler
+    return await asyncio.shield(asyncio.ensure_future(submit()))
+
+
+async def _cancel_on_disconnect[T](
+    http_request: Request, work: Coroutine[Any, Any, T]
+) -> T | Response:
+    """
+    Run `work`, cancelling it if the client goes away first.
+
+    Cancellation propagates into the provider call and releases its
+    grading scheduler slot; a pending Idempotency-Key is released too, so a
+    retry on a new connection grades normally. Once grading has finished
+    the attempt is recorded regardless (see _run_to_completion) and its
+    result kept under the Idempotency-Key, so a retry replays it.
+    """
+    task = asyncio.create_task(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=settings.grading_disconnect_poll_seconds
+            )
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                CLIENT_DISCONNECTS.inc()
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                # Nobody is listening; 499 (client closed request) is for the access log
+                return Response(status_code=499)
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def _grade_and_record_attempt(
+    drill_id: str,
+    request: DrillAttemptRequest,
+    user_id: str,
+    db: Client,
+    priority: str,
+) -> DrillAttemptResponse:
+    """Grade one submission and persist it; see submit_drill_attempt."""
+
+    # Fetch the drill: snapshot first, then the cache (covers drills seeded
+    # since the snapshot was built)
+    content = await get_content_snapshot()
+    drill = content.drills_by_id.get(drill_id) if content else None
+    if drill is None:
+        drill = await get_drill_cache().get(db, drill_id)
+
+    if drill is None:
         raise HTTPException(status_code=404, detail="Drill not found")
-    
-    drill = drill_response.data[0]
+
+    if (
+        drill["drill_type"] != "quiz"
+        and len(request.user_response.strip()) < MIN_FREE_TEXT_RESPONSE_LENGTH
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Response must be at least {MIN_FREE_TEXT_RESPONSE_LENGTH} characters",
+        )
 
     # Initialize services
     openai_client = OpenAIClient()
-    grading_service = GradingService(openai_client)
+    pregrader = PreGrader.from_settings() if settings.pregrade_enabled else None
+    duplicate_index = get_duplicate_index() if settings.duplicate_enabled else None
+    grading_service = GradingService(
+        openai_client,
+        pregrader=pregrader,
+        duplicate_index=duplicate_index,
+        scheduler=get_grading_scheduler(),
+    )
+
+    # Fetch current mastery while the response is graded
+    progress_task = asyncio.create_task(
+        asyncio.to_thread(
+            lambda: db.table("user_drill_progress")
+            .select("mastery_score")
+            .eq("user_id", user_id)
+            .eq("drill_id", drill_id)
+            .execute()
+        )
+    )
 
     # Grade the response
-    feedback = await grading_service.grade_drill_response(
-        drill_id=drill_id,
-        prompt=drill["prompt_markdown"],
-        rubric=drill["rubric"],
-        user_response=request.user_response,
-        drill_type=drill["drill_type"],
+    feedback = None
+    try:
+        feedback = await grading_service.grade_drill_response(
+            drill_id=drill_id,
+            prompt=drill["prompt_markdown"],
+            rubric=drill["rubric"],
+            user_response=request.user_response,
+            drill_type=drill["drill_type"],
+            estimated_minutes=drill.get("estimated_minutes"),
+            user_id=user_id,
+            priority=priority,
+        )
+    except GradingRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many grading requests in progress, please try again shortly",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))},
+        ) from e
+    except ResponseTooLongError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Grading is temporarily unavailable, please try again shortly",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))},
+        ) from e
+    except AIProviderTimeout as e:
+        raise HTTPException(status_code=504, detail="Grading timed out, please try again") from e
+    except AIProviderError as e:
+        raise HTTPException(status_code=502, detail="Grading failed, please try again") from e
+    finally:
+        if feedback is None:
+            progress_task.cancel()
+
+    # The grade is paid for: record it even if the client disconnects now
+    return await _run_to_completion(
+        _record_attempt(
+            drill_id, request, user_id, db, grading_service, feedback, progress_task
+        )
     )
 
+
+async def _run_to_completion[T](work: Coroutine[Any, Any, T]) -> T:
+    """
+    Await `work`, absorbing cancellation of the calling task until it is done.
+
+    The caller then returns normally, so an Idempotency-Key wrapping it
+    stores the result instead of being released for a duplicate write.
+    """
+    task = asyncio.ensure_future(work)
+    cancelled = False
+    while True:
+        try:
+            result = await asyncio.shield(task)
+            break
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise
+            cancelled = True
+    if cancelled and (current := asyncio.current_task()) is not None:
+        current.uncancel()
+    return result
+
+
+async def _record_attempt(
+    drill_id: str,
+    request: DrillAttemptRequest,
+    user_id: str,
+    db: Client,
+    grading_service: GradingService,
+    feedback: dict[str, Any],
+    progress_task: asyncio.Task,
+) -> DrillAttemptResponse:
+    """Update mastery and store a graded attempt; see submit_drill_attempt."""
+
     # Calculate score percentage
     score_percentage = feedback["total_score"] / feedback["max_score"] if feedback["max_score"] > 0 else 0
 
-    # Fetch current mastery or initialize
-    progress_response = (
-        db.table("user_drill_progress")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("drill_id", drill_id)
-        .execute()
-    )
-
+    # Current mastery was fetched during grading
+    progress_response = await progress_task
     current_mastery = 0
     if progress_response.data:
         current_mastery = progress_response.data[0]["mastery_score"]
@@ -116,37 +385,59 @@ async def submit_drill_attempt(
         score_percentage=score_percentage,
     )
 
-    # Store the attempt
-    attempt_data = {
-        "user_id": user_id,
-        "drill_id": drill_id,
-        "user_response": request.user_response,
-        "ai_feedback": feedback,
-        "score": feedback["total_score"],
-        "max_score": feedback["max_score"],
-    }
-    
-    attempt_response = db.table("drill_attempts").insert(attempt_data).execute()
-    attempt_id = attempt_response.data[0]["id"]
-
-    # Update or create progress
     now = datetime.now(timezone.utc)
     next_review = calculate_next_review(new_mastery, now)
-    
-    progress_data = {
-        "user_id": user_id,
-        "drill_id": drill_id,
-        "mastery_score": new_mastery,
-        "last_attempt_at": now.isoformat(),
-        "next_review_due_at": next_review.isoformat(),
-    }
 
-    if progress_response.data:
-        # Update existing
-        db.table("user_drill_progress").update(progress_data).eq("id", progress_response.data[0]["id"]).execute()
+    attempt_buffer = get_attempt_buffer()
+    if attempt_buffer:
+        # Write-behind: buffer the attempt row and only upsert progress now
+        attempt_id = str(uuid.uuid4())
+        await attempt_buffer.add(
+            {
+                "id": attempt_id,
+                "user_id": user_id,
+                "drill_id": drill_id,
+                "user_response": request.user_response,
+                "ai_feedback": feedback,
+                "score": feedback["total_score"],
+                "max_score": feedback["max_score"],
+                "created_at": now.isoformat(),
+            }
+        )
+        rpc_response = await asyncio.to_thread(
+            lambda: db.rpc(
+                "record_drill_progress",
+                {
+                    "p_user_id": user_id,
+                    "p_drill_id": drill_id,
+                    "p_mastery_score": new_mastery,
+                    "p_last_attempt_at": now.isoformat(),
+                    "p_next_review_due_at": next_review.isoformat(),
+                },
+            ).execute()
+        )
+        progress = rpc_response.data
+        attempt_created_at = now
     else:
-        # Create new
-        db.table("user_drill_progress").insert(progress_data).execute()
+        # Insert the attempt and upsert progress in one transaction (migration 004)
+        rpc_response = await asyncio.to_thread(
+            lambda: db.rpc(
+                "record_drill_attempt",
+                {
+                    "p_user_id": user_id,
+                    "p_drill_id": drill_id,
+                    "p_user_response": request.user_response,
+                    "p_ai_feedback": feedback,
+                    "p_score": feedback["total_score"],
+                    "p_max_score": feedback["max_score"],
+                    "p_mastery_score": new_mastery,
+                    "p_next_review_due_at": next_review.isoformat(),
+                },
+            ).execute()
+        )
+        attempt_id = rpc_response.data["attempt_id"]
+        attempt_created_at = rpc_response.data["attempt_created_at"]
+        progress = rpc_response.data["progress"]
 
     # Return response
     return DrillAttemptResponse(
@@ -158,6 +449,6 @@ async def submit_drill_attempt(
         strengths=feedback["strengths"],
         improvements=feedback["improvements"],
         follow_up_question=feedback.get("follow_up_question"),
-        mastery_score=new_mastery,
-        created_at=now,
+        mastery_score=progress["mastery_score"],
+        created_at=attempt_created_at,
     )
@@ -5,6 +5,9 @@ Responsibility: Provides health check endpoints for monitoring.
 """
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
 
 router = APIRouter()
 
@@ -33,3 +36,15 @@ async def readiness_check():
             "openai": "ok",  # TODO: Actually check
         },
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics endpoint.
+    Exposes AI grading latency, token, cost and retry metrics.
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -3,18 +3,34 @@ Tracks Router
 
 Responsibility: Handles track and unit related endpoints.
 Read-only endpoints for browsing learning content.
+
+Served from the in-memory content snapshot; the database queries are a
+fallback for when no snapshot is loaded. Responses carry the snapshot's
+ETag and conditional requests get a 304 (see core/http_cache.py).
+Snapshot responses are pre-serialized when the snapshot loads; database
+rows are serialized without re-validation (core/responses.trusted).
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.models.track import Track, TrackSummary, Unit, UnitSummary, UnitWithDrillCount
+from app.models.track import (
+    Track,
+    TrackBundle,
+    TrackSummary,
+    Unit,
+    UnitSummary,
+    UnitWithDrillCount,
+)
 from app.models.drill import Drill, DrillSummary
 
 # TODO: Replace with actual Supabase client from dependencies
 from supabase import create_client
 from app.core.config import settings
+from app.core.http_cache import cached_content
+from app.core.responses import NegotiatedRoute, prerendered, trusted
+from app.services.content_snapshot import ContentSnapshot, render_key
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 def get_supabase():
@@ -23,26 +39,48 @@ def get_supabase():
 
 
 @router.get("", response_model=list[TrackSummary])
-async def list_tracks():
+async def list_tracks(
+    request: Request,
+    http_response: Response,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
     List all available tracks.
 
     Returns a list of track summaries for browsing.
     """
+    if content:
+        body = content.rendered[render_key("tracks")]
+        return prerendered(body, request, http_response)
+
     client = get_supabase()
 
     response = client.table("tracks").select("id, slug, title, description").order("title").execute()
 
-    return [TrackSummary(**track) for track in response.data]
+    return trusted(response.data, list[TrackSummary], http_response)
 
 
 @router.get("/{slug}", response_model=Track)
-async def get_track(slug: str):
+async def get_track(
+    slug: str,
+    request: Request,
+    http_response: Response,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
     Get a track by slug.
 
     Returns full track details.
     """
+    if content:
+        if slug not in content.tracks_by_slug:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Track '{slug}' not found",
+            )
+        body = content.rendered[render_key("track", slug)]
+        return prerendered(body, request, http_response)
+
     client = get_supabase()
 
     response = client.table("tracks").select("*").eq("slug", slug).execute()
@@ -53,73 +91,125 @@ async def get_track(slug: str):
             detail=f"Track '{slug}' not found",
         )
 
-    return Track(**response.data[0])
+    return trusted(response.data[0], Track, http_response)
 
 
 @router.get("/{slug}/units", response_model=list[UnitWithDrillCount])
-async def list_track_units(slug: str):
+async def list_track_units(
+    slug: str,
+    request: Request,
+    http_response: Response,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
     List all units in a track.
 
     Returns units ordered by order_index, with drill counts.
     """
+    if content:
+        if slug not in content.tracks_by_slug:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Track '{slug}' not found",
+            )
+        body = content.rendered[render_key("units", slug)]
+        return prerendered(body, request, http_response)
+
     client = get_supabase()
 
-    # First get the track
-    track_response = client.table("tracks").select("id").eq("slug", slug).execute()
+    # Units and their drill counts (units.drill_count, migration 007) in one query
+    response = (
+        client.table("tracks")
+        .select("id, units(id, order_index, title, summary_markdown, drill_count)")
+        .eq("slug", slug)
+        .order("order_index", foreign_table="units")
+        .execute()
+    )
 
-    if not track_response.data:
+    if not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Track '{slug}' not found",
         )
 
-    track_id = track_response.data[0]["id"]
+    return trusted(response.data[0]["units"], list[UnitWithDrillCount], http_response)
 
-    # Get units with drill counts
-    # Note: Supabase doesn't support count aggregation easily, so we'll do this in two queries
-    units_response = (
-        client.table("units")
-        .select("id, order_index, title, summary_markdown")
-        .eq("track_id", track_id)
-        .order("order_index")
-        .execute()
-    )
 
-    # Get drill counts per unit
-    drills_response = (
-        client.table("drills")
-        .select("unit_id")
+@router.get("/{slug}/bundle", response_model=TrackBundle)
+async def get_track_bundle(
+    slug: str,
+    request: Request,
+    http_response: Response,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
+    """
+    Get a track with its units and their drill summaries.
+
+    One request replaces /tracks/{slug}, /tracks/{slug}/units and
+    /units/{id}/drills for every unit. Units are ordered by order_index
+    and drills by slug, as in those endpoints.
+    """
+    if content:
+        if slug not in content.tracks_by_slug:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Track '{slug}' not found",
+            )
+        body = content.rendered[render_key("bundle", slug)]
+        return prerendered(body, request, http_response)
+
+    client = get_supabase()
+
+    # The whole tree in one query via embedded selects
+    response = (
+        client.table("tracks")
+        .select(
+            "id, slug, title, description, "
+            "units(id, order_index, title, summary_markdown, drill_count, "
+            "drills(id, slug, drill_type, difficulty, estimated_minutes, concept_tags))"
+        )
+        .eq("slug", slug)
+        .order("order_index", foreign_table="units")
+        .order("slug", foreign_table="units.drills")
         .execute()
     )
 
-    # Count drills per unit
-    drill_counts: dict[str, int] = {}
-    for drill in drills_response.data:
-        unit_id = drill["unit_id"]
-        drill_counts[unit_id] = drill_counts.get(unit_id, 0) + 1
-
-    # Build response
-    units = []
-    for unit in units_response.data:
-        units.append(
-            UnitWithDrillCount(
-                id=unit["id"],
-                order_index=unit["order_index"],
-                title=unit["title"],
-                summary_markdown=unit["summary_markdown"],
-                drill_count=drill_counts.get(unit["id"], 0),
-            )
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Track '{slug}' not found",
         )
 
-    return units
+    return trusted(response.data[0], TrackBundle, http_response)
 
 
 @router.get("/{slug}/units/{order_index}", response_model=Unit)
-async def get_unit(slug: str, order_index: int):
+async def get_unit(
+    slug: str,
+    order_index: int,
+    request: Request,
+    http_response: Response,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
     Get a specific unit by track slug and order index.
     """
+    if content:
+        track = content.tracks_by_slug.get(slug)
+        if track is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Track '{slug}' not found",
+            )
+        unit = content.unit_by_position.get((track["id"], order_index))
+        if unit is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unit {order_index} not found in track '{slug}'",
+            )
+        body = content.rendered[render_key("unit", slug, order_index)]
+        return prerendered(body, request, http_response)
+
     client = get_supabase()
 
     # Get track
@@ -148,4 +238,4 @@ async def get_unit(slug: str, order_index: int):
             detail=f"Unit {order_index} not found in track '{slug}'",
         )
 
-    return Unit(**unit_response.data[0])
+    return trusted(unit_response.data[0], Unit, http_response)
@@ -2,17 +2,30 @@
 Units Router
 
 Responsibility: Handles unit-specific endpoints, primarily drill access.
+
+Served from the in-memory content snapshot; the database queries are a
+fallback for when no snapshot is loaded. Responses carry the snapshot's
+ETag and conditional requests get a 304 (see core/http_cache.py).
+Default snapshot responses are pre-serialized when the snapshot loads;
+other rows are serialized without re-validation (core/responses.trusted).
 """
 
-from fastapi import APIRouter, HTTPException, status
+from bisect import bisect_right
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from app.models.drill import Drill, DrillSummary
+from app.models.drill import DRILL_FIELDS, DrillSummary, DrillView
 
 # TODO: Replace with actual Supabase client from dependencies
 from supabase import create_client
 from app.core.config import settings
+from app.core.fieldsets import project, select_list
+from app.core.http_cache import cached_content
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate
+from app.core.responses import NegotiatedRoute, prerendered, trusted
+from app.services.content_snapshot import ContentSnapshot, render_key
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 
 def get_supabase():
@@ -21,12 +34,38 @@ def get_supabase():
 
 
 @router.get("/{unit_id}/drills", response_model=list[DrillSummary])
-async def list_unit_drills(unit_id: str):
+async def list_unit_drills(
+    unit_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
-    List all drills in a unit.
+    List the drills in a unit, ordered by slug.
 
     Returns drill summaries (without full prompt/rubric) for browsing.
+    Paginated by slug: pass the X-Next-Cursor response header back as
+    `cursor` to get the next page.
     """
+    after = decode_cursor(cursor, 1)[0] if cursor else None
+
+    if content:
+        if unit_id not in content.units_by_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unit '{unit_id}' not found",
+            )
+        drills = content.drills_by_unit.get(unit_id, ())
+        if after is None and len(drills) <= limit:
+            # The whole unit fits on the first page
+            body = content.rendered[render_key("unit_drills", unit_id)]
+            return prerendered(body, request, response)
+        start = bisect_right(drills, after, key=lambda d: d["slug"]) if after else 0
+        page = paginate(response, drills[start : start + limit + 1], limit, lambda d: (d["slug"],))
+        return trusted(page, list[DrillSummary], response)
+
     client = get_supabase()
 
     # Verify unit exists
@@ -39,29 +78,57 @@ async def list_unit_drills(unit_id: str):
         )
 
     # Get drills
-    drills_response = (
+    query = (
         client.table("drills")
         .select("id, slug, drill_type, difficulty, estimated_minutes, concept_tags")
         .eq("unit_id", unit_id)
-        .order("slug")
-        .execute()
     )
-
-    return [DrillSummary(**drill) for drill in drills_response.data]
-
-
-@router.get("/{unit_id}/drills/{drill_slug}", response_model=Drill)
-async def get_drill(unit_id: str, drill_slug: str):
+    if after:
+        query = query.gt("slug", after)
+    drills_response = query.order("slug").limit(limit + 1).execute()
+
+    page = paginate(response, drills_response.data, limit, lambda d: (d["slug"],))
+    return trusted(page, list[DrillSummary], response)
+
+
+@router.get(
+    "/{unit_id}/drills/{drill_slug}",
+    response_model=DrillView,
+    response_model_exclude_unset=True,
+)
+async def get_drill(
+    unit_id: str,
+    drill_slug: str,
+    request: Request,
+    http_response: Response,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    content: ContentSnapshot | None = Depends(cached_content),
+):
     """
     Get a specific drill by unit ID and drill slug.
 
-    Returns full drill details including prompt and rubric.
+    Returns the drill details needed to attempt it, including the prompt;
+    `fields` narrows them further. The rubric is never returned.
     """
+    selected = DRILL_FIELDS.parse(fields)
+
+    if content:
+        drill = content.drill_by_unit_slug.get((unit_id, drill_slug))
+        if drill is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Drill '{drill_slug}' not found in unit '{unit_id}'",
+            )
+        if fields is None:
+            body = content.rendered[render_key("drill", unit_id, drill_slug)]
+            return prerendered(body, request, http_response)
+        return trusted(project(drill, selected), DrillView, http_response, exclude_unset=True)
+
     client = get_supabase()
 
     response = (
         client.table("drills")
-        .select("*")
+        .select(select_list(selected))
         .eq("unit_id", unit_id)
         .eq("slug", drill_slug)
         .execute()
@@ -73,4 +140,4 @@ async def get_drill(unit_id: str, drill_slug: str):
             detail=f"Drill '{drill_slug}' not found in unit '{unit_id}'",
         )
 
-    return Drill(**response.data[0])
+    return trusted(response.data[0], DrillView, http_response, exclude_unset=True)
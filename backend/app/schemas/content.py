@@ -5,10 +5,10 @@ Responsibility: Pydantic models for validating content JSON files.
 Used by the seeding script to ensure content integrity before database sync.
 """
 
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Annotated
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class DrillType(str, Enum):
@@ -27,6 +27,42 @@ class RubricCriterion(BaseModel):
     max_score: int = Field(..., ge=1, le=10)
 
 
+class QuizMatchMode(StrEnum):
+    """How a quiz response is compared against the accepted answers."""
+
+    CHOICE = "choice"  # Response selects one or more choice keys
+    EXACT = "exact"  # Response must equal an accepted answer verbatim
+    NORMALIZED = "normalized"  # Case, whitespace and punctuation insensitive
+
+
+class QuizChoice(BaseModel):
+    """A selectable option for a multiple-choice quiz."""
+
+    key: str = Field(..., pattern=r"^[a-z0-9]+$", min_length=1, max_length=10)
+    text: str = Field(..., min_length=1)
+
+
+class QuizAnswerKey(BaseModel):
+    """Structured answer for deterministic local grading of quiz drills."""
+
+    match_mode: QuizMatchMode
+    accepted_answers: list[str] = Field(..., min_length=1)
+    choices: list[QuizChoice] = Field(default_factory=list)
+    explanation: str = Field(default="")
+
+    @model_validator(mode="after")
+    def validate_choices(self) -> "QuizAnswerKey":
+        """Choice quizzes must list their choices and accept only known keys."""
+        if self.match_mode == QuizMatchMode.CHOICE:
+            keys = {choice.key for choice in self.choices}
+            if not keys:
+                raise ValueError("Choice quizzes must define choices")
+            unknown = set(self.accepted_answers) - keys
+            if unknown:
+                raise ValueError(f"Accepted answers not in choices: {sorted(unknown)}")
+        return self
+
+
 class DrillRubric(BaseModel):
     """Complete rubric for grading a drill."""
 
@@ -35,6 +71,7 @@ class DrillRubric(BaseModel):
     common_mistakes: list[str] = Field(default_factory=list)
     followup_questions: list[str] = Field(default_factory=list)
     model_answer_outline: list[str] = Field(default_factory=list)
+    answer_key: QuizAnswerKey | None = None
 
 
 class TrackContent(BaseModel):
@@ -79,6 +116,13 @@ class DrillContent(BaseModel):
             validated.append(normalized)
         return validated
 
+    @model_validator(mode="after")
+    def validate_quiz_answer_key(self) -> "DrillContent":
+        """Quiz drills are graded locally and need a structured answer key."""
+        if self.drill_type == DrillType.QUIZ and self.rubric.answer_key is None:
+            raise ValueError("Quiz drills must define rubric.answer_key")
+        return self
+
 
 # Type aliases for clarity
 Slug = Annotated[str, Field(pattern=r"^[a-z0-9-]+$")]
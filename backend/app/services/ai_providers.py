@@ -0,0 +1,275 @@
+"""
+AI Providers
+
+Responsibility: Pluggable backends for raw model calls.
+OpenAIClient builds prompts and parses grades; providers only turn a
+system + user prompt into text.
+
+Available providers (settings.ai_provider):
+- "gemini": Google Gemini via google-generativeai
+- "openai": Any OpenAI-compatible /chat/completions endpoint over HTTP
+- "stub":   Deterministic local grader with configurable latency and
+            error rate, for tests and load tests without network access
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.config import settings
+from app.services.resilience import AIProviderError
+
+
+@dataclass(frozen=True)
+class ProviderResponse:
+    """Raw text returned by a provider plus usage metadata when available."""
+
+    text: str
+    model: str
+    prompt_tokens: int | None = None
+    output_tokens: int | None = None
+
+
+class AIProvider(ABC):
+    """Interface every AI backend implements."""
+
+    name: str
+    model: str
+
+    @abstractmethod
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.3,
+        max_output_tokens: int | None = None,
+        json_output: bool = True,
+    ) -> ProviderResponse:
+        """Generate a completion for the given prompts."""
+
+    async def aclose(self) -> None:  # noqa: B027 - optional hook, not abstract
+        """Release any underlying connections."""
+
+
+class GeminiProvider(AIProvider):
+    """Google Gemini backend."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        # Imported lazily so other providers work without the Gemini SDK
+        import google.generativeai as genai
+
+        self._genai = genai
+        genai.configure(api_key=api_key)
+        self.model = model
+        self._model = genai.GenerativeModel(model)
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.3,
+        max_output_tokens: int | None = None,
+        json_output: bool = True,
+    ) -> ProviderResponse:
+        # Gemini takes a single prompt; system and user parts are concatenated
+        response = await self._model.generate_content_async(
+            f"{system_prompt}\n\n{user_prompt}",
+            generation_config=self._genai.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                response_mime_type="application/json" if json_output else "text/plain",
+            ),
+        )
+
+        usage = getattr(response, "usage_metadata", None)
+        return ProviderResponse(
+            text=response.text,
+            model=self.model,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+
+class OpenAICompatibleProvider(AIProvider):
+    """Backend for any server implementing OpenAI's chat completions API."""
+
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: str, model: str):
+        self.model = model
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=None,  # Deadlines are enforced by the resilience layer
+        )
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.3,
+        max_output_tokens: int | None = None,
+        json_output: bool = True,
+    ) -> ProviderResponse:
+        payload = {
+            "model": self.model,
+            "temperature": temperature,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        }
+        if max_output_tokens is not None:
+            payload["max_tokens"] = max_output_tokens
+        if json_output:
+            payload["response_format"] = {"type": "json_object"}
+
+        response = await self._client.post("/chat/completions", json=payload)
+        if response.status_code >= 400:
+            raise AIProviderError(
+                f"AI provider returned {response.status_code}: {response.text[:200]}"
+            )
+
+        body = response.json()
+        usage = body.get("usage") or {}
+        return ProviderResponse(
+            text=body["choices"][0]["message"]["content"],
+            model=body.get("model", self.model),
+            prompt_tokens=usage.get("prompt_tokens"),
+            output_tokens=usage.get("completion_tokens"),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class StubProvider(AIProvider):
+    """
+    Deterministic local provider.
+
+    Returns schema-valid grades derived from the rubric criteria found in
+    the user prompt. The same prompt always yields the same grade; latency
+    is drawn from a log-normal distribution around `latency_ms` and calls
+    fail with probability `error_rate`.
+    """
+
+    name = "stub"
+
+    _CRITERION_RE = re.compile(r"^- (?P<name>.+?): .* \(max (?P<max>\d+) points\)$", re.MULTILINE)
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.3,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        model: str = "stub-grader",
+    ):
+        self.model = model
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.seed = seed
+        # Latency and faults vary per call; grades depend only on the prompt
+        self._rng = random.Random(seed)
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.3,
+        max_output_tokens: int | None = None,
+        json_output: bool = True,
+    ) -> ProviderResponse:
+        if self.latency_ms > 0:
+            latency = self.latency_ms * math.exp(self._rng.gauss(0, self.latency_sigma))
+            await asyncio.sleep(latency / 1000)
+
+        if self._rng.random() < self.error_rate:
+            raise AIProviderError("Stub provider injected fault")
+
+        text = json.dumps(self._grade(user_prompt)) if json_output else self._question(user_prompt)
+        return ProviderResponse(
+            text=text,
+            model=self.model,
+            prompt_tokens=(len(system_prompt) + len(user_prompt)) // 4,
+            output_tokens=len(text) // 4,
+        )
+
+    def _prompt_rng(self, user_prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{user_prompt}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _grade(self, user_prompt: str) -> dict:
+        rng = self._prompt_rng(user_prompt)
+        criteria = [
+            (m.group("name"), int(m.group("max")))
+            for m in self._CRITERION_RE.finditer(user_prompt)
+        ] or [("overall", 5)]
+
+        scores = {name: rng.randint(0, max_score) for name, max_score in criteria}
+        return {
+            "criterion_scores": scores,
+            "total_score": sum(scores.values()),
+            "max_score": sum(max_score for _, max_score in criteria),
+            "feedback": "Stub grade generated locally for testing.",
+            "strengths": ["Addresses the prompt"],
+            "improvements": ["Add a concrete example"],
+            "follow_up_question": None,
+        }
+
+    def _question(self, user_prompt: str) -> str:
+        rng = self._prompt_rng(user_prompt)
+        return rng.choice(
+            [
+                "What would change if this ran on a multi-core machine?",
+                "How would you verify this behaviour with a debugger?",
+                "What happens in the failure case?",
+            ]
+        )
+
+
+_provider: AIProvider | None = None
+
+
+def build_ai_provider(name: str | None = None) -> AIProvider:
+    """Construct the provider named in settings (or `name` if given)."""
+    name = name or settings.ai_provider
+
+    if name == "gemini":
+        return GeminiProvider(api_key=settings.gemini_api_key, model=settings.ai_model)
+    if name == "openai":
+        return OpenAICompatibleProvider(
+            base_url=settings.openai_base_url,
+            api_key=settings.openai_api_key,
+            model=settings.ai_model,
+        )
+    if name == "stub":
+        return StubProvider(
+            latency_ms=settings.ai_stub_latency_ms,
+            latency_sigma=settings.ai_stub_latency_sigma,
+            error_rate=settings.ai_stub_error_rate,
+            seed=settings.ai_stub_seed,
+        )
+    raise ValueError(f"Unknown AI provider: {name}")
+
+
+def get_ai_provider() -> AIProvider:
+    """Process-wide provider instance, so HTTP connections are reused."""
+    global _provider
+    if _provider is None:
+        _provider = build_ai_provider()
+    return _provider
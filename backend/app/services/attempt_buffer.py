@@ -0,0 +1,257 @@
+"""
+Attempt Write-Behind Buffer
+
+Responsibility: Batches drill_attempts inserts. Instead of one insert
+(with a large ai_feedback payload) per graded attempt, rows are collected
+and written as multi-row inserts once `max_rows` are pending or
+`max_delay_seconds` have passed.
+
+Durability: every row is appended to a local spill segment before the
+request returns. Appends are group committed: rows added while a write
+is in progress are written and fsynced together by the next one, in a
+worker thread, so the event loop never blocks on the disk and one fsync
+covers many requests. A segment is deleted only after its rows are in the
+database; segments left behind by a crash are replayed on startup.
+Attempt IDs are generated by the API, so replaying a segment that was
+partly written is harmless (duplicates are ignored). Workers may share a
+spill directory: each holds a lock on the segment it is appending to.
+
+Enabled with settings.attempt_write_behind_enabled. Attempts become
+visible in the database up to max_delay_seconds after they are graded;
+progress is still written synchronously.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TextIO
+
+from supabase import Client
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BUFFER_PENDING = registry.gauge(
+    "attempt_buffer_pending_rows", "Attempt rows waiting to be flushed"
+)
+BUFFER_FLUSHES = registry.counter(
+    "attempt_buffer_flushes_total", "Attempt buffer flushes by outcome", ("outcome",)
+)
+BUFFER_FLUSH_ROWS = registry.histogram(
+    "attempt_buffer_flush_rows",
+    "Rows written per attempt buffer flush",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+class AttemptWriteBuffer:
+    """Durable write-behind buffer for drill_attempts rows."""
+
+    def __init__(
+        self,
+        db_factory: Callable[[], Client],
+        spill_dir: str | Path,
+        max_rows: int = 100,
+        max_delay_seconds: float = 1.0,
+        fsync: bool = True,
+    ):
+        """Initialize the buffer; call start() before use."""
+        self.db_factory = db_factory
+        self.spill_dir = Path(spill_dir)
+        self.max_rows = max_rows
+        self.max_delay_seconds = max_delay_seconds
+        self.fsync = fsync
+
+        self._pending: list[dict[str, Any]] = []
+        self._segment_file: TextIO | None = None
+        self._segment_path: Path | None = None
+        self._segment_seq = 0
+        # Segments whose rows failed to flush, retried on the next flush
+        self._unflushed: list[tuple[Path, list[dict[str, Any]]]] = []
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        # Group commit: rows waiting for the next segment write, and the
+        # future their add() calls wait on
+        self._staged: list[dict[str, Any]] = []
+        self._staged_written: asyncio.Future | None = None
+        self._writer: asyncio.Task | None = None
+        # Held while the segment is appended to or rotated
+        self._segment_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Replay segments left by a previous process, then start the flush loop."""
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.spill_dir.glob("attempts-*.jsonl")):
+            # Skip the live segment of another worker sharing this directory
+            with open(path, encoding="utf-8") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                rows = [json.loads(line) for line in f if line.strip()]
+            self._unflushed.append((path, rows))
+        if self._unflushed:
+            logger.info("Replaying %d attempt spill segment(s)", len(self._unflushed))
+            await self.flush()
+
+        self._open_segment()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the flush loop and write everything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writer:
+            await self._writer
+        await self.flush()
+        if self._segment_file:
+            self._segment_file.close()
+            self._segment_file = None
+            # flush() rotated to a fresh segment; drop it if nothing was written
+            if self._segment_path and self._segment_path.stat().st_size == 0:
+                self._segment_path.unlink()
+
+    async def add(self, row: dict[str, Any]) -> None:
+        """
+        Buffer one attempt row.
+
+        The row must carry its own "id" so replays are idempotent. It is
+        on disk when this returns.
+
+        Raises:
+            OSError: If the spill segment could not be written
+        """
+        self._staged.append(row)
+        if self._staged_written is None:
+            self._staged_written = asyncio.get_running_loop().create_future()
+        written = self._staged_written
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_staged())
+        # Shielded: other rows in this group wait on the same future
+        await asyncio.shield(written)
+
+    async def _write_staged(self) -> None:
+        """Append staged rows to the segment, one write and fsync per group."""
+        while self._staged:
+            rows, written = self._staged, self._staged_written
+            self._staged, self._staged_written = [], None
+            # add() creates the future with the group's first row
+            assert written is not None
+            lines = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+            try:
+                async with self._segment_lock:
+                    assert self._segment_file is not None  # Opened by start()
+                    await asyncio.to_thread(self._append, self._segment_file, lines)
+            except Exception as e:
+                written.set_exception(e)
+                continue
+
+            self._pending.extend(rows)
+            BUFFER_PENDING.set(len(self._pending))
+            written.set_result(None)
+            if len(self._pending) >= self.max_rows and not self._lock.locked():
+                self._flush_task = asyncio.create_task(self.flush())
+
+    def _append(self, segment: TextIO, lines: str) -> None:
+        segment.write(lines)
+        segment.flush()
+        if self.fsync:
+            os.fsync(segment.fileno())
+
+    async def flush(self) -> None:
+        """Write all pending rows as multi-row inserts."""
+        async with self._lock:
+            if self._pending:
+                # Rotate so new rows go to a fresh segment while this one is written
+                async with self._segment_lock:
+                    assert self._segment_file is not None and self._segment_path is not None
+                    self._segment_file.close()
+                    self._unflushed.append((self._segment_path, self._pending))
+                    self._pending = []
+                    BUFFER_PENDING.set(0)
+                    self._open_segment()
+
+            still_unflushed = []
+            for path, rows in self._unflushed:
+                try:
+                    await self._insert(rows)
+                except Exception:
+                    logger.exception("Attempt buffer flush failed; keeping %s", path.name)
+                    BUFFER_FLUSHES.inc(outcome="error")
+                    still_unflushed.append((path, rows))
+                    continue
+                BUFFER_FLUSHES.inc(outcome="ok")
+                BUFFER_FLUSH_ROWS.observe(len(rows))
+                path.unlink(missing_ok=True)
+            self._unflushed = still_unflushed
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        db = self.db_factory()
+        for start in range(0, len(rows), self.max_rows):
+            chunk = rows[start : start + self.max_rows]
+            query = db.table("drill_attempts").upsert(
+                chunk, on_conflict="id", ignore_duplicates=True
+            )
+            await asyncio.to_thread(query.execute)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.max_delay_seconds)
+            if self._pending or self._unflushed:
+                await self.flush()
+
+    def _open_segment(self) -> None:
+        self._segment_seq += 1
+        self._segment_path = self.spill_dir / (
+            f"attempts-{time.time_ns()}-{os.getpid()}-{self._segment_seq}.jsonl"
+        )
+        segment = open(self._segment_path, "a", encoding="utf-8")
+        # Held while this process appends; released when the segment is rotated
+        fcntl.flock(segment, fcntl.LOCK_EX)
+        self._segment_file = segment
+
+
+_buffer: AttemptWriteBuffer | None = None
+
+
+def get_attempt_buffer() -> AttemptWriteBuffer | None:
+    """The process-wide buffer, or None when write-behind is disabled."""
+    return _buffer
+
+
+async def start_attempt_buffer(db_factory: Callable[[], Client]) -> None:
+    """Create and start the process-wide buffer if write-behind is enabled."""
+    global _buffer
+    if not settings.attempt_write_behind_enabled or _buffer is not None:
+        return
+    _buffer = AttemptWriteBuffer(
+        db_factory=db_factory,
+        spill_dir=settings.attempt_buffer_spill_dir,
+        max_rows=settings.attempt_buffer_max_rows,
+        max_delay_seconds=settings.attempt_buffer_max_delay_seconds,
+        fsync=settings.attempt_buffer_fsync,
+    )
+    await _buffer.start()
+
+
+async def stop_attempt_buffer() -> None:
+    """Flush and stop the process-wide buffer."""
+    global _buffer
+    if _buffer is not None:
+        await _buffer.close()
+        _buffer = None
@@ -0,0 +1,321 @@
+"""
+Content Snapshot
+
+Responsibility: Serves tracks, units and drills from memory. Content only
+changes when scripts/seed_content.py runs, so the whole graph is loaded
+at startup into an immutable, indexed snapshot:
+
+- tracks by slug
+- units by (track_id, order_index) and by id
+- drills by id and by (unit_id, slug)
+
+Every request reads the current snapshot without touching the database.
+At most every settings.content_version_check_seconds, a request triggers a
+background check of content_version (migration 006, bumped by triggers on
+the content tables). If it changed, a new snapshot is built and swapped in
+with a single assignment; requests keep using the old one meanwhile
+(stale-while-revalidate).
+
+Each snapshot carries a hash of its content, used as the ETag for the
+content endpoints (see core/http_cache.py). It is stable across restarts
+and workers serving the same content.
+
+The content endpoints' default responses are serialized once, while the
+snapshot is built off the request path, and served as stored bytes
+(snapshot.rendered), including gzip and brotli variants of large bodies.
+Rendering builds the response models, so every content row is validated
+once per snapshot rather than per request.
+
+Snapshot rows are shared between requests; callers that need to modify a
+row must copy it first.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import settings
+from app.core.fieldsets import project
+from app.core.metrics import registry
+from app.core.responses import Encoded, type_adapter
+from app.models.drill import DRILL_FIELDS, DrillSummary, DrillView
+from app.models.track import (
+    Track,
+    TrackBundle,
+    TrackSummary,
+    Unit,
+    UnitBundle,
+    UnitWithDrillCount,
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per request
+
+SNAPSHOT_VERSION = registry.gauge(
+    "content_snapshot_version", "content_version of the snapshot being served"
+)
+SNAPSHOT_REFRESHES = registry.counter(
+    "content_snapshot_refreshes_total", "Content snapshot reloads by outcome", ("outcome",)
+)
+
+Row = Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class ContentSnapshot:
+    """Immutable, indexed copy of all learning content."""
+
+    version: int
+    content_hash: str  # Changes whenever any content row changes
+    tracks: tuple[Row, ...]  # Ordered by title
+    tracks_by_slug: Mapping[str, Row]
+    units_by_id: Mapping[str, Row]
+    units_by_track: Mapping[str, tuple[Row, ...]]  # Ordered by order_index
+    unit_by_position: Mapping[tuple[str, int], Row]  # (track_id, order_index)
+    drills: tuple[Row, ...]  # Ordered by created_at
+    drills_by_id: Mapping[str, Row]
+    drills_by_unit: Mapping[str, tuple[Row, ...]]  # Ordered by slug
+    drill_by_unit_slug: Mapping[tuple[str, str], Row]
+    # Serialized default responses (JSON and MessagePack), keyed by render_key()
+    rendered: Mapping[tuple[str, ...], Encoded] = field(
+        default_factory=lambda: MappingProxyType({}), repr=False
+    )
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        tracks: list[dict[str, Any]],
+        units: list[dict[str, Any]],
+        drills: list[dict[str, Any]],
+    ) -> "ContentSnapshot":
+        """Index raw table rows into a snapshot."""
+        freeze = MappingProxyType
+
+        units_by_track: dict[str, list[Row]] = {}
+        for unit in sorted(units, key=lambda u: u["order_index"]):
+            units_by_track.setdefault(unit["track_id"], []).append(unit)
+
+        drills_by_unit: dict[str, list[Row]] = {}
+        for drill in sorted(drills, key=lambda d: d["slug"]):
+            drills_by_unit.setdefault(drill["unit_id"], []).append(drill)
+
+        digest = hashlib.blake2b(digest_size=12)
+        for rows in (tracks, units, drills):
+            for row in sorted(rows, key=lambda r: r["id"]):
+                digest.update(json.dumps(row, sort_keys=True, default=str).encode())
+            digest.update(b"\0")
+
+        snapshot = cls(
+            version=version,
+            content_hash=digest.hexdigest(),
+            tracks=tuple(sorted(tracks, key=lambda t: t["title"])),
+            tracks_by_slug=freeze({t["slug"]: t for t in tracks}),
+            units_by_id=freeze({u["id"]: u for u in units}),
+            units_by_track=freeze({k: tuple(v) for k, v in units_by_track.items()}),
+            unit_by_position=freeze({(u["track_id"], u["order_index"]): u for u in units}),
+            drills=tuple(sorted(drills, key=lambda d: d.get("created_at") or "")),
+            drills_by_id=freeze({d["id"]: d for d in drills}),
+            drills_by_unit=freeze({k: tuple(v) for k, v in drills_by_unit.items()}),
+            drill_by_unit_slug=freeze({(d["unit_id"], d["slug"]): d for d in drills}),
+        )
+        return replace(snapshot, rendered=freeze(render_content(snapshot)))
+
+    def unit_with_drill_count(self, unit: Row) -> UnitWithDrillCount:
+        """A unit as listed in a track, counted from the drill index."""
+        return UnitWithDrillCount(
+            id=unit["id"],
+            order_index=unit["order_index"],
+            title=unit["title"],
+            summary_markdown=unit["summary_markdown"],
+            drill_count=len(self.drills_by_unit.get(unit["id"], ())),
+        )
+
+    def track_bundle(self, track: Row) -> TrackBundle:
+        """A track with its ordered units and their drill summaries."""
+        units = [
+            UnitBundle(
+                **self.unit_with_drill_count(unit).model_dump(),
+                drills=[DrillSummary(**d) for d in self.drills_by_unit.get(unit["id"], ())],
+            )
+            for unit in self.units_by_track.get(track["id"], ())
+        ]
+        return TrackBundle(**track, units=units)
+
+
+def render_key(*parts: str | int) -> tuple[str, ...]:
+    """Key of a pre-serialized response, e.g. render_key("units", slug)."""
+    return tuple(str(part) for part in parts)
+
+
+def _dump(value: Any, response_model: Any, exclude_unset: bool = False) -> Encoded:
+    # Same JSON FastAPI's response_model serialization produces
+    body = type_adapter(response_model).dump_json(value, exclude_unset=exclude_unset)
+    return Encoded.from_json(body)
+
+
+def render_content(snapshot: ContentSnapshot) -> dict[tuple[str, ...], Encoded]:
+    """
+    Serialize every content endpoint's default response.
+
+    Keys mirror the routes: ("tracks",), ("track", slug), ("units", slug),
+    ("unit", slug, order_index), ("bundle", slug), ("unit_drills", unit_id)
+    and ("drill", unit_id, slug).
+    """
+    rendered = {
+        render_key("tracks"): _dump(
+            [TrackSummary(**t) for t in snapshot.tracks], list[TrackSummary]
+        )
+    }
+    for track in snapshot.tracks:
+        slug = track["slug"]
+        units = snapshot.units_by_track.get(track["id"], ())
+        rendered[render_key("track", slug)] = _dump(Track(**track), Track)
+        rendered[render_key("units", slug)] = _dump(
+            [snapshot.unit_with_drill_count(u) for u in units], list[UnitWithDrillCount]
+        )
+        rendered[render_key("bundle", slug)] = _dump(snapshot.track_bundle(track), TrackBundle)
+        for unit in units:
+            rendered[render_key("unit", slug, unit["order_index"])] = _dump(Unit(**unit), Unit)
+
+    for unit_id in snapshot.units_by_id:
+        drills = snapshot.drills_by_unit.get(unit_id, ())
+        rendered[render_key("unit_drills", unit_id)] = _dump(
+            [DrillSummary(**d) for d in drills], list[DrillSummary]
+        )
+        for drill in drills:
+            rendered[render_key("drill", unit_id, drill["slug"])] = _dump(
+                DrillView(**project(drill, DRILL_FIELDS.default)), DrillView, exclude_unset=True
+            )
+    return rendered
+
+
+def fetch_content_version(db: Client) -> int:
+    """Current content_version, or 0 if the migration hasn't been applied."""
+    response = db.table("content_version").select("version").limit(1).execute()
+    return response.data[0]["version"] if response.data else 0
+
+
+def _fetch_all(db: Client, table: str) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    while True:
+        page = (
+            db.table(table)
+            .select("*")
+            .order("id")
+            .range(len(rows), len(rows) + PAGE_SIZE - 1)
+            .execute()
+        ).data
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def load_snapshot(db: Client) -> ContentSnapshot:
+    """Read the full content graph from the database."""
+    # Read the version first: a concurrent seed then only makes us reload again
+    version = fetch_content_version(db)
+    return ContentSnapshot.build(
+        version=version,
+        tracks=_fetch_all(db, "tracks"),
+        units=_fetch_all(db, "units"),
+        drills=_fetch_all(db, "drills"),
+    )
+
+
+class ContentStore:
+    """Holds the current snapshot and revalidates it in the background."""
+
+    def __init__(
+        self,
+        db_factory: Callable[[], Client],
+        check_interval_seconds: float = 30.0,
+    ):
+        """Initialize an empty store; call load() at startup."""
+        self.db_factory = db_factory
+        self.check_interval_seconds = check_interval_seconds
+        self._snapshot: ContentSnapshot | None = None
+        self._checked_at = 0.0
+        self._refresh: asyncio.Task | None = None
+
+    async def load(self) -> ContentSnapshot:
+        """Load (or reload) the snapshot, blocking until it is in place."""
+        snapshot = await asyncio.to_thread(load_snapshot, self.db_factory())
+        self._swap(snapshot)
+        return snapshot
+
+    async def current(self) -> ContentSnapshot | None:
+        """
+        The snapshot to serve this request from, or None if none is loaded.
+
+        Never waits on the database; schedules a background revalidation
+        when the last version check is older than the check interval.
+        A coroutine so it always runs on the event loop the refresh task
+        is scheduled on.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval_seconds and (
+            self._refresh is None or self._refresh.done()
+        ):
+            self._refresh = asyncio.get_running_loop().create_task(self._revalidate())
+            self._checked_at = now
+        return self._snapshot
+
+    async def _revalidate(self) -> None:
+        try:
+            db = self.db_factory()
+            version = await asyncio.to_thread(fetch_content_version, db)
+            if self._snapshot is not None and version == self._snapshot.version:
+                return
+            self._swap(await asyncio.to_thread(load_snapshot, db))
+        except Exception:
+            # Keep serving the previous snapshot; the next check retries
+            logger.exception("Content snapshot refresh failed")
+            SNAPSHOT_REFRESHES.inc(outcome="error")
+
+    def _swap(self, snapshot: ContentSnapshot) -> None:
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        SNAPSHOT_VERSION.set(snapshot.version)
+        SNAPSHOT_REFRESHES.inc(outcome="ok")
+
+
+_store: ContentStore | None = None
+
+
+def get_content_store() -> ContentStore | None:
+    """The process-wide store, or None when snapshots are disabled."""
+    return _store
+
+
+async def get_content_snapshot() -> ContentSnapshot | None:
+    """
+    Dependency: current snapshot, or None to fall back to the database.
+
+    Async so FastAPI runs it on the event loop rather than the threadpool,
+    where the background refresh couldn't be scheduled.
+    """
+    return await _store.current() if _store else None
+
+
+async def start_content_store(db_factory: Callable[[], Client]) -> None:
+    """Create the store and load the first snapshot at startup."""
+    global _store
+    if not settings.content_snapshot_enabled or _store is not None:
+        return
+    _store = ContentStore(db_factory, settings.content_version_check_seconds)
+    try:
+        await _store.load()
+    except Exception:
+        # Serve from the database until a background refresh succeeds
+        logger.exception("Initial content snapshot load failed")
+        SNAPSHOT_REFRESHES.inc(outcome="error")
@@ -0,0 +1,78 @@
+"""
+Drill Cache
+
+Responsibility: Keeps drill rows (prompt, rubric, type) in memory so the
+attempt submission path doesn't pay a database round trip for content
+that only changes when seed_content.py runs.
+
+Entries expire after settings.drill_cache_ttl_seconds, which bounds how
+long a re-seeded rubric can be served stale.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+from supabase import Client
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+DRILL_CACHE_LOOKUPS = registry.counter(
+    "drill_cache_lookups_total", "Drill cache lookups by outcome", ("outcome",)
+)
+
+
+class DrillCache:
+    """In-process TTL cache of drill rows keyed by drill ID."""
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 5000):
+        """Initialize an empty cache."""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, dict[str, Any]]] = {}
+
+    async def get(self, db: Client, drill_id: str) -> dict[str, Any] | None:
+        """
+        Return a drill row, loading it from the database on a miss.
+
+        Returns:
+            The drill row, or None if no such drill exists (not cached)
+        """
+        entry = self._entries.get(drill_id)
+        now = time.monotonic()
+        if entry and entry[0] > now:
+            DRILL_CACHE_LOOKUPS.inc(outcome="hit")
+            return entry[1]
+
+        DRILL_CACHE_LOOKUPS.inc(outcome="miss")
+        # The Supabase client is synchronous; keep it off the event loop
+        response = await asyncio.to_thread(
+            lambda: db.table("drills").select("*").eq("id", drill_id).execute()
+        )
+        if not response.data:
+            return None
+
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        drill = response.data[0]
+        self._entries[drill_id] = (now + self.ttl_seconds, drill)
+        return drill
+
+    def invalidate(self, drill_id: str | None = None) -> None:
+        """Drop one drill, or everything when no ID is given."""
+        if drill_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(drill_id, None)
+
+
+_cache: DrillCache | None = None
+
+
+def get_drill_cache() -> DrillCache:
+    """Process-wide drill cache."""
+    global _cache
+    if _cache is None:
+        _cache = DrillCache(ttl_seconds=settings.drill_cache_ttl_seconds)
+    return _cache
@@ -0,0 +1,277 @@
+"""
+Near-Duplicate Response Index
+
+Responsibility: Reuses grades across near-identical responses to the same
+drill, so a pasted textbook answer is graded by the model once rather
+than once per student.
+
+Each AI-graded response is fingerprinted with a 64-bit SimHash over its
+stemmed content terms and bigrams. A new response whose fingerprint is
+within `max_hamming` bits of a graded one for the same drill and rubric
+reuses that grade. Lookups are banded: the fingerprint is split into
+`max_hamming + 1` bands, and any match within the threshold must agree
+exactly on at least one band.
+
+A sample of hits (settings.duplicate_audit_rate) is still sent to the
+model; the fresh grade is returned and compared with the cached one to
+measure agreement.
+"""
+
+import hashlib
+import json
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import pairwise
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.pregrader import content_terms
+
+FINGERPRINT_BITS = 64
+
+DUPLICATE_LOOKUPS = registry.counter(
+    "grading_duplicate_lookups_total",
+    "Near-duplicate lookups by outcome (hit, miss, audit, skipped)",
+    ("drill_type", "outcome"),
+)
+DUPLICATE_AUDITS = registry.counter(
+    "grading_duplicate_audits_total",
+    "Audited duplicate hits by whether the model agreed with the reused grade",
+    ("drill_type", "agreed"),
+)
+
+
+def _feature_hash(feature: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(terms: list[str]) -> int:
+    """64-bit SimHash of a term list, weighted by term frequency."""
+    features = terms + [f"{a} {b}" for a, b in pairwise(terms)]
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+def rubric_version(rubric: dict[str, Any]) -> str:
+    """Short digest of a rubric; grades never cross rubric edits."""
+    encoded = json.dumps(rubric, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def _cacheable(grade: dict[str, Any]) -> dict[str, Any]:
+    # Usage and follow-ups belong to the original call, not the grade
+    return {k: v for k, v in grade.items() if k not in ("usage", "follow_up_question")}
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """A previously graded response close enough to reuse."""
+
+    fingerprint: int
+    distance: int
+    grade: dict[str, Any]
+    audit: bool
+
+
+class _DrillIndex:
+    """Fingerprints and grades for one drill + rubric version."""
+
+    def __init__(self, bands: int, max_entries: int):
+        self.bands = bands
+        self.max_entries = max_entries
+        self.grades: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self.buckets: list[dict[int, set[int]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        width = FINGERPRINT_BITS // self.bands
+        mask = (1 << width) - 1
+        # The last band absorbs any leftover bits
+        keys = [(fingerprint >> (i * width)) & mask for i in range(self.bands - 1)]
+        keys.append(fingerprint >> ((self.bands - 1) * width))
+        return keys
+
+    def candidates(self, fingerprint: int) -> set[int]:
+        found: set[int] = set()
+        for bucket, key in zip(self.buckets, self._band_keys(fingerprint), strict=True):
+            found |= bucket.get(key, set())
+        return found
+
+    def add(self, fingerprint: int, grade: dict[str, Any]) -> None:
+        if fingerprint in self.grades:
+            self.grades.move_to_end(fingerprint)
+            self.grades[fingerprint] = grade
+            return
+
+        self.grades[fingerprint] = grade
+        for bucket, key in zip(self.buckets, self._band_keys(fingerprint), strict=True):
+            bucket.setdefault(key, set()).add(fingerprint)
+
+        # Evict the least recently used entry once the drill is full
+        if len(self.grades) > self.max_entries:
+            evicted, _ = self.grades.popitem(last=False)
+            for bucket, key in zip(self.buckets, self._band_keys(evicted), strict=True):
+                bucket[key].discard(evicted)
+                if not bucket[key]:
+                    del bucket[key]
+
+
+class DuplicateIndex:
+    """
+    In-memory per-drill index of graded responses.
+
+    Grades are keyed by drill and rubric version, so editing a rubric
+    naturally invalidates everything graded against the old one.
+    """
+
+    def __init__(
+        self,
+        max_hamming: int = 3,
+        min_content_words: int = 12,
+        audit_rate: float = 0.05,
+        agreement_tolerance: float = 0.1,
+        max_entries_per_drill: int = 1000,
+        rng: random.Random | None = None,
+    ):
+        """Initialize the index with match and audit thresholds."""
+        self.max_hamming = max_hamming
+        self.min_content_words = min_content_words
+        self.audit_rate = audit_rate
+        self.agreement_tolerance = agreement_tolerance
+        self.max_entries_per_drill = max_entries_per_drill
+        self._rng = rng or random.Random()
+        self._drills: dict[tuple[str, str], _DrillIndex] = {}
+
+    @classmethod
+    def from_settings(cls) -> "DuplicateIndex":
+        """Build an index using thresholds from application settings."""
+        return cls(
+            max_hamming=settings.duplicate_max_hamming,
+            min_content_words=settings.duplicate_min_content_words,
+            audit_rate=settings.duplicate_audit_rate,
+            agreement_tolerance=settings.duplicate_agreement_tolerance,
+            max_entries_per_drill=settings.duplicate_max_entries_per_drill,
+        )
+
+    def fingerprint(self, user_response: str) -> int | None:
+        """Fingerprint a response, or None if it is too short to match safely."""
+        terms = content_terms(user_response)
+        if len(terms) < self.min_content_words:
+            return None
+        return simhash(terms)
+
+    def lookup(
+        self,
+        drill_id: str,
+        rubric: dict[str, Any],
+        user_response: str,
+        drill_type: str = "",
+    ) -> DuplicateMatch | None:
+        """
+        Find a graded near-duplicate of a response.
+
+        Returns:
+            The closest match within the threshold (flagged for audit when
+            sampled), or None
+        """
+        fingerprint = self.fingerprint(user_response)
+        if fingerprint is None:
+            DUPLICATE_LOOKUPS.inc(drill_type=drill_type, outcome="skipped")
+            return None
+
+        index = self._drills.get((drill_id, rubric_version(rubric)))
+        best = None
+        if index:
+            for candidate in index.candidates(fingerprint):
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= self.max_hamming and (best is None or distance < best[0]):
+                    best = (distance, candidate)
+
+        if index is None or best is None:
+            DUPLICATE_LOOKUPS.inc(drill_type=drill_type, outcome="miss")
+            return None
+
+        distance, candidate = best
+        index.grades.move_to_end(candidate)
+        audit = self._rng.random() < self.audit_rate
+        DUPLICATE_LOOKUPS.inc(drill_type=drill_type, outcome="audit" if audit else "hit")
+        return DuplicateMatch(
+            fingerprint=candidate,
+            distance=distance,
+            grade=index.grades[candidate],
+            audit=audit,
+        )
+
+    def add(
+        self,
+        drill_id: str,
+        rubric: dict[str, Any],
+        user_response: str,
+        grade: dict[str, Any],
+    ) -> None:
+        """Remember a model-produced grade for future lookups."""
+        fingerprint = self.fingerprint(user_response)
+        if fingerprint is None:
+            return
+
+        key = (drill_id, rubric_version(rubric))
+        if key not in self._drills:
+            self._drills[key] = _DrillIndex(
+                bands=self.max_hamming + 1, max_entries=self.max_entries_per_drill
+            )
+        self._drills[key].add(fingerprint, _cacheable(grade))
+
+    def record_audit(
+        self,
+        drill_id: str,
+        rubric: dict[str, Any],
+        match: DuplicateMatch,
+        fresh_grade: dict[str, Any],
+        drill_type: str = "",
+    ) -> bool:
+        """
+        Compare an audited match with the model's fresh grade.
+
+        Agreement means the normalized scores differ by no more than
+        agreement_tolerance. The fresh grade replaces the cached one
+        either way, since the model is the source of truth.
+        """
+        max_score = fresh_grade.get("max_score") or match.grade.get("max_score") or 0
+        if max_score:
+            delta = abs(fresh_grade.get("total_score", 0) - match.grade.get("total_score", 0))
+            agreed: bool = delta / max_score <= self.agreement_tolerance
+        else:
+            agreed = True
+
+        DUPLICATE_AUDITS.inc(drill_type=drill_type, agreed=str(agreed).lower())
+        index = self._drills.get((drill_id, rubric_version(rubric)))
+        if index:
+            index.add(match.fingerprint, _cacheable(fresh_grade))
+        return agreed
+
+
+_index: DuplicateIndex | None = None
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Process-wide index shared by every request."""
+    global _index
+    if _index is None:
+        _index = DuplicateIndex.from_settings()
+    return _index
@@ -5,8 +5,15 @@ Responsibility: Handles drill response grading logic.
 Coordinates between rubric evaluation and OpenAI scoring.
 """
 
+import asyncio
+from contextlib import nullcontext
 from typing import Any
-from app.services.openai_client import OpenAIClient
+from app.core.config import settings
+from app.services.duplicate_index import DuplicateIndex
+from app.services.grading_scheduler import FairGradingScheduler
+from app.services.openai_client import OpenAIClient, merge_follow_up_usage
+from app.services.pregrader import PreGrader
+from app.services.quiz_grader import grade_quiz_response
 
 
 class GradingService:
@@ -15,15 +22,29 @@ class GradingService:
 
     Grading flow:
     1. Receive user response and drill rubric
-    2. Call OpenAI to evaluate against rubric criteria
-    3. Calculate total score and mastery impact
-    4. Generate improvement suggestions
-    5. Return structured feedback
+    2. Grade quiz drills locally against their answer key
+    3. Short-circuit confidently failing answers locally (pre-grader)
+       and reuse grades of near-duplicate responses (duplicate index)
+    4. Call OpenAI to evaluate against rubric criteria, generating the
+       follow-up question concurrently so latency is max(grade, follow-up);
+       AI calls wait for a per-user fair-share slot (grading scheduler)
+    5. Calculate total score and mastery impact
+    6. Generate improvement suggestions
+    7. Return structured feedback
     """
 
-    def __init__(self, openai_client: OpenAIClient):
+    def __init__(
+        self,
+        openai_client: OpenAIClient,
+        pregrader: PreGrader | None = None,
+        duplicate_index: DuplicateIndex | None = None,
+        scheduler: FairGradingScheduler | None = None,
+    ):
         """Initialize grading service with dependencies."""
         self.openai_client = openai_client
+        self.pregrader = pregrader
+        self.duplicate_index = duplicate_index
+        self.scheduler = scheduler
 
     async def grade_drill_response(
         self,
@@ -32,6 +53,9 @@ class GradingService:
         rubric: dict[str, Any],
         user_response: str,
         drill_type: str,
+        estimated_minutes: int | None = None,
+        user_id: str = "",
+        priority: str = "interactive",
     ) -> dict[str, Any]:
         """
         Grade a user's response to a drill.
@@ -42,17 +66,52 @@ class GradingService:
             rubric: The grading rubric
             user_response: The user's submitted answer
             drill_type: Type of drill (explain, debug, quiz)
+            estimated_minutes: Drill effort estimate, bounds the AI prompt size
+            user_id: Submitting user, for fair scheduling of AI calls
+            priority: "interactive" or "batch" scheduling class
 
         Returns:
             Structured feedback with scores and suggestions
+
+        Raises:
+            GradingRejected: If the scheduler has no room for this user's AI call
         """
-        # Call OpenAI to evaluate the response
-        ai_feedback = await self.openai_client.grade_response(
-            prompt=prompt,
-            rubric=rubric,
-            user_response=user_response,
-            drill_type=drill_type,
-        )
+        grader = "ai"
+
+        # Quiz answers are short by design, so only free-text drills are pre-graded
+        pregrade = None
+        if self.pregrader and drill_type != "quiz":
+            pregrade = self.pregrader.evaluate(rubric, user_response)
+
+        if drill_type == "quiz" and rubric.get("answer_key"):
+            ai_feedback = grade_quiz_response(rubric, user_response)
+            grader = "quiz"
+        elif self.pregrader and pregrade and pregrade.short_circuit:
+            ai_feedback = self.pregrader.build_feedback(rubric, pregrade)
+            grader = "pregrader"
+        else:
+            duplicate = None
+            if self.duplicate_index:
+                duplicate = self.duplicate_index.lookup(
+                    drill_id, rubric, user_response, drill_type
+                )
+
+            if duplicate and not duplicate.audit:
+                ai_feedback = {**duplicate.grade, "follow_up_question": None}
+                grader = "duplicate"
+            else:
+                # Call OpenAI to evaluate the response, holding a fair-share slot
+                slot = self.scheduler.slot(user_id, priority) if self.scheduler else nullcontext()
+                async with slot:
+                    ai_feedback = await self._grade_with_follow_up(
+                        drill_id, prompt, rubric, user_response, drill_type, estimated_minutes
+                    )
+                if duplicate and self.duplicate_index:
+                    self.duplicate_index.record_audit(
+                        drill_id, rubric, duplicate, ai_feedback, drill_type
+                    )
+                elif self.duplicate_index:
+                    self.duplicate_index.add(drill_id, rubric, user_response, ai_feedback)
 
         # Return structured feedback
         return {
@@ -64,8 +123,63 @@ class GradingService:
             "strengths": ai_feedback.get("strengths", []),
             "improvements": ai_feedback.get("improvements", []),
             "follow_up_question": ai_feedback.get("follow_up_question"),
+            "grader": grader,
+            "usage": ai_feedback.get("usage"),
+            "pregrade_reason": pregrade.reason if pregrade else None,
         }
 
+    async def _grade_with_follow_up(
+        self,
+        drill_id: str,
+        prompt: str,
+        rubric: dict[str, Any],
+        user_response: str,
+        drill_type: str,
+        estimated_minutes: int | None,
+    ) -> dict[str, Any]:
+        """Run AI grading and follow-up generation side by side."""
+        follow_up = None
+        follow_up_usage: dict[str, Any] = {}
+        if settings.follow_up_enabled:
+            follow_up = asyncio.create_task(
+                self.openai_client.generate_follow_up(
+                    prompt=prompt,
+                    rubric=rubric,
+                    user_response=user_response,
+                    drill_type=drill_type,
+                    drill_id=drill_id,
+                    usage=follow_up_usage,
+                )
+            )
+
+        try:
+            ai_feedback = await self.openai_client.grade_response(
+                prompt=prompt,
+                rubric=rubric,
+                user_response=user_response,
+                drill_type=drill_type,
+                drill_id=drill_id,
+                estimated_minutes=estimated_minutes,
+            )
+        except BaseException:
+            # No grade means no attempt; don't pay for an orphaned follow-up
+            if follow_up:
+                follow_up.cancel()
+            raise
+
+        if follow_up:
+            # The follow-up is optional: wait briefly, never hold the grade hostage
+            try:
+                ai_feedback["follow_up_question"] = await asyncio.wait_for(
+                    follow_up, timeout=settings.follow_up_grace_seconds
+                )
+            except TimeoutError:
+                ai_feedback["follow_up_question"] = None
+
+        if follow_up_usage and ai_feedback.get("usage"):
+            ai_feedback["usage"] = merge_follow_up_usage(ai_feedback["usage"], follow_up_usage)
+        return ai_feedback
+
     def calculate_mastery_delta(
         self,
         current_mastery: int,
@@ -0,0 +1,229 @@
+"""
+Grading Scheduler
+
+Responsibility: Shares a worker's AI grading capacity fairly between users,
+so one user scripting submissions cannot starve everyone else.
+
+- A fixed number of AI grading calls run at once (grading_max_concurrency)
+- Each user may have at most grading_max_in_flight_per_user calls running
+  or queued; extra requests are rejected with a Retry-After hint
+- Waiting requests are served by priority class first (interactive before
+  batch), then by weighted fair queuing across users: each request gets a
+  virtual finish tag, so a user with many queued requests is interleaved
+  with other users instead of served back to back
+
+Only AI calls take a slot; quiz and pre-graded answers never queue.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+PRIORITIES = ("interactive", "batch")
+
+QUEUE_DEPTH = registry.gauge(
+    "grading_queue_depth", "Grading requests waiting for a slot", ("priority",)
+)
+IN_FLIGHT = registry.gauge(
+    "grading_in_flight", "AI grading calls currently holding a slot"
+)
+QUEUE_WAIT = registry.histogram(
+    "grading_queue_wait_seconds", "Time spent waiting for a grading slot", ("priority",)
+)
+REJECTIONS = registry.counter(
+    "grading_rejections_total", "Grading requests rejected by the scheduler", ("priority", "reason")
+)
+
+
+class GradingRejected(Exception):
+    """Raised when a grading request is over its user's or the worker's limit."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Grading request rejected ({reason}), retry in {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    finish_tag: float
+    seq: int
+    start_tag: float = field(compare=False)
+    user_id: str = field(compare=False)
+    priority: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class FairGradingScheduler:
+    """Per-user limits plus weighted fair queuing in front of the AI grader."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_in_flight_per_user: int = 2,
+        max_queue_depth: int = 200,
+        weights: dict[str, float] | None = None,
+    ):
+        """Initialize the scheduler with capacity limits and optional user weights."""
+        self.max_concurrency = max_concurrency
+        self.max_in_flight_per_user = max_in_flight_per_user
+        self.max_queue_depth = max_queue_depth
+        self.weights = weights or {}
+
+        self._running = 0
+        self._queue: list[_Waiter] = []
+        self._per_user: dict[str, int] = defaultdict(int)  # Running + queued
+        self._last_finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        # Smoothed slot hold time, used for Retry-After hints
+        self._avg_service_seconds = 2.0
+
+    @classmethod
+    def from_settings(cls) -> "FairGradingScheduler":
+        """Build a scheduler using limits from application settings."""
+        return cls(
+            max_concurrency=settings.grading_max_concurrency,
+            max_in_flight_per_user=settings.grading_max_in_flight_per_user,
+            max_queue_depth=settings.grading_max_queue_depth,
+        )
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued request would get a slot."""
+        waves = (self.queued + self._running) / self.max_concurrency
+        return max(1.0, waves * self._avg_service_seconds)
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, priority: str = "interactive") -> AsyncIterator[None]:
+        """
+        Hold one grading slot for the duration of the block.
+
+        Raises:
+            GradingRejected: If the user is at their limit or the queue is full
+        """
+        await self.acquire(user_id, priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * elapsed
+            self.release(user_id)
+
+    async def acquire(self, user_id: str, priority: str = "interactive") -> None:
+        """Wait for a grading slot; see slot()."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown grading priority: {priority}")
+
+        if self._per_user.get(user_id, 0) >= self.max_in_flight_per_user:
+            REJECTIONS.inc(priority=priority, reason="user_limit")
+            # The user's own in-flight call finishing frees their next slot
+            raise GradingRejected("user_limit", max(1.0, self._avg_service_seconds))
+
+        if self._running < self.max_concurrency and not self._queue:
+            self._start(user_id)
+            QUEUE_WAIT.observe(0.0, priority=priority)
+            return
+
+        if self.queued >= self.max_queue_depth:
+            REJECTIONS.inc(priority=priority, reason="queue_full")
+            raise GradingRejected("queue_full", self.retry_after())
+
+        waiter = self._enqueue(user_id, priority)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self.release(user_id)
+            else:
+                self._forget(user_id)
+                if waiter in self._queue:
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                    QUEUE_DEPTH.dec(priority=priority)
+            raise
+        QUEUE_WAIT.observe(time.monotonic() - waiter.enqueued_at, priority=priority)
+
+    def release(self, user_id: str) -> None:
+        """Return a slot and hand it to the next waiter in fair order."""
+        self._running -= 1
+        IN_FLIGHT.dec()
+        self._forget(user_id)
+
+        while self._queue and self._running < self.max_concurrency:
+            waiter = heapq.heappop(self._queue)
+            QUEUE_DEPTH.dec(priority=waiter.priority)
+            if waiter.future.cancelled():
+                continue
+            # Start-time fair queuing: virtual time follows the request in service
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._running += 1
+            IN_FLIGHT.inc()
+            waiter.future.set_result(None)
+
+    def _forget(self, user_id: str) -> None:
+        self._per_user[user_id] -= 1
+        if self._per_user[user_id] <= 0:
+            del self._per_user[user_id]
+            # Tags at or behind virtual time carry no credit, so drop them
+            if self._last_finish.get(user_id, 0.0) <= self._virtual_time:
+                self._last_finish.pop(user_id, None)
+
+    def _start(self, user_id: str) -> None:
+        self._running += 1
+        self._per_user[user_id] += 1
+        IN_FLIGHT.inc()
+        # Idle users re-enter at the current virtual time, not with banked credit
+        start_tag = max(self._virtual_time, self._last_finish.get(user_id, 0.0))
+        self._virtual_time = start_tag
+        self._last_finish[user_id] = start_tag + 1 / self.weights.get(user_id, 1.0)
+
+    def _enqueue(self, user_id: str, priority: str) -> _Waiter:
+        start_tag = max(self._virtual_time, self._last_finish.get(user_id, 0.0))
+        finish_tag = start_tag + 1 / self.weights.get(user_id, 1.0)
+        self._last_finish[user_id] = finish_tag
+        self._per_user[user_id] += 1
+
+        waiter = _Waiter(
+            rank=PRIORITIES.index(priority),
+            finish_tag=finish_tag,
+            seq=next(self._seq),
+            start_tag=start_tag,
+            user_id=user_id,
+            priority=priority,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+        QUEUE_DEPTH.inc(priority=priority)
+        return waiter
+
+
+_scheduler: FairGradingScheduler | None = None
+
+
+def get_grading_scheduler() -> FairGradingScheduler:
+    """Process-wide scheduler; every request on this worker shares its capacity."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairGradingScheduler.from_settings()
+    return _scheduler
@@ -0,0 +1,142 @@
+"""
+Idempotency Store
+
+Responsibility: Makes retried POSTs safe. A request carrying an
+Idempotency-Key runs once; a replay of the same key returns the original
+result, and a duplicate that arrives while the original is still running
+waits for it instead of grading again.
+
+Only successful results are remembered (for settings.idempotency_ttl_seconds).
+If the original fails, the key is released so the client's next retry
+runs normally. Reusing a key with a different request body is rejected.
+
+The store is per process: retries routed to another worker are not
+deduplicated.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "idempotency_requests_total",
+    "Requests with an Idempotency-Key by outcome (new, replayed, joined, conflict)",
+    ("outcome",),
+)
+
+
+class IdempotencyKeyConflict(Exception):
+    """Raised when a key is reused for a different request."""
+
+
+def request_fingerprint(*parts: str) -> str:
+    """Digest of the request fields that must match for a replay."""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+@dataclass
+class _Entry[T]:
+    fingerprint: str
+    future: asyncio.Future
+    expires_at: float = float("inf")  # Set once the result is stored
+
+
+class IdempotencyStore[T]:
+    """In-memory idempotency keys with in-flight request coalescing."""
+
+    def __init__(self, ttl_seconds: float = 86400.0, max_entries: int = 10000):
+        """Initialize an empty store."""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry[T]] = OrderedDict()
+
+    async def run(
+        self, key: str, fingerprint: str, fn: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """
+        Run `fn` at most once per key.
+
+        Args:
+            key: Idempotency key, already scoped to the caller
+            fingerprint: request_fingerprint() of the request body
+            fn: Produces the result the first time the key is seen
+
+        Returns:
+            (result, replayed) - replayed is True if `fn` ran for an
+            earlier request
+
+        Raises:
+            IdempotencyKeyConflict: If the key was used for a different request
+        """
+        while True:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                IDEMPOTENCY_REQUESTS.inc(outcome="conflict")
+                raise IdempotencyKeyConflict(
+                    "Idempotency-Key was already used for a different request"
+                )
+
+            if entry.future.done() and not entry.future.cancelled():
+                IDEMPOTENCY_REQUESTS.inc(outcome="replayed")
+                return entry.future.result(), True
+
+            try:
+                result = await asyncio.shield(entry.future)
+            except asyncio.CancelledError:
+                if not entry.future.cancelled():
+                    raise  # This request was cancelled, not the original
+                # The original gave up; loop around and run it ourselves
+                continue
+            IDEMPOTENCY_REQUESTS.inc(outcome="joined")
+            return result, True
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        IDEMPOTENCY_REQUESTS.inc(outcome="new")
+        try:
+            result = await fn()
+        except BaseException as e:
+            # Failures aren't remembered; waiters see the error, later retries rerun
+            self._entries.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                entry.future.cancel()
+            else:
+                entry.future.set_exception(e)
+                entry.future.exception()  # Mark retrieved when nobody is waiting
+            raise
+
+        entry.future.set_result(result)
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        return result, False
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        # Entries are kept in start order and share one TTL, so stop at the first live one
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            expired = entry.expires_at <= now
+            over_capacity = len(self._entries) > self.max_entries and entry.future.done()
+            if not (expired or over_capacity):
+                break
+            del self._entries[key]
+
+
+_store: IdempotencyStore[Any] | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore[Any]:
+    """Process-wide store for attempt submissions."""
+    global _store
+    if _store is None:
+        _store = IdempotencyStore(ttl_seconds=settings.idempotency_ttl_seconds)
+    return _store
@@ -1,28 +1,134 @@
 """
 AI Client Service
 
-Responsibility: Wraps AI API interactions (currently using Google Gemini).
+Responsibility: Wraps AI API interactions behind a pluggable provider
+(Gemini, OpenAI-compatible HTTP, or a local stub; see ai_providers.py).
 All AI calls should go through this service.
 
 IMPORTANT: Frontend should NEVER call AI APIs directly.
 """
 
 import json
-from typing import Any
-import google.generativeai as genai
+import time
+from typing import Any, TypedDict
 from app.core.config import settings
+from app.core.metrics import DEFAULT_TOKEN_BUCKETS, registry
+from app.services.ai_providers import AIProvider, get_ai_provider
+from app.services.resilience import (
+    AIProviderError,
+    CallStats,
+    ResilientCaller,
+    get_follow_up_caller,
+    get_resilient_caller,
+)
+from app.services.token_budget import (
+    CHARS_PER_TOKEN,
+    ResponseTooLongError,
+    apply_response_budget,
+    estimate_tokens,
+    max_output_tokens,
+    response_token_budget,
+)
+
+# Grading instrumentation, labelled so slow or expensive rubrics stand out
+GRADING_LABELS = ("drill_type", "drill_id", "model")
+
+GRADING_CALLS = registry.counter(
+    "ai_grading_calls_total", "Grading calls by final outcome", GRADING_LABELS + ("outcome",)
+)
+PROVIDER_LATENCY = registry.histogram(
+    "ai_provider_latency_seconds", "Latency of individual provider calls", GRADING_LABELS
+)
+PROMPT_TOKENS = registry.histogram(
+    "ai_grading_prompt_tokens", "Prompt tokens per provider call", GRADING_LABELS, DEFAULT_TOKEN_BUCKETS
+)
+OUTPUT_TOKENS = registry.histogram(
+    "ai_grading_output_tokens", "Output tokens per provider call", GRADING_LABELS, DEFAULT_TOKEN_BUCKETS
+)
+PARSE_FAILURES = registry.counter(
+    "ai_grading_parse_failures_total", "Provider responses that were not valid JSON", GRADING_LABELS
+)
+RETRIES = registry.counter(
+    "ai_grading_retries_total", "Provider call retries", GRADING_LABELS
+)
+COST_USD = registry.counter(
+    "ai_grading_cost_usd_total", "Estimated provider spend in USD", GRADING_LABELS
+)
+BUDGET_ACTIONS = registry.counter(
+    "ai_grading_budget_actions_total",
+    "Responses truncated or rejected for exceeding their token budget",
+    GRADING_LABELS + ("action",),
+)
+FOLLOW_UP_CALLS = registry.counter(
+    "ai_follow_up_calls_total", "Follow-up question calls by outcome", GRADING_LABELS + ("outcome",)
+)
+OUTPUT_CAP_HITS = registry.counter(
+    "ai_grading_output_cap_hits_total",
+    "Provider calls whose output reached max_output_tokens",
+    GRADING_LABELS,
+)
+
+
+class GradingUsage(TypedDict):
+    """Token, latency and budget accounting for one grading call, across retries."""
+
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    latency_ms: int
+    estimated_prompt_tokens: int
+    max_output_tokens: int
+    response_truncated: bool
+
+
+def estimate_cost_usd(prompt_tokens: int, output_tokens: int) -> float:
+    """Estimated spend for one provider call using configured token prices."""
+    return (
+        prompt_tokens * settings.ai_prompt_cost_per_million_tokens
+        + output_tokens * settings.ai_output_cost_per_million_tokens
+    ) / 1_000_000
+
+
+def merge_follow_up_usage(usage: dict[str, Any], follow_up: dict[str, Any]) -> dict[str, Any]:
+    """
+    Fold follow-up token spend into an attempt's grading usage.
+
+    Token and cost totals include the follow-up so per-attempt spend (and
+    the grading_usage_daily view) is complete; the follow-up's share is kept
+    under "follow_up". Latency stays the grading call's: the two run
+    concurrently.
+    """
+    return {
+        **usage,
+        "prompt_tokens": usage["prompt_tokens"] + follow_up["prompt_tokens"],
+        "output_tokens": usage["output_tokens"] + follow_up["output_tokens"],
+        "cost_usd": round(usage["cost_usd"] + follow_up["cost_usd"], 6),
+        "follow_up": {**follow_up, "cost_usd": round(follow_up["cost_usd"], 6)},
+    }
+
+
+FOLLOW_UP_SYSTEM_PROMPT = """You are a systems engineering tutor.
+Given a drill and a student's answer, ask exactly one short follow-up
+question (under 30 words) that checks deeper understanding. Return only
+the question text."""
 
 
 class OpenAIClient:
     """
     Wrapper for AI API interactions.
-    Currently using Google Gemini for grading.
+    The provider is chosen by settings.ai_provider unless one is injected.
     """
 
-    def __init__(self):
-        """Initialize the Gemini client with API key from settings."""
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel(settings.ai_model)
+    def __init__(
+        self,
+        provider: AIProvider | None = None,
+        caller: ResilientCaller | None = None,
+        follow_up_caller: ResilientCaller | None = None,
+    ):
+        """Initialize the client with a provider and resilience policies."""
+        self.provider = provider or get_ai_provider()
+        self.caller = caller or get_resilient_caller()
+        self.follow_up_caller = follow_up_caller or get_follow_up_caller()
 
     async def grade_response(
         self,
@@ -30,6 +136,8 @@ class OpenAIClient:
         rubric: dict[str, Any],
         user_response: str,
         drill_type: str,
+        drill_id: str = "",
+        estimated_minutes: int | None = None,
     ) -> dict[str, Any]:
         """
         Grade a user's response to a drill using the provided rubric.
@@ -39,37 +147,96 @@ class OpenAIClient:
             rubric: The grading rubric with criteria
             user_response: The user's submitted response
             drill_type: Type of drill (explain, debug, quiz)
+            drill_id: The drill being graded (metrics label)
+            estimated_minutes: Drill effort estimate, sets the response token budget
 
         Returns:
-            Grading result with scores and feedback
+            Grading result with scores and feedback, plus a "usage" entry
+            with token counts, latency, retries and estimated cost
 
         Raises:
-            Exception: If AI API call fails
+            ResponseTooLongError: If the response is over budget and the policy is reject
+            CircuitOpenError: If the provider is failing and calls are short-circuited
+            AIProviderError: If the provider fails or times out after retries
         """
+        labels = {"drill_type": drill_type, "drill_id": drill_id, "model": self.provider.model}
         system_prompt = self._build_system_prompt(drill_type)
-        user_prompt = self._build_user_prompt(prompt, rubric, user_response)
+        output_cap = max_output_tokens(drill_type)
 
+        # Bound the input before sending: fit the response into the drill's budget
+        budget = response_token_budget(estimated_minutes)
         try:
-            # Combine system and user prompts for Gemini
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            
-            # Call Gemini API
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.3,  # Lower temperature for consistent grading
-                    response_mime_type="application/json",
-                ),
+            fitted_response, truncated = apply_response_budget(user_response, budget)
+        except ResponseTooLongError:
+            BUDGET_ACTIONS.inc(action="rejected", **labels)
+            raise
+        if truncated:
+            BUDGET_ACTIONS.inc(action="truncated", **labels)
+
+        user_prompt = self._build_user_prompt(prompt, rubric, fitted_response)
+
+        usage: GradingUsage = {
+            "model": self.provider.model,
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+            "latency_ms": 0,
+            "estimated_prompt_tokens": estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+            "max_output_tokens": output_cap,
+            "response_truncated": truncated,
+        }
+
+        async def call_model() -> dict[str, Any]:
+            started = time.perf_counter()
+            response = await self.provider.generate(
+                system_prompt,
+                user_prompt,
+                temperature=0.3,  # Lower temperature for consistent grading
+                max_output_tokens=output_cap,
             )
+            latency = time.perf_counter() - started
+
+            # Fall back to a rough estimate when the provider omits usage
+            prompt_tokens = response.prompt_tokens or (len(system_prompt) + len(user_prompt)) // 4
+            output_tokens = response.output_tokens or len(response.text) // 4
+
+            PROVIDER_LATENCY.observe(latency, **labels)
+            PROMPT_TOKENS.observe(prompt_tokens, **labels)
+            OUTPUT_TOKENS.observe(output_tokens, **labels)
+            COST_USD.inc(estimate_cost_usd(prompt_tokens, output_tokens), **labels)
+            if output_tokens >= output_cap:
+                OUTPUT_CAP_HITS.inc(**labels)
+
+            # Failed attempts still cost tokens, so usage accumulates across retries
+            usage["prompt_tokens"] += prompt_tokens
+            usage["output_tokens"] += output_tokens
+            usage["latency_ms"] += round(latency * 1000)
 
-            # Parse the JSON response
-            result = json.loads(response.text)
-            return result
+            try:
+                graded: dict[str, Any] = json.loads(response.text)
+            except json.JSONDecodeError:
+                # Invalid JSON is retried like any other failure
+                PARSE_FAILURES.inc(**labels)
+                raise
+            return graded
 
-        except Exception as e:
-            # Log error and re-raise for handling at service layer
-            print(f"AI API error: {e}")
+        stats = CallStats()
+        try:
+            result = await self.caller.call(call_model, stats)
+        except AIProviderError as e:
+            GRADING_CALLS.inc(outcome=type(e).__name__, **labels)
             raise
+        finally:
+            RETRIES.inc(stats.retries, **labels)
+
+        GRADING_CALLS.inc(outcome="ok", **labels)
+        result["usage"] = {
+            **usage,
+            "retries": stats.retries,
+            "cost_usd": round(
+                estimate_cost_usd(usage["prompt_tokens"], usage["output_tokens"]), 6
+            ),
+        }
+        return result
 
     def _build_system_prompt(self, drill_type: str) -> str:
         """Build the system prompt for the grading model."""
@@ -95,9 +262,11 @@ Always return valid JSON with this structure:
   "max_score": max_possible_int,
   "feedback": "detailed feedback string",
   "strengths": ["strength 1", "strength 2"],
-  "improvements": ["improvement 1", "improvement 2"],
-  "follow_up_question": "optional clarifying question or null"
-}"""
+  "improvements": ["improvement 1", "improvement 2"]
+}
+
+Be concise: keep "feedback" under 120 words and give at most 3 short
+strengths and 3 short improvements."""
 
         if drill_type == "explain":
             return base + """
@@ -155,13 +324,68 @@ Please evaluate this response and return your assessment as JSON."""
     async def generate_follow_up(
         self,
         prompt: str,
+        rubric: dict[str, Any],
         user_response: str,
-        feedback: dict,
+        drill_type: str,
+        drill_id: str = "",
+        usage: dict[str, Any] | None = None,
     ) -> str | None:
         """
         Generate an optional follow-up question based on the response.
 
-        TODO: Implement follow-up generation
+        Only needs the prompt and response, not the grade, so it can run
+        concurrently with grade_response. Failures are not fatal: the
+        attempt is still graded, just without a follow-up.
+
+        Args:
+            usage: Optional dict that accumulates prompt_tokens, output_tokens
+                and cost_usd across attempts, so the caller can add them to
+                the attempt's grading usage
+
+        Returns:
+            A single question, or None if generation failed
         """
-        # TODO: Implement
-        return None
+        labels = {"drill_type": drill_type, "drill_id": drill_id, "model": self.provider.model}
+
+        # A follow-up never needs more than the default response budget
+        fitted_response = user_response[: response_token_budget(None) * CHARS_PER_TOKEN]
+        hints = "\n".join(f"- {q}" for q in rubric.get("followup_questions", []))
+        user_prompt = f"""DRILL PROMPT:
+{prompt}
+
+STUDENT RESPONSE:
+{fitted_response}
+
+EXAMPLE FOLLOW-UP QUESTIONS:
+{hints or "- (none)"}
+
+Ask one short follow-up question that probes the weakest part of this response."""
+
+        usage = usage if usage is not None else {}
+        usage.update(prompt_tokens=0, output_tokens=0, cost_usd=0.0)
+
+        async def call_model() -> str:
+            response = await self.provider.generate(
+                FOLLOW_UP_SYSTEM_PROMPT,
+                user_prompt,
+                temperature=0.7,
+                max_output_tokens=settings.follow_up_max_output_tokens,
+                json_output=False,
+            )
+            prompt_tokens = response.prompt_tokens or 0
+            output_tokens = response.output_tokens or 0
+            cost = estimate_cost_usd(prompt_tokens, output_tokens)
+            COST_USD.inc(cost, **labels)
+            usage["prompt_tokens"] += prompt_tokens
+            usage["output_tokens"] += output_tokens
+            usage["cost_usd"] += cost
+            return response.text.strip()
+
+        try:
+            question = await self.follow_up_caller.call(call_model)
+        except AIProviderError as e:
+            FOLLOW_UP_CALLS.inc(outcome=type(e).__name__, **labels)
+            return None
+
+        FOLLOW_UP_CALLS.inc(outcome="ok", **labels)
+        return question or None
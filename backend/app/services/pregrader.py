@@ -0,0 +1,282 @@
+"""
+Pre-Grading Service
+
+Responsibility: Cheap local checks that run before any AI grading call.
+Catches empty, low-effort, gibberish and off-topic answers and returns a
+templated zero-score result instead of spending an LLM call on them.
+
+Signals are purely lexical:
+- TF-IDF cosine similarity against the rubric's expected_key_points
+  and model_answer_outline
+- Key point coverage (how many key points share at least one term)
+- Gibberish ratio (non-word tokens and heavy repetition)
+
+Only answers that fail confidently are short-circuited; anything borderline
+still goes to the AI grader.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+
+# Small English stopword list; technical terms are never included here
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing don't
+    down during each few for from further had has have having he her here hers
+    him his how i i'm if in into is it it's its itself just me more most my no
+    nor not of off on once only or other our out over own same she should so
+    some such than that the their them then there these they this those
+    through to too under until up very was we were what when where which while
+    who whom why will with would you your yours dont im ive
+    """.split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['_-][a-z0-9]+)*")
+_VOWELS = frozenset("aeiouy")
+_REPEATED_CHAR_RE = re.compile(r"(.)\1{3,}")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase and split text into word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _stem(token: str) -> str:
+    """Very light suffix stripping so 'creates' matches 'create'."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def content_terms(text: str) -> list[str]:
+    """Tokenize, drop stopwords and single characters, and stem."""
+    return [
+        _stem(token)
+        for token in tokenize(text)
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def _looks_like_word(token: str) -> bool:
+    """Heuristic check that a token is a real word, number or identifier."""
+    if any(ch.isdigit() for ch in token):
+        return True
+    if len(token) > 25 or _REPEATED_CHAR_RE.search(token):
+        return False
+    # Short tokens (fd, pid, ls) are often legitimate abbreviations
+    if len(token) <= 3:
+        return True
+    return any(ch in _VOWELS for ch in token)
+
+
+@dataclass(frozen=True)
+class PreGradeSignals:
+    """Lexical signals measured for a single response."""
+
+    content_words: int
+    reference_terms: int  # Content terms in the rubric's key points and outline
+    similarity: float
+    key_point_coverage: float
+    gibberish_ratio: float
+
+
+@dataclass(frozen=True)
+class PreGradeResult:
+    """Outcome of pre-grading a response."""
+
+    short_circuit: bool
+    reason: str | None
+    signals: PreGradeSignals
+
+
+class PreGrader:
+    """
+    Local pre-grading stage in front of the AI grader.
+
+    Thresholds are deliberately conservative; use
+    `python -m scripts.pregrader_report` to tune them against
+    historical attempts before tightening.
+    """
+
+    FEEDBACK_TEMPLATES = {
+        "empty": (
+            "We couldn't find an answer to grade. Try explaining the concept "
+            "in your own words."
+        ),
+        "low_effort": (
+            "This answer is too short to earn credit. Walk through the idea "
+            "step by step and explain why it works the way it does."
+        ),
+        "gibberish": (
+            "We couldn't read this as an explanation. Write a few full "
+            "sentences describing the concept."
+        ),
+        "off_topic": (
+            "This answer doesn't appear to address the question. Re-read the "
+            "prompt and focus on the concepts it asks about."
+        ),
+    }
+
+    def __init__(
+        self,
+        min_similarity: float = 0.04,
+        min_content_words: int = 4,
+        max_gibberish_ratio: float = 0.5,
+    ):
+        """Initialize the pre-grader with decision thresholds."""
+        self.min_similarity = min_similarity
+        self.min_content_words = min_content_words
+        self.max_gibberish_ratio = max_gibberish_ratio
+
+    @classmethod
+    def from_settings(cls) -> "PreGrader":
+        """Build a pre-grader using thresholds from application settings."""
+        return cls(
+            min_similarity=settings.pregrade_min_similarity,
+            min_content_words=settings.pregrade_min_content_words,
+            max_gibberish_ratio=settings.pregrade_max_gibberish_ratio,
+        )
+
+    def evaluate(self, rubric: dict[str, Any], user_response: str) -> PreGradeResult:
+        """
+        Measure a response and decide whether it can skip AI grading.
+
+        Args:
+            rubric: The drill's grading rubric
+            user_response: The user's submitted answer
+
+        Returns:
+            PreGradeResult with the decision, reason and raw signals
+        """
+        return self.decide(self.measure(rubric, user_response))
+
+    def measure(self, rubric: dict[str, Any], user_response: str) -> PreGradeSignals:
+        """Compute lexical signals for a response against a rubric."""
+        key_points = rubric.get("expected_key_points", [])
+        reference_docs = [
+            content_terms(doc)
+            for doc in key_points + rubric.get("model_answer_outline", [])
+        ]
+        response_terms = content_terms(user_response)
+        raw_tokens = [t for t in tokenize(user_response) if t not in STOPWORDS]
+
+        return PreGradeSignals(
+            content_words=len(response_terms),
+            reference_terms=sum(len(doc) for doc in reference_docs),
+            similarity=self._tfidf_similarity(response_terms, reference_docs),
+            key_point_coverage=self._key_point_coverage(
+                set(response_terms), reference_docs[: len(key_points)]
+            ),
+            gibberish_ratio=self._gibberish_ratio(raw_tokens),
+        )
+
+    def decide(self, signals: PreGradeSignals) -> PreGradeResult:
+        """Apply this pre-grader's thresholds to previously measured signals."""
+        if signals.reference_terms == 0:
+            # Nothing to compare against; every answer would look off-topic,
+            # so leave the decision to the AI grader
+            return PreGradeResult(short_circuit=False, reason=None, signals=signals)
+
+        reason = None
+
+        if signals.content_words == 0:
+            reason = "empty"
+        elif signals.gibberish_ratio > self.max_gibberish_ratio:
+            reason = "gibberish"
+        elif signals.key_point_coverage == 0:
+            if signals.content_words < self.min_content_words:
+                reason = "low_effort"
+            elif signals.similarity < self.min_similarity:
+                reason = "off_topic"
+
+        return PreGradeResult(
+            short_circuit=reason is not None,
+            reason=reason,
+            signals=signals,
+        )
+
+    def build_feedback(
+        self, rubric: dict[str, Any], result: PreGradeResult
+    ) -> dict[str, Any]:
+        """
+        Build a templated zero-score grading result.
+
+        Mirrors the shape returned by the AI grader so callers can treat
+        both paths identically.
+        """
+        criteria = rubric.get("criteria", [])
+
+        return {
+            "criterion_scores": {c["name"]: 0 for c in criteria},
+            "total_score": 0,
+            "max_score": sum(c["max_score"] for c in criteria),
+            "feedback": self.FEEDBACK_TEMPLATES[result.reason or "off_topic"],
+            "strengths": [],
+            "improvements": [c["description"] for c in criteria],
+            "follow_up_question": None,
+        }
+
+    @staticmethod
+    def _tfidf_similarity(
+        response_terms: list[str], reference_docs: list[list[str]]
+    ) -> float:
+        """Cosine similarity between the response and the rubric reference."""
+        if not response_terms or not reference_docs:
+            return 0.0
+
+        doc_count = len(reference_docs)
+        doc_freq: Counter[str] = Counter()
+        for doc in reference_docs:
+            doc_freq.update(set(doc))
+
+        def idf(term: str) -> float:
+            return math.log((doc_count + 1) / (doc_freq[term] + 1)) + 1
+
+        reference_tf = Counter(term for doc in reference_docs for term in doc)
+        response_tf = Counter(response_terms)
+
+        reference_vec = {t: tf * idf(t) for t, tf in reference_tf.items()}
+        response_vec = {t: tf * idf(t) for t, tf in response_tf.items()}
+
+        dot = sum(w * reference_vec.get(t, 0.0) for t, w in response_vec.items())
+        if dot == 0:
+            return 0.0
+
+        norm = math.sqrt(sum(w * w for w in response_vec.values())) * math.sqrt(
+            sum(w * w for w in reference_vec.values())
+        )
+        return dot / norm
+
+    @staticmethod
+    def _key_point_coverage(
+        response_terms: set[str], key_point_docs: list[list[str]]
+    ) -> float:
+        """Fraction of key points sharing at least one term with the response."""
+        if not key_point_docs:
+            return 0.0
+
+        covered = sum(1 for doc in key_point_docs if response_terms & set(doc))
+        return covered / len(key_point_docs)
+
+    @staticmethod
+    def _gibberish_ratio(tokens: list[str]) -> float:
+        """Share of tokens that look like noise, including heavy repetition."""
+        if not tokens:
+            return 0.0
+
+        non_words = sum(1 for t in tokens if not _looks_like_word(t))
+        ratio = non_words / len(tokens)
+
+        # "process process process process" is spam, not an explanation
+        if len(tokens) >= 4:
+            top_count = Counter(tokens).most_common(1)[0][1]
+            ratio = max(ratio, top_count / len(tokens))
+
+        return ratio
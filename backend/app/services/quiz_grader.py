@@ -0,0 +1,121 @@
+"""
+Quiz Grader
+
+Responsibility: Deterministic, in-process grading for quiz drills.
+Quiz drills carry a structured answer key in their rubric, so they never
+need an AI call. Results use the same shape as AI grading so the attempt
+and mastery flow is unchanged.
+"""
+
+import re
+import unicodedata
+from typing import Any
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_SELECTION_SPLIT_RE = re.compile(r"[\s,;/&]+|\band\b")
+_SELECTION_PREFIX_RE = re.compile(r"^(?:option|answer|choice)\s+")
+
+
+def normalize_answer(text: str) -> str:
+    """Casefold, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _parse_choice_selection(
+    user_response: str, choices: list[dict[str, Any]]
+) -> set[str] | None:
+    """
+    Resolve a response to a set of choice keys.
+
+    Accepts keys ("b", "(B)", "Option b", "a, c") or the full text of a
+    single choice. Returns None if the response can't be resolved.
+    """
+    keys = {choice["key"].casefold() for choice in choices}
+    normalized = _SELECTION_PREFIX_RE.sub("", normalize_answer(user_response))
+
+    parts = [p for p in _SELECTION_SPLIT_RE.split(normalized) if p]
+    if parts and all(p in keys for p in parts):
+        return set(parts)
+
+    for choice in choices:
+        if normalize_answer(choice["text"]) == normalized:
+            return {choice["key"].casefold()}
+
+    return None
+
+
+def is_correct(answer_key: dict[str, Any], user_response: str) -> bool:
+    """Check a response against a quiz answer key."""
+    match_mode = answer_key["match_mode"]
+    accepted = answer_key["accepted_answers"]
+
+    if match_mode == "choice":
+        selection = _parse_choice_selection(user_response, answer_key.get("choices", []))
+        return selection == {a.casefold() for a in accepted}
+
+    if match_mode == "exact":
+        return user_response.strip() in accepted
+
+    normalized = normalize_answer(user_response)
+    return any(normalize_answer(a) == normalized for a in accepted)
+
+
+def grade_quiz_response(rubric: dict[str, Any], user_response: str) -> dict[str, Any]:
+    """
+    Grade a quiz response locally.
+
+    Quizzes are all-or-nothing: a correct answer earns every criterion's
+    max score, an incorrect one earns zero.
+
+    Args:
+        rubric: Drill rubric containing an answer_key
+        user_response: The user's submitted answer
+
+    Returns:
+        Grading result in the same shape as the AI grader's output
+    """
+    answer_key = rubric["answer_key"]
+    criteria = rubric.get("criteria", [])
+    correct = is_correct(answer_key, user_response)
+    explanation = answer_key.get("explanation", "")
+
+    if correct:
+        feedback = "Correct!"
+        strengths = ["Selected the correct answer"]
+        improvements = []
+    else:
+        feedback = f"Not quite. The correct answer is {_describe_answer(answer_key)}."
+        strengths = []
+        improvements = list(rubric.get("expected_key_points", []))
+
+    if explanation:
+        feedback = f"{feedback} {explanation}"
+
+    return {
+        "criterion_scores": {
+            c["name"]: c["max_score"] if correct else 0 for c in criteria
+        },
+        "total_score": sum(c["max_score"] for c in criteria) if correct else 0,
+        "max_score": sum(c["max_score"] for c in criteria),
+        "feedback": feedback,
+        "strengths": strengths,
+        "improvements": improvements,
+        "follow_up_question": None,
+    }
+
+
+def _describe_answer(answer_key: dict[str, Any]) -> str:
+    """Human-readable form of the accepted answer for feedback."""
+    accepted = answer_key["accepted_answers"]
+
+    if answer_key["match_mode"] == "choice":
+        choice_text = {c["key"]: c["text"] for c in answer_key.get("choices", [])}
+        return ", ".join(
+            f"{key.upper()} ({choice_text[key]})" if key in choice_text else key.upper()
+            for key in accepted
+        )
+
+    return f'"{accepted[0]}"'
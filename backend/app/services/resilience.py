@@ -0,0 +1,323 @@
+"""
+AI Call Resilience
+
+Responsibility: Protects request handlers from a slow or failing AI provider.
+
+Provides:
+- Per-attempt deadline and an overall deadline across retries
+- Bounded retries with exponential backoff and full jitter
+- A circuit breaker that fails fast while the provider is down
+- Optional hedged requests: a duplicate call fired after the observed
+  p95 latency, first success wins
+
+The layer is provider-agnostic; it wraps any zero-argument coroutine factory.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class AIProviderError(Exception):
+    """Raised when the AI provider could not produce a usable result."""
+
+
+class AIProviderTimeout(AIProviderError):
+    """Raised when a provider call exceeds its deadline."""
+
+
+class CircuitOpenError(AIProviderError):
+    """Raised without calling the provider while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"AI provider circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry and deadline configuration for provider calls."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 4.0
+    attempt_timeout: float = 20.0
+    total_deadline: float = 45.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt`."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass
+class CallStats:
+    """Per-call bookkeeping filled in by ResilientCaller.call."""
+
+    attempts: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    closed    -> calls flow; consecutive failures are counted
+    open      -> calls fail immediately until recovery_timeout elapses
+    half_open -> a single trial call decides between closed and open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call should not be attempted."""
+        state = self.state
+
+        if state == self.OPEN:
+            retry_after = self.recovery_timeout - (self._clock() - self._opened_at)
+            raise CircuitOpenError(max(retry_after, 0.0))
+
+        if state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.recovery_timeout)
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_cancelled(self) -> None:
+        """A cancelled call says nothing about provider health; free the trial slot."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for hedge timing."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(pct * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+class ResilientCaller:
+    """
+    Executes provider calls with deadlines, retries, breaker and hedging.
+
+    One instance should be shared per process so breaker state and latency
+    history reflect all traffic, not a single request.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._sleep = sleep
+
+    async def call(
+        self, fn: Callable[[], Awaitable[T]], stats: CallStats | None = None
+    ) -> T:
+        """
+        Run `fn` under the resilience policy.
+
+        Args:
+            fn: Zero-argument factory returning a fresh provider coroutine
+            stats: Optional record of attempts and errors for instrumentation
+
+        Returns:
+            The first successful result
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            AIProviderTimeout: If the last attempt timed out
+            AIProviderError: If every attempt failed
+        """
+        deadline = time.monotonic() + self.policy.total_deadline
+        last_error: Exception | None = None
+
+        stats = stats if stats is not None else CallStats()
+
+        for attempt in range(self.policy.max_attempts):
+            self.breaker.before_call()
+            stats.attempts = attempt + 1
+
+            remaining = deadline - time.monotonic()
+            timeout = min(self.policy.attempt_timeout, remaining)
+            started = time.monotonic()
+
+            try:
+                result = await asyncio.wait_for(self._call_once(fn), timeout)
+            except TimeoutError:
+                last_error = AIProviderTimeout(f"AI provider call exceeded {timeout:.1f}s")
+                self.breaker.record_failure()
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                last_error = e
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+                self.latency.record(time.monotonic() - started)
+                return result
+
+            stats.errors.append(type(last_error).__name__)
+
+            if attempt + 1 >= self.policy.max_attempts:
+                break
+            delay = self.policy.backoff(attempt)
+            if time.monotonic() + delay >= deadline:
+                break
+            await self._sleep(delay)
+
+        if isinstance(last_error, AIProviderError):
+            raise last_error
+        raise AIProviderError(f"AI provider call failed: {last_error}") from last_error
+
+    def _hedge_delay(self) -> float | None:
+        if not self.hedge_enabled or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def _call_once(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Single logical attempt, optionally hedged with a duplicate call."""
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return await fn()
+
+        tasks = {asyncio.ensure_future(fn())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                # Primary is slower than p95; race a duplicate against it
+                tasks.add(asyncio.ensure_future(fn()))
+
+            last_error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            assert last_error is not None
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_caller: ResilientCaller | None = None
+_follow_up_caller: ResilientCaller | None = None
+
+
+def _policy_from_settings() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=settings.ai_max_attempts,
+        base_delay=settings.ai_retry_base_delay_seconds,
+        max_delay=settings.ai_retry_max_delay_seconds,
+        attempt_timeout=settings.ai_call_timeout_seconds,
+        total_deadline=settings.ai_total_deadline_seconds,
+    )
+
+
+def _breaker_from_settings() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.ai_breaker_failure_threshold,
+        recovery_timeout=settings.ai_breaker_recovery_seconds,
+    )
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """Process-wide caller for grading calls, configured from settings."""
+    global _caller
+    if _caller is None:
+        _caller = ResilientCaller(
+            policy=_policy_from_settings(),
+            breaker=_breaker_from_settings(),
+            hedge_enabled=settings.ai_hedge_enabled,
+            hedge_percentile=settings.ai_hedge_percentile,
+            hedge_min_samples=settings.ai_hedge_min_samples,
+        )
+    return _caller
+
+
+def get_follow_up_caller() -> ResilientCaller:
+    """
+    Process-wide caller for follow-up questions.
+
+    Follow-ups are short, optional calls with their own latency profile, so
+    they get a separate breaker and latency history: they never skew the
+    grading hedge delay, trip the grading breaker or take its half-open
+    trial slot. Hedging is off; a slow follow-up is simply dropped.
+    """
+    global _follow_up_caller
+    if _follow_up_caller is None:
+        _follow_up_caller = ResilientCaller(
+            policy=_policy_from_settings(),
+            breaker=_breaker_from_settings(),
+        )
+    return _follow_up_caller
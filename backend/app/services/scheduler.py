@@ -4,14 +4,19 @@ Scheduler Service
 Implements spaced repetition logic and drill selection for daily practice.
 """
 
+from collections.abc import Mapping, Sequence
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from itertools import islice
+from typing import Any
 from supabase import Client
 
+from app.core.fieldsets import project, select_list
+from app.services.content_snapshot import ContentSnapshot
+
 
 def calculate_next_review(
     mastery_score: int,
-    current_date: Optional[datetime] = None
+    current_date: datetime | None = None
 ) -> datetime:
     """
     Calculate when a drill should be reviewed next based on mastery score.
@@ -59,8 +64,10 @@ def get_daily_drills(
     user_id: str,
     db: Client,
     limit: int = 3,
-    current_date: Optional[datetime] = None
-) -> List[Dict[str, Any]]:
+    current_date: datetime | None = None,
+    content: ContentSnapshot | None = None,
+    fields: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
     """
     Select drills for today's practice based on spaced repetition.
     
@@ -74,10 +81,13 @@ def get_daily_drills(
         db: Supabase client
         limit: Maximum number of drills to return (default 3)
         current_date: Reference date (defaults to now)
+        content: In-memory content snapshot; drill rows are read from it
+            instead of the database when given
+        fields: Drill columns to return (must include id); all when omitted
         
     Returns:
         List of drill objects with metadata:
-        - id, slug, drill_type, prompt_markdown, rubric
+        - the requested drill columns
         - mastery_score (if attempted)
         - reason (why selected: "overdue", "low_mastery", "new")
     """
@@ -100,16 +110,8 @@ def get_daily_drills(
     overdue_drill_ids = [row["drill_id"] for row in overdue_response.data]
     
     if overdue_drill_ids:
-        # Fetch full drill details
-        drills_response = (
-            db.table("drills")
-            .select("*")
-            .in_("id", overdue_drill_ids)
-            .execute()
-        )
-        
-        # Add metadata
-        for drill in drills_response.data:
+        # Fetch full drill details and add metadata
+        for drill in _fetch_drills(db, content, overdue_drill_ids, fields):
             progress_data = next(
                 (p for p in overdue_response.data if p["drill_id"] == drill["id"]),
                 None
@@ -138,14 +140,7 @@ def get_daily_drills(
         low_mastery_drill_ids = [row["drill_id"] for row in low_mastery_response.data]
         
         if low_mastery_drill_ids:
-            drills_response = (
-                db.table("drills")
-                .select("*")
-                .in_("id", low_mastery_drill_ids)
-                .execute()
-            )
-            
-            for drill in drills_response.data:
+            for drill in _fetch_drills(db, content, low_mastery_drill_ids, fields):
                 progress_data = next(
                     (p for p in low_mastery_response.data if p["drill_id"] == drill["id"]),
                     None
@@ -170,17 +165,43 @@ def get_daily_drills(
         attempted_drill_ids = [row["drill_id"] for row in attempted_response.data]
         
         # Get new drills (not attempted)
-        new_drills_query = db.table("drills").select("*").order("created_at", desc=False)
-        
-        if attempted_drill_ids:
-            new_drills_query = new_drills_query.not_.in_("id", attempted_drill_ids)
-        
-        new_drills_response = new_drills_query.limit(remaining).execute()
+        if content:
+            attempted = set(attempted_drill_ids)
+            unattempted = (drill for drill in content.drills if drill["id"] not in attempted)
+            new_drills = [_copy(drill, fields) for drill in islice(unattempted, remaining)]
+        else:
+            new_drills_query = (
+                db.table("drills")
+                .select(select_list(fields) if fields else "*")
+                .order("created_at", desc=False)
+            )
+
+            if attempted_drill_ids:
+                new_drills_query = new_drills_query.not_.in_("id", attempted_drill_ids)
+
+            new_drills = new_drills_query.limit(remaining).execute().data
         
-        for drill in new_drills_response.data:
+        for drill in new_drills:
             drill["mastery_score"] = None
             drill["last_attempt_at"] = None
             drill["reason"] = "new"
             selected_drills.append(drill)
     
     return selected_drills
+
+
+def _fetch_drills(
+    db: Client,
+    content: ContentSnapshot | None,
+    drill_ids: list[str],
+    fields: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Drill rows for the given IDs, copied so callers can annotate them."""
+    if content:
+        return [_copy(content.drills_by_id[i], fields) for i in drill_ids if i in content.drills_by_id]
+    columns = select_list(fields) if fields else "*"
+    return db.table("drills").select(columns).in_("id", drill_ids).execute().data
+
+
+def _copy(drill: Mapping[str, Any], fields: Sequence[str] | None) -> dict[str, Any]:
+    return project(drill, fields) if fields else dict(drill)
@@ -0,0 +1,80 @@
+"""
+Token Budgets
+
+Responsibility: Bounds the size of grading prompts and outputs so the
+worst-case grading latency and cost are predictable.
+
+- Input: each drill allows a response budget derived from its
+  estimated_minutes. Over-budget responses are truncated or rejected
+  (settings.grading_response_overflow).
+- Output: max_output_tokens is capped per drill type.
+
+Token counts are estimated locally (~4 characters per token) so the check
+costs nothing and works for every provider.
+"""
+
+import math
+
+from app.core.config import settings
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[response truncated]"
+
+
+class ResponseTooLongError(Exception):
+    """Raised when a response exceeds its drill's token budget under the reject policy."""
+
+    def __init__(self, tokens: int, budget: int):
+        super().__init__(f"Response is ~{tokens} tokens; this drill allows {budget}")
+        self.tokens = tokens
+        self.budget = budget
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap provider-agnostic token estimate."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def response_token_budget(estimated_minutes: int | None) -> int:
+    """Maximum response tokens for a drill, scaled by its expected effort."""
+    minutes = estimated_minutes or 5
+    budget = (
+        settings.grading_response_base_tokens
+        + minutes * settings.grading_response_tokens_per_minute
+    )
+    return min(budget, settings.grading_response_max_tokens)
+
+
+def max_output_tokens(drill_type: str) -> int:
+    """Output token cap for grading a drill of this type."""
+    caps = settings.grading_max_output_tokens
+    return caps.get(drill_type, caps.get("default", 700))
+
+
+def apply_response_budget(user_response: str, budget: int) -> tuple[str, bool]:
+    """
+    Fit a response into its token budget.
+
+    Args:
+        user_response: The user's submitted answer
+        budget: Allowed tokens for the response
+
+    Returns:
+        (response, truncated) - the original or truncated response
+
+    Raises:
+        ResponseTooLongError: If over budget and the policy is "reject"
+    """
+    tokens = estimate_tokens(user_response)
+    if tokens <= budget:
+        return user_response, False
+
+    if settings.grading_response_overflow == "reject":
+        raise ResponseTooLongError(tokens, budget)
+
+    # Cut on a word boundary so the grader doesn't see half a word
+    cut = budget * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    truncated = user_response[:cut]
+    if " " in truncated:
+        truncated = truncated.rsplit(None, 1)[0]
+    return truncated + TRUNCATION_MARKER, True
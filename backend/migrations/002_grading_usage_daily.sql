@@ -0,0 +1,37 @@
+-- Init Database Migration
+-- Version: 002_grading_usage_daily
+-- Description: Daily per-drill summary of AI grading latency, tokens and cost
+
+-- ============================================================================
+-- GRADING USAGE DAILY VIEW
+-- ============================================================================
+-- Built from the "usage" object the backend stores in drill_attempts.ai_feedback
+-- for every AI-graded attempt. Locally graded attempts (quiz, pre-grader) have
+-- no usage and are excluded.
+
+CREATE OR REPLACE VIEW grading_usage_daily AS
+SELECT
+    (a.created_at AT TIME ZONE 'UTC')::date AS day,
+    a.drill_id,
+    d.slug AS drill_slug,
+    d.drill_type,
+    a.ai_feedback->'usage'->>'model' AS model,
+    count(*) AS graded_attempts,
+    sum((a.ai_feedback->'usage'->>'prompt_tokens')::int) AS prompt_tokens,
+    sum((a.ai_feedback->'usage'->>'output_tokens')::int) AS output_tokens,
+    avg((a.ai_feedback->'usage'->>'latency_ms')::int) AS avg_latency_ms,
+    percentile_cont(0.95) WITHIN GROUP (
+        ORDER BY (a.ai_feedback->'usage'->>'latency_ms')::int
+    ) AS p95_latency_ms,
+    sum((a.ai_feedback->'usage'->>'retries')::int) AS retries,
+    sum((a.ai_feedback->'usage'->>'cost_usd')::numeric) AS cost_usd
+FROM drill_attempts a
+JOIN drills d ON d.id = a.drill_id
+WHERE a.ai_feedback ? 'usage'
+  AND jsonb_typeof(a.ai_feedback->'usage') = 'object'
+GROUP BY 1, 2, 3, 4, 5;
+
+COMMENT ON VIEW grading_usage_daily IS 'Per-day, per-drill AI grading latency, token and cost summary';
+
+-- Only the backend (service role) reads usage analytics
+REVOKE ALL ON grading_usage_daily FROM anon, authenticated;
@@ -0,0 +1,42 @@
+-- Init Database Migration
+-- Version: 003_drill_attempt_regrades
+-- Description: Stores offline re-grades of historical attempts after rubric changes
+
+-- ============================================================================
+-- DRILL ATTEMPT REGRADES TABLE
+-- ============================================================================
+-- Written by scripts/regrade_attempts.py. Original attempts stay append-only;
+-- each re-grade is keyed by the rubric version (drills.updated_at) it used,
+-- so re-running the CLI for the same rubric is idempotent.
+
+CREATE TABLE drill_attempt_regrades (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    attempt_id UUID NOT NULL REFERENCES drill_attempts(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    drill_id UUID NOT NULL REFERENCES drills(id) ON DELETE CASCADE,
+    rubric_version TIMESTAMPTZ NOT NULL,
+    attempt_created_at TIMESTAMPTZ NOT NULL,
+    ai_feedback JSONB NOT NULL DEFAULT '{}',
+    score INTEGER,
+    max_score INTEGER,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    CONSTRAINT regrades_unique_attempt_version UNIQUE (attempt_id, rubric_version)
+);
+
+CREATE INDEX idx_regrades_user_drill ON drill_attempt_regrades(user_id, drill_id, attempt_created_at);
+CREATE INDEX idx_regrades_drill_version ON drill_attempt_regrades(drill_id, rubric_version);
+
+-- Keyset pagination used by the re-grade CLI
+CREATE INDEX idx_attempts_drill_created_id ON drill_attempts(drill_id, created_at, id);
+
+COMMENT ON TABLE drill_attempt_regrades IS 'Re-grades of historical attempts against an updated rubric';
+COMMENT ON COLUMN drill_attempt_regrades.rubric_version IS 'drills.updated_at of the rubric used for this re-grade';
+
+ALTER TABLE drill_attempt_regrades ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage regrades"
+    ON drill_attempt_regrades FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
@@ -0,0 +1,60 @@
+-- Init Database Migration
+-- Version: 004_record_drill_attempt
+-- Description: Records a graded attempt and its progress update in one round trip
+
+-- ============================================================================
+-- RECORD DRILL ATTEMPT FUNCTION
+-- ============================================================================
+-- Called by POST /drills/{drill_id}/attempts via RPC. Inserts the attempt and
+-- upserts user_drill_progress in a single transaction, so concurrent
+-- submissions for the same drill can't race on progress_unique_user_drill,
+-- and attempt_count is incremented atomically.
+--
+-- Mastery and the next review time are computed by the API (see
+-- services/grading.py and services/scheduler.py) and passed in.
+
+CREATE OR REPLACE FUNCTION record_drill_attempt(
+    p_user_id UUID,
+    p_drill_id UUID,
+    p_user_response TEXT,
+    p_ai_feedback JSONB,
+    p_score INTEGER,
+    p_max_score INTEGER,
+    p_mastery_score INTEGER,
+    p_next_review_due_at TIMESTAMPTZ
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_attempt drill_attempts;
+    v_progress user_drill_progress;
+BEGIN
+    INSERT INTO drill_attempts (user_id, drill_id, user_response, ai_feedback, score, max_score)
+    VALUES (p_user_id, p_drill_id, p_user_response, p_ai_feedback, p_score, p_max_score)
+    RETURNING * INTO v_attempt;
+
+    INSERT INTO user_drill_progress (
+        user_id, drill_id, mastery_score, attempt_count, last_attempt_at, next_review_due_at
+    )
+    VALUES (
+        p_user_id, p_drill_id, p_mastery_score, 1, v_attempt.created_at, p_next_review_due_at
+    )
+    ON CONFLICT (user_id, drill_id) DO UPDATE SET
+        mastery_score = EXCLUDED.mastery_score,
+        attempt_count = user_drill_progress.attempt_count + 1,
+        last_attempt_at = EXCLUDED.last_attempt_at,
+        next_review_due_at = EXCLUDED.next_review_due_at
+    RETURNING * INTO v_progress;
+
+    RETURN jsonb_build_object(
+        'attempt_id', v_attempt.id,
+        'attempt_created_at', v_attempt.created_at,
+        'progress', to_jsonb(v_progress)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION record_drill_attempt IS 'Insert a drill attempt and upsert progress atomically; returns the attempt ID and new progress row';
+
+-- Only the backend (service role) records attempts
+REVOKE EXECUTE ON FUNCTION record_drill_attempt FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_drill_attempt TO service_role;
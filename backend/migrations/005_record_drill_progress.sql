@@ -0,0 +1,37 @@
+-- Init Database Migration
+-- Version: 005_record_drill_progress
+-- Description: Progress-only variant of record_drill_attempt for write-behind attempt inserts
+
+-- ============================================================================
+-- RECORD DRILL PROGRESS FUNCTION
+-- ============================================================================
+-- Used when settings.attempt_write_behind_enabled is on: the attempt row is
+-- buffered and bulk-inserted later (services/attempt_buffer.py), while the
+-- progress upsert and attempt_count increment still happen synchronously.
+
+CREATE OR REPLACE FUNCTION record_drill_progress(
+    p_user_id UUID,
+    p_drill_id UUID,
+    p_mastery_score INTEGER,
+    p_last_attempt_at TIMESTAMPTZ,
+    p_next_review_due_at TIMESTAMPTZ
+)
+RETURNS user_drill_progress AS $$
+    INSERT INTO user_drill_progress (
+        user_id, drill_id, mastery_score, attempt_count, last_attempt_at, next_review_due_at
+    )
+    VALUES (
+        p_user_id, p_drill_id, p_mastery_score, 1, p_last_attempt_at, p_next_review_due_at
+    )
+    ON CONFLICT (user_id, drill_id) DO UPDATE SET
+        mastery_score = EXCLUDED.mastery_score,
+        attempt_count = user_drill_progress.attempt_count + 1,
+        last_attempt_at = EXCLUDED.last_attempt_at,
+        next_review_due_at = EXCLUDED.next_review_due_at
+    RETURNING *;
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION record_drill_progress IS 'Upsert progress and increment attempt_count; the attempt row is written separately';
+
+REVOKE EXECUTE ON FUNCTION record_drill_progress FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_drill_progress TO service_role;
@@ -0,0 +1,55 @@
+-- Init Database Migration
+-- Version: 006_content_version
+-- Description: Single-row content version, bumped whenever tracks, units or drills change
+
+-- ============================================================================
+-- CONTENT VERSION TABLE
+-- ============================================================================
+-- The API keeps an in-memory snapshot of all content
+-- (services/content_snapshot.py) and polls this row to know when to reload.
+-- Statement-level triggers bump it on any insert, update or delete, so
+-- seed_content.py runs are picked up without any change to the script.
+
+CREATE TABLE content_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    CONSTRAINT content_version_single_row CHECK (id)
+);
+
+INSERT INTO content_version DEFAULT VALUES;
+
+COMMENT ON TABLE content_version IS 'Monotonic version of tracks/units/drills content, for API cache invalidation';
+
+-- ============================================================================
+-- BUMP TRIGGERS
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION bump_content_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE content_version SET version = version + 1, updated_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tracks_content_version
+    AFTER INSERT OR UPDATE OR DELETE ON tracks
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+CREATE TRIGGER units_content_version
+    AFTER INSERT OR UPDATE OR DELETE ON units
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+CREATE TRIGGER drills_content_version
+    AFTER INSERT OR UPDATE OR DELETE ON drills
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+ALTER TABLE content_version ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage content version"
+    ON content_version FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
@@ -0,0 +1,46 @@
+-- Init Database Migration
+-- Version: 007_unit_drill_counts
+-- Description: Denormalized per-unit drill count, maintained by triggers on drills
+
+-- ============================================================================
+-- DRILL COUNT COLUMN
+-- ============================================================================
+-- GET /tracks/{slug}/units returns each unit's drill count. Without this
+-- column the database fallback downloaded every drill in the system to
+-- count them; now the counts come back with the units in one query.
+
+ALTER TABLE units ADD COLUMN drill_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE units
+SET drill_count = counts.drill_count
+FROM (
+    SELECT unit_id, count(*) AS drill_count
+    FROM drills
+    GROUP BY unit_id
+) AS counts
+WHERE units.id = counts.unit_id;
+
+COMMENT ON COLUMN units.drill_count IS 'Number of drills in the unit, maintained by drills_unit_drill_count';
+
+-- ============================================================================
+-- MAINTENANCE TRIGGER
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION maintain_unit_drill_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE units SET drill_count = drill_count - 1 WHERE id = OLD.unit_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE units SET drill_count = drill_count + 1 WHERE id = NEW.unit_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Upserts from seed_content.py rewrite unit_id with the same value; the
+-- decrement and increment then hit the same unit and cancel out
+CREATE TRIGGER drills_unit_drill_count
+    AFTER INSERT OR DELETE OR UPDATE OF unit_id ON drills
+    FOR EACH ROW EXECUTE FUNCTION maintain_unit_drill_count();
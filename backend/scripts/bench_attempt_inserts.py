@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Attempt Insert Benchmark
+
+Responsibility: Measures drill_attempts insert throughput for the per-row
+path against the write-behind buffer's multi-row inserts, using realistic
+ai_feedback payloads.
+
+Rows are written for the given user and drill and deleted afterwards.
+Run against a development database, never production.
+
+Usage:
+    python -m scripts.bench_attempt_inserts --user-id <uuid> --drill-id <uuid>
+    python -m scripts.bench_attempt_inserts --user-id <uuid> --drill-id <uuid> \\
+        --rows 1000 --batch-size 100 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from supabase import create_client
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.attempt_buffer import AttemptWriteBuffer
+
+BENCH_MARKER = "[bench_attempt_inserts]"
+
+
+def make_row(user_id: str, drill_id: str) -> dict:
+    """An attempt row with a feedback payload the size of a real AI grade."""
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "drill_id": drill_id,
+        "user_response": f"{BENCH_MARKER} " + "fork copies the process and exec replaces it. " * 8,
+        "ai_feedback": {
+            "criterion_scores": {"accuracy": 3, "completeness": 2, "clarity": 2},
+            "total_score": 7,
+            "max_score": 10,
+            "feedback": "Solid explanation of the process lifecycle. " * 12,
+            "strengths": ["Correct fork semantics", "Mentions exec replacing the image"],
+            "improvements": ["Explain why shells fork before exec", "Mention copy-on-write"],
+            "follow_up_question": "What happens to open file descriptors across exec?",
+            "grader": "ai",
+            "usage": {"model": "bench", "prompt_tokens": 900, "output_tokens": 220},
+        },
+        "score": 7,
+        "max_score": 10,
+    }
+
+
+async def bench_per_row(client, rows: list[dict], concurrency: int) -> float:
+    """One insert per row, `concurrency` in flight, like the request path."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert(row: dict) -> None:
+        async with semaphore:
+            await asyncio.to_thread(lambda: client.table("drill_attempts").insert(row).execute())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(insert(row) for row in rows))
+    return time.perf_counter() - start
+
+
+async def bench_buffered(client, rows: list[dict], batch_size: int) -> float:
+    """Rows go through the write-behind buffer, spill file included."""
+    with tempfile.TemporaryDirectory() as spill_dir:
+        buffer = AttemptWriteBuffer(
+            lambda: client,
+            spill_dir,
+            max_rows=batch_size,
+            max_delay_seconds=settings.attempt_buffer_max_delay_seconds,
+            fsync=settings.attempt_buffer_fsync,
+        )
+        await buffer.start()
+        start = time.perf_counter()
+        # Concurrent like the request path, so appends are group committed
+        await asyncio.gather(*(buffer.add(row) for row in rows))
+        await buffer.close()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark drill_attempts insert paths")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--drill-id", required=True)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=settings.attempt_buffer_max_rows)
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight per-row inserts")
+    args = parser.parse_args()
+
+    client = create_client(settings.supabase_url, settings.supabase_service_key)
+
+    print("\n" + "=" * 60)
+    print("ATTEMPT INSERT BENCHMARK")
+    print("=" * 60)
+    print(f"\n{args.rows} rows, batch size {args.batch_size}, per-row concurrency {args.concurrency}")
+
+    try:
+        per_row = asyncio.run(
+            bench_per_row(client, [make_row(args.user_id, args.drill_id) for _ in range(args.rows)], args.concurrency)
+        )
+        buffered = asyncio.run(
+            bench_buffered(client, [make_row(args.user_id, args.drill_id) for _ in range(args.rows)], args.batch_size)
+        )
+    finally:
+        client.table("drill_attempts").delete().eq("user_id", args.user_id).like(
+            "user_response", f"{BENCH_MARKER}%"
+        ).execute()
+
+    print(f"\nPer-row inserts:   {per_row:7.2f}s  {args.rows / per_row:8.1f} rows/s")
+    print(f"Buffered inserts:  {buffered:7.2f}s  {args.rows / buffered:8.1f} rows/s")
+    print(f"\n✅ Write-behind speedup: {per_row / buffered:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
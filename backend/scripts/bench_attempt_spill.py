@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Attempt Spill Benchmark
+
+Responsibility: Measures how fast the write-behind buffer can make attempt
+rows durable in its local spill segment, and how long that blocks the
+event loop, comparing:
+
+- inline: one write + fsync per row on the event loop (how add() used to work)
+- group commit: AttemptWriteBuffer.add(), which writes and fsyncs every
+  staged row together in a worker thread
+
+`--concurrency` submissions add rows at once, like concurrent requests.
+Inserts go to a no-op database, so only the spill path is timed.
+
+Usage:
+    python -m scripts.bench_attempt_spill
+    python -m scripts.bench_attempt_spill --rows 2000 --concurrency 1 8 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.attempt_buffer import AttemptWriteBuffer
+from scripts.bench_attempt_inserts import make_row
+
+
+class NullDB:
+    """Accepts upserts without doing anything."""
+
+    def table(self, _):
+        return self
+
+    def upsert(self, *_, **__):
+        return self
+
+    def execute(self):
+        return None
+
+
+async def inline_add(buffer: AttemptWriteBuffer, row: dict) -> None:
+    """The previous add(): synchronous write and fsync on the event loop."""
+    buffer._segment_file.write(json.dumps(row, default=str) + "\n")
+    buffer._segment_file.flush()
+    os.fsync(buffer._segment_file.fileno())
+    buffer._pending.append(row)
+
+
+async def max_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Longest delay past `interval` seen by a ticking coroutine."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def bench(add, rows: list[dict], concurrency: int) -> tuple[float, float]:
+    """Rows/s and worst event-loop lag (ms) for one add implementation."""
+    with tempfile.TemporaryDirectory() as spill_dir:
+        buffer = AttemptWriteBuffer(
+            NullDB, spill_dir, max_rows=len(rows) + 1, max_delay_seconds=3600, fsync=True
+        )
+        await buffer.start()
+        queue = list(rows)
+
+        async def submitter():
+            while queue:
+                await add(buffer, queue.pop())
+
+        stop = asyncio.Event()
+        lag = asyncio.create_task(max_loop_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(submitter() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        worst_lag = await lag
+        await buffer.close()
+    return len(rows) / elapsed, worst_lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark attempt spill segment appends")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    rows = [make_row("bench-user", "bench-drill") for _ in range(args.rows)]
+
+    print("\n" + "=" * 60)
+    print("ATTEMPT SPILL BENCHMARK")
+    print("=" * 60)
+    print(f"\n{args.rows} rows, fsync on\n")
+    print(f"{'concurrency':>11} {'inline rows/s':>14} {'lag ms':>8} {'group rows/s':>13} {'lag ms':>8}")
+    for concurrency in args.concurrency:
+        inline, inline_lag = asyncio.run(bench(inline_add, rows, concurrency))
+        group, group_lag = asyncio.run(bench(AttemptWriteBuffer.add, rows, concurrency))
+        print(f"{concurrency:>11} {inline:>14.0f} {inline_lag:>8.2f} {group:>13.0f} {group_lag:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Content Serialization Benchmark
+
+Responsibility: Measures per-request serialization CPU for the content
+routes, comparing:
+
+- stdlib: response models through jsonable_encoder + json.dumps (FastAPI's
+  path for dict routes and for older FastAPI versions)
+- pydantic: response models built and dumped per request via Pydantic's
+  Rust serializer (FastAPI's response_model fast path)
+- prerendered: bytes stored with the content snapshot (current path)
+
+Also compares json.dumps with orjson for the dict-shaped /drills/today
+payload, and JSON with MessagePack (Accept: application/msgpack) for
+payload size, per-request encode time and decode time. Decoding is timed
+in Python as a proxy for the client. Uses the repo's content files; no
+database or network access.
+
+Usage:
+    python -m scripts.bench_content_serialization
+    python -m scripts.bench_content_serialization --scale 20 --iterations 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import msgpack
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.fieldsets import project
+from app.core.responses import Encoded, json_to_msgpack
+from app.models.drill import DRILL_FIELDS, DrillSummary, DrillView
+from app.models.track import TrackBundle, TrackSummary, UnitWithDrillCount
+from app.services.content_snapshot import ContentSnapshot, render_key
+from scripts.seed_content import (
+    discover_drills,
+    discover_tracks,
+    discover_units,
+    find_content_dir,
+    load_drill_content,
+    load_track_content,
+    load_unit_content,
+)
+
+
+def load_rows(scale: int) -> tuple[list[dict], list[dict], list[dict]]:
+    """Content files as table rows; each drill is copied `scale` times."""
+    tracks, units, drills = [], [], []
+    for track_dir in discover_tracks(find_content_dir()):
+        track, _ = load_track_content(track_dir)
+        if track is None:
+            continue
+        track_id = str(uuid.uuid4())
+        tracks.append({"id": track_id, **track.model_dump(mode="json")})
+
+        for unit_file in discover_units(track_dir):
+            unit, _ = load_unit_content(unit_file)
+            if unit is None:
+                continue
+            unit_id = str(uuid.uuid4())
+            unit_row = unit.model_dump(mode="json", exclude={"track_slug"})
+            units.append({"id": unit_id, "track_id": track_id, **unit_row})
+
+            for drill_file in discover_drills(track_dir, unit.order_index):
+                drill, _ = load_drill_content(drill_file)
+                if drill is None:
+                    continue
+                drill_row = drill.model_dump(mode="json", exclude={"unit_order_index"})
+                for copy in range(scale):
+                    slug = drill.slug if copy == 0 else f"{drill.slug}-{copy}"
+                    drills.append(
+                        {"id": str(uuid.uuid4()), "unit_id": unit_id, **drill_row, "slug": slug}
+                    )
+    return tracks, units, drills
+
+
+def per_request_us(fn: Callable[[], Any], iterations: int) -> float:
+    """Mean microseconds per call."""
+    fn()  # Warm up caches and adapters
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def route_cases(snapshot: ContentSnapshot) -> dict[str, tuple[Callable[[], Any], Any, tuple]]:
+    """Route -> (build response models, response_model, render key)."""
+    track = snapshot.tracks[0]
+    unit_id = next(iter(snapshot.units_by_id))
+    drill = snapshot.drills_by_unit[unit_id][0]
+    return {
+        "GET /tracks": (
+            lambda: [TrackSummary(**t) for t in snapshot.tracks],
+            list[TrackSummary],
+            render_key("tracks"),
+        ),
+        "GET /tracks/{slug}/units": (
+            lambda: [
+                snapshot.unit_with_drill_count(u) for u in snapshot.units_by_track[track["id"]]
+            ],
+            list[UnitWithDrillCount],
+            render_key("units", track["slug"]),
+        ),
+        "GET /tracks/{slug}/bundle": (
+            lambda: snapshot.track_bundle(track),
+            TrackBundle,
+            render_key("bundle", track["slug"]),
+        ),
+        "GET /units/{id}/drills": (
+            lambda: [DrillSummary(**d) for d in snapshot.drills_by_unit[unit_id]],
+            list[DrillSummary],
+            render_key("unit_drills", unit_id),
+        ),
+        "GET /units/{id}/drills/{slug}": (
+            lambda: DrillView(**project(drill, DRILL_FIELDS.default)),
+            DrillView,
+            render_key("drill", unit_id, drill["slug"]),
+        ),
+    }
+
+
+def time_route(
+    build: Callable[[], Any], model: Any, body: Encoded, iterations: int
+) -> tuple[float, float, float]:
+    """µs/request for (stdlib, pydantic, prerendered) serialization of one route."""
+    adapter = TypeAdapter(model)
+    stdlib = per_request_us(lambda: json.dumps(jsonable_encoder(build())).encode(), iterations)
+    pydantic = per_request_us(lambda: adapter.dump_json(build()), iterations)
+    stored = per_request_us(lambda: body.json, iterations)
+    return stdlib, pydantic, stored
+
+
+def time_msgpack(body: Encoded, iterations: int) -> tuple[float, float, float]:
+    """µs/request for (JSON -> MessagePack transcode, JSON decode, MessagePack decode)."""
+    transcode = per_request_us(lambda: json_to_msgpack(body.json), iterations)
+    json_decode = per_request_us(lambda: orjson.loads(body.json), iterations)
+    msgpack_decode = per_request_us(lambda: msgpack.unpackb(body.msgpack), iterations)
+    return transcode, json_decode, msgpack_decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content response serialization")
+    parser.add_argument("--scale", type=int, default=1, help="Copies of each drill")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    tracks, units, drills = load_rows(args.scale)
+    start = time.perf_counter()
+    snapshot = ContentSnapshot.build(1, tracks, units, drills)
+    build_ms = (time.perf_counter() - start) * 1000
+    rendered_kb = sum(
+        len(variant.json) + len(variant.msgpack)
+        for body in snapshot.rendered.values()
+        for variant in (body, *body.compressed.values())
+    ) / 1024
+
+    print("\n" + "=" * 60)
+    print("CONTENT SERIALIZATION BENCHMARK")
+    print("=" * 60)
+    print(f"\n{len(tracks)} tracks, {len(units)} units, {len(drills)} drills")
+    print(
+        f"Snapshot build incl. rendering: {build_ms:.1f}ms, "
+        f"{len(snapshot.rendered)} responses, {rendered_kb:.0f} KiB"
+    )
+
+    print(f"\n{'Route':<30} {'stdlib':>10} {'pydantic':>10} {'prerendered':>12}  (µs/request)")
+    for route, (build, model, key) in route_cases(snapshot).items():
+        stdlib, pydantic, stored = time_route(build, model, snapshot.rendered[key], args.iterations)
+        print(f"{route:<30} {stdlib:>10.1f} {pydantic:>10.1f} {stored:>12.2f}")
+
+    today = {
+        "drills": [
+            {**project(d, DRILL_FIELDS.default), "mastery_score": 2, "reason": "low_mastery"}
+            for d in snapshot.drills[:3]
+        ],
+        "total_available": 3,
+        "limit": 3,
+        "user_id": str(uuid.uuid4()),
+    }
+    stdlib = per_request_us(lambda: json.dumps(jsonable_encoder(today)).encode(), args.iterations)
+    fast = per_request_us(lambda: orjson.dumps(today), args.iterations)
+    print(f"\n{'Route':<30} {'stdlib':>10} {'orjson':>10}  (µs/request)")
+    print(f"{'GET /drills/today (dict)':<30} {stdlib:>10.1f} {fast:>10.1f}")
+
+    print(
+        f"\n{'Route':<30} {'JSON KiB':>9} {'msgpack KiB':>12} {'transcode':>10}"
+        f" {'JSON dec':>9} {'msgpack dec':>12}  (µs/request)"
+    )
+    for route, (_, _, key) in route_cases(snapshot).items():
+        body = snapshot.rendered[key]
+        transcode, json_decode, msgpack_decode = time_msgpack(body, args.iterations)
+        print(
+            f"{route:<30} {len(body.json) / 1024:>9.1f} {len(body.msgpack) / 1024:>12.1f}"
+            f" {transcode:>10.1f} {json_decode:>9.1f} {msgpack_decode:>12.1f}"
+        )
+    print("(transcode: JSON -> MessagePack for responses that aren't pre-rendered)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Response Validation Benchmark
+
+Responsibility: Measures the per-item cost of turning database rows into
+response bodies for large unit and drill lists, comparing:
+
+- model + response_model: Model(**row) per row, then FastAPI's
+  response_model validation and serialization (how routes used to return)
+- response_model: plain rows validated and serialized by FastAPI
+- model_construct: unvalidated models serialized by Pydantic
+- trusted: core/responses.trusted, projection + orjson (current path,
+  with settings.debug off as in production)
+
+Rows are synthetic and shaped like PostgREST output; no database access.
+
+Usage:
+    python -m scripts.bench_response_validation
+    python -m scripts.bench_response_validation --sizes 100 1000 --iterations 200
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.responses import trusted, type_adapter
+from app.models.drill import AttemptView, DrillSummary
+from app.models.track import UnitWithDrillCount
+
+
+def drill_row(i: int) -> dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "slug": f"explain-concept-{i}",
+        "drill_type": "explain",
+        "difficulty": i % 5 + 1,
+        "estimated_minutes": 5,
+        "concept_tags": ["processes", "scheduling"],
+    }
+
+
+def unit_row(i: int) -> dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "order_index": i,
+        "title": f"Unit {i}",
+        "summary_markdown": "## Summary\n\nWhat this unit covers. " * 20,
+        "drill_count": 12,
+    }
+
+
+def attempt_row(i: int) -> dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "created_at": f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}.123456+00:00",
+        "drill_id": str(uuid.uuid4()),
+        "score": 7,
+        "max_score": 10,
+    }
+
+
+def per_item_us(fn: Callable[[], Any], items: int, iterations: int) -> float:
+    """Mean microseconds per row."""
+    fn()  # Warm up caches and adapters
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations / items * 1e6
+
+
+def time_model(
+    model: type[BaseModel], rows: list[dict[str, Any]], exclude_unset: bool, iterations: int
+) -> tuple[float, float, float, float]:
+    """µs/item for each way of serializing `rows` as list[model]."""
+    adapter = type_adapter(list[model])
+    headers = Response()
+    size = len(rows)
+
+    def validated(values):
+        return adapter.dump_json(adapter.validate_python(values), exclude_unset=exclude_unset)
+
+    both = per_item_us(lambda: validated([model(**r) for r in rows]), size, iterations)
+    once = per_item_us(lambda: validated(rows), size, iterations)
+    constructed = per_item_us(
+        lambda: adapter.dump_json(
+            [model.model_construct(**r) for r in rows],
+            exclude_unset=exclude_unset,
+            warnings=False,
+        ),
+        size,
+        iterations,
+    )
+    fast = per_item_us(
+        lambda: trusted(rows, list[model], headers, exclude_unset=exclude_unset),
+        size,
+        iterations,
+    )
+    return both, once, constructed, fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response validation per item")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    settings.debug = False  # Production setting: trusted() doesn't validate
+    cases = [
+        ("DrillSummary", DrillSummary, drill_row, False),
+        ("UnitWithDrillCount", UnitWithDrillCount, unit_row, False),
+        ("AttemptView", AttemptView, attempt_row, True),
+    ]
+
+    print("\n" + "=" * 60)
+    print("RESPONSE VALIDATION BENCHMARK")
+    print("=" * 60)
+    print(
+        f"\n{'Model':<20} {'rows':>6} {'model+rm':>10} {'rm':>8} {'construct':>10}"
+        f" {'trusted':>9} {'saved':>8}  (µs/item)"
+    )
+    for name, model, make_row, exclude_unset in cases:
+        for size in args.sizes:
+            rows = [make_row(i) for i in range(size)]
+            both, once, constructed, fast = time_model(model, rows, exclude_unset, args.iterations)
+            print(
+                f"{name:<20} {size:>6} {both:>10.2f} {once:>8.2f} {constructed:>10.2f}"
+                f" {fast:>9.2f} {both - fast:>8.2f}"
+            )
+    print("(model+rm: Model(**row) then response_model; rm: response_model only;")
+    print(" saved: model+rm minus trusted)")
+
+
+if __name__ == "__main__":
+    main()
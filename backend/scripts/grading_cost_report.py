@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Grading Cost Report
+
+Responsibility: Summarizes the grading_usage_daily view to find the drills
+(rubrics) with the slowest and most expensive grading prompts.
+
+Usage:
+    python -m scripts.grading_cost_report              # Last 7 days
+    python -m scripts.grading_cost_report --days 30 --top 5
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+from supabase import create_client
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report AI grading cost and latency per drill")
+    parser.add_argument("--days", type=int, default=7, help="How many days to include")
+    parser.add_argument("--top", type=int, default=10, help="Drills to show per ranking")
+    args = parser.parse_args()
+
+    client = create_client(settings.supabase_url, settings.supabase_service_key)
+    since = (date.today() - timedelta(days=args.days)).isoformat()
+
+    rows = (
+        client.table("grading_usage_daily")
+        .select("*")
+        .gte("day", since)
+        .execute()
+    ).data
+
+    if not rows:
+        print(f"No AI-graded attempts since {since}")
+        return
+
+    # Roll daily rows up per drill
+    drills: dict[str, dict] = defaultdict(
+        lambda: {"attempts": 0, "prompt_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "p95_latency_ms": 0.0}
+    )
+    for row in rows:
+        summary = drills[row["drill_slug"]]
+        summary["drill_type"] = row["drill_type"]
+        summary["attempts"] += row["graded_attempts"]
+        summary["prompt_tokens"] += row["prompt_tokens"] or 0
+        summary["output_tokens"] += row["output_tokens"] or 0
+        summary["cost_usd"] += float(row["cost_usd"] or 0)
+        summary["p95_latency_ms"] = max(summary["p95_latency_ms"], row["p95_latency_ms"] or 0)
+
+    total_cost = sum(s["cost_usd"] for s in drills.values())
+    total_attempts = sum(s["attempts"] for s in drills.values())
+
+    print("\n" + "=" * 72)
+    print(f"GRADING COST REPORT (since {since})")
+    print("=" * 72)
+    print(f"\n{total_attempts} AI-graded attempts, ${total_cost:.4f} estimated spend")
+
+    def print_ranking(title: str, key: str, fmt: str) -> None:
+        print(f"\n{title}:")
+        ranked = sorted(drills.items(), key=lambda item: item[1][key], reverse=True)
+        for slug, s in ranked[: args.top]:
+            avg_prompt = s["prompt_tokens"] / s["attempts"]
+            print(
+                f"   {slug:<40} {fmt.format(s[key]):>12}  "
+                f"{s['attempts']:>5} attempts  ~{avg_prompt:.0f} prompt tok"
+            )
+
+    print_ranking("Most expensive drills", "cost_usd", "${:.4f}")
+    print_ranking("Slowest drills (worst daily p95)", "p95_latency_ms", "{:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
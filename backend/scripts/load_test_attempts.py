@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Attempt Submission Load Test
+
+Responsibility: Drives POST /drills/{drill_id}/attempts at a fixed
+concurrency and reports latency percentiles, throughput and error codes.
+
+Intended to run against a local API using the stub provider, e.g.:
+    AI_PROVIDER=stub AI_STUB_LATENCY_MS=800 uvicorn app.main:app
+    python -m scripts.load_test_attempts --token $JWT --drill-id <uuid> \\
+        --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+SAMPLE_RESPONSES = [
+    "fork creates a child process that is a copy of the parent; exec replaces the "
+    "process image with a new program so the shell can redirect in between.",
+    "The kernel switches context by saving registers of the running process and "
+    "restoring another process's saved state, then resuming it.",
+    "A pipe is a one-way kernel buffer; the writer blocks when it is full and the "
+    "reader blocks when it is empty.",
+]
+
+
+async def run_load_test(
+    base_url: str,
+    token: str,
+    drill_id: str,
+    total_requests: int,
+    concurrency: int,
+    priority: str = "interactive",
+) -> tuple[list[float], Counter]:
+    """Fire requests with bounded concurrency; return latencies and status counts."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}", "X-Grading-Priority": priority},
+        timeout=120,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+
+        async def submit(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        f"/drills/{drill_id}/attempts",
+                        json={"user_response": f"{SAMPLE_RESPONSES[i % len(SAMPLE_RESPONSES)]} ({i})"},
+                    )
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(submit(i) for i in range(total_requests)))
+
+    return latencies, statuses
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(int(pct * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test drill attempt submission")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer token for a test user")
+    parser.add_argument("--drill-id", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--priority",
+        choices=["interactive", "batch"],
+        default="interactive",
+        help="Grading priority class (a single test user is also subject to per-user limits)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    latencies, statuses = asyncio.run(
+        run_load_test(
+            args.base_url,
+            args.token,
+            args.drill_id,
+            args.requests,
+            args.concurrency,
+            args.priority,
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    print("\n" + "=" * 60)
+    print("ATTEMPT LOAD TEST")
+    print("=" * 60)
+    print(f"\nRequests: {len(ordered)} at concurrency {args.concurrency} in {elapsed:.1f}s")
+    print(f"Throughput: {len(ordered) / elapsed:.1f} req/s")
+    print(f"Latency p50: {percentile(ordered, 0.50) * 1000:.0f}ms")
+    print(f"Latency p95: {percentile(ordered, 0.95) * 1000:.0f}ms")
+    print(f"Latency p99: {percentile(ordered, 0.99) * 1000:.0f}ms")
+    print(f"Latency mean: {statistics.mean(ordered) * 1000:.0f}ms")
+    print(f"Status codes: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Pre-Grader Precision Report
+
+Responsibility: Replays historical AI-graded attempts through the local
+pre-grader and reports how often it would have short-circuited, and how
+often those short-circuits agreed with the AI's low score.
+
+Usage:
+    python -m scripts.pregrader_report                      # Default sweep
+    python -m scripts.pregrader_report --fail-threshold 0.2 # What counts as a fail
+    python -m scripts.pregrader_report --target-precision 0.99
+
+An attempt counts as a true fail when the AI scored it at or below
+--fail-threshold of max_score. Precision is the share of short-circuited
+attempts that were true fails; that is the number to keep near 1.0.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from supabase import Client, create_client
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.pregrader import PreGrader, PreGradeSignals
+
+PAGE_SIZE = 500
+SIMILARITY_SWEEP = [0.0, 0.02, 0.04, 0.06, 0.08, 0.10, 0.15, 0.20]
+
+
+@dataclass
+class ThresholdStats:
+    """Confusion counts for a single threshold setting."""
+
+    min_similarity: float
+    short_circuited: int = 0
+    true_positives: int = 0
+    false_positives: int = 0
+    fails: int = 0
+    total: int = 0
+
+    @property
+    def precision(self) -> float:
+        return self.true_positives / self.short_circuited if self.short_circuited else 1.0
+
+    @property
+    def recall(self) -> float:
+        return self.true_positives / self.fails if self.fails else 0.0
+
+    @property
+    def short_circuit_rate(self) -> float:
+        return self.short_circuited / self.total if self.total else 0.0
+
+
+def get_supabase_client() -> Client:
+    """Create Supabase client using service role key."""
+    return create_client(settings.supabase_url, settings.supabase_service_key)
+
+
+def fetch_rubrics(client: Client) -> dict[str, tuple[str, dict[str, Any]]]:
+    """Map drill_id -> (drill_type, rubric)."""
+    response = client.table("drills").select("id, drill_type, rubric").execute()
+    return {row["id"]: (row["drill_type"], row["rubric"]) for row in response.data}
+
+
+def iter_graded_attempts(client: Client, limit: int | None):
+    """Yield historical attempts page by page, oldest first."""
+    fetched = 0
+    start = 0
+
+    while limit is None or fetched < limit:
+        response = (
+            client.table("drill_attempts")
+            .select("drill_id, user_response, ai_feedback, score, max_score")
+            .order("created_at")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        )
+        if not response.data:
+            return
+
+        for row in response.data:
+            yield row
+            fetched += 1
+            if limit is not None and fetched >= limit:
+                return
+
+        start += PAGE_SIZE
+
+
+def collect_signals(
+    client: Client, limit: int | None
+) -> list[tuple[PreGradeSignals, float]]:
+    """Measure pre-grader signals for every AI-graded free-text attempt."""
+    rubrics = fetch_rubrics(client)
+    measurer = PreGrader()
+    samples = []
+
+    for attempt in iter_graded_attempts(client, limit):
+        # Attempts already short-circuited have no AI score to compare against
+        if (attempt.get("ai_feedback") or {}).get("grader") == "pregrader":
+            continue
+        if attempt["drill_id"] not in rubrics or not attempt.get("max_score"):
+            continue
+
+        drill_type, rubric = rubrics[attempt["drill_id"]]
+        if drill_type == "quiz":
+            continue
+
+        signals = measurer.measure(rubric, attempt["user_response"])
+        samples.append((signals, attempt["score"] / attempt["max_score"]))
+
+    return samples
+
+
+def sweep_thresholds(
+    samples: list[tuple[PreGradeSignals, float]], fail_threshold: float
+) -> list[ThresholdStats]:
+    """Evaluate the decision rule for each similarity threshold."""
+    results = []
+
+    for min_similarity in SIMILARITY_SWEEP:
+        pregrader = PreGrader(
+            min_similarity=min_similarity,
+            min_content_words=settings.pregrade_min_content_words,
+            max_gibberish_ratio=settings.pregrade_max_gibberish_ratio,
+        )
+        stats = ThresholdStats(min_similarity=min_similarity)
+
+        for signals, score_pct in samples:
+            is_fail = score_pct <= fail_threshold
+            stats.total += 1
+            stats.fails += is_fail
+
+            if pregrader.decide(signals).short_circuit:
+                stats.short_circuited += 1
+                if is_fail:
+                    stats.true_positives += 1
+                else:
+                    stats.false_positives += 1
+
+        results.append(stats)
+
+    return results
+
+
+def print_report(results: list[ThresholdStats], target_precision: float) -> None:
+    """Print the threshold sweep and a recommended setting."""
+    print("\n" + "=" * 60)
+    print("PRE-GRADER PRECISION REPORT")
+    print("=" * 60)
+
+    if not results or results[0].total == 0:
+        print("\nNo AI-graded attempts found")
+        return
+
+    print(f"\nAttempts analysed: {results[0].total} ({results[0].fails} AI fails)")
+    print(f"\n{'min_sim':>8} {'skipped':>9} {'rate':>7} {'precision':>10} {'recall':>7} {'FP':>5}")
+    for stats in results:
+        print(
+            f"{stats.min_similarity:>8.2f} {stats.short_circuited:>9} "
+            f"{stats.short_circuit_rate:>7.1%} {stats.precision:>10.1%} "
+            f"{stats.recall:>7.1%} {stats.false_positives:>5}"
+        )
+
+    eligible = [s for s in results if s.precision >= target_precision]
+    if eligible:
+        best = max(eligible, key=lambda s: s.recall)
+        print(
+            f"\n✅ Recommended PREGRADE_MIN_SIMILARITY={best.min_similarity} "
+            f"(precision {best.precision:.1%}, skips {best.short_circuit_rate:.1%})"
+        )
+    else:
+        print(f"\n⚠️  No threshold reaches {target_precision:.0%} precision")
+
+    print(f"   Current setting: {settings.pregrade_min_similarity}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay historical attempts through the pre-grader"
+    )
+    parser.add_argument(
+        "--fail-threshold",
+        type=float,
+        default=0.2,
+        help="AI score fraction at or below which an attempt counts as a fail",
+    )
+    parser.add_argument(
+        "--target-precision",
+        type=float,
+        default=0.98,
+        help="Minimum precision required for a recommended threshold",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Only analyse the first N attempts",
+    )
+    args = parser.parse_args()
+
+    try:
+        client = get_supabase_client()
+    except Exception as e:
+        print(f"Error connecting to Supabase: {e}")
+        sys.exit(1)
+
+    samples = collect_signals(client, args.limit)
+    results = sweep_thresholds(samples, args.fail_threshold)
+    print_report(results, args.target_precision)
+
+
+if __name__ == "__main__":
+    main()
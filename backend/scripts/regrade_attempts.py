@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Offline Re-Grading CLI
+
+Responsibility: Re-grades historical drill_attempts after a rubric change
+and optionally recalibrates mastery from the new scores.
+
+Usage:
+    python -m scripts.regrade_attempts --drill-slug explain-fork-exec --dry-run
+    python -m scripts.regrade_attempts --drills-updated-since 2026-10-01
+    python -m scripts.regrade_attempts --drill-slug explain-fork-exec --resume
+    python -m scripts.regrade_attempts --drill-slug explain-fork-exec --apply-mastery
+
+How it works:
+- Attempts are streamed in keyset pages ordered by (created_at, id), so
+  deep pages cost the same as the first and no OFFSET scans are needed
+- Each page is graded by a bounded async worker pool behind a token-bucket
+  rate limiter
+- Results are upserted into drill_attempt_regrades in batches, keyed by
+  (attempt_id, rubric_version) so re-runs are idempotent
+- After each page is written, the keyset position is checkpointed to disk;
+  --resume continues from there after a crash or Ctrl-C
+
+Batch lane: this runs in its own process with its own concurrency, rate
+limit and circuit breaker, and defaults low enough that interactive
+grading keeps the provider quota. It does not go through the API's
+grading scheduler (or its "batch" priority), which is per process.
+Point it at a separate model or key via AI_MODEL / GEMINI_API_KEY /
+OPENAI_BASE_URL in its environment if needed.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from supabase import Client, create_client
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.grading import GradingService
+from app.services.openai_client import OpenAIClient
+from app.services.pregrader import PreGrader
+from app.services.resilience import ResilientCaller, RetryPolicy
+from app.services.scheduler import calculate_next_review
+
+DEFAULT_CHECKPOINT = Path(".regrade_checkpoint.json")
+
+
+# =============================================================================
+# DATA STRUCTURES
+# =============================================================================
+
+
+@dataclass
+class RegradeStats:
+    """Running totals for the re-grade run."""
+
+    attempts_seen: int = 0
+    regraded: int = 0
+    failed: int = 0
+    written: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class TokenBucket:
+    """Async rate limiter: at most `rate` acquisitions per second, bursting to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# =============================================================================
+# CHECKPOINTING
+# =============================================================================
+
+
+def load_checkpoint(path: Path, run_key: str) -> tuple[str, str] | None:
+    """Return the last written (created_at, id) for this run, if any."""
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text())
+    if data.get("run_key") != run_key:
+        print(f"Checkpoint {path} belongs to a different run; ignoring it")
+        return None
+    return data["created_at"], data["id"]
+
+
+def save_checkpoint(path: Path, run_key: str, position: tuple[str, str]) -> None:
+    """Atomically persist the keyset position."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"run_key": run_key, "created_at": position[0], "id": position[1]})
+    )
+    tmp.replace(path)
+
+
+# =============================================================================
+# DATABASE OPERATIONS
+# =============================================================================
+
+
+def fetch_target_drills(
+    client: Client, slugs: list[str], updated_since: str | None
+) -> dict[str, dict[str, Any]]:
+    """Resolve the drills whose attempts should be re-graded."""
+    query = client.table("drills").select(
+        "id, slug, drill_type, prompt_markdown, rubric, estimated_minutes, updated_at"
+    )
+    if slugs:
+        query = query.in_("slug", slugs)
+    if updated_since:
+        query = query.gte("updated_at", updated_since)
+    return {row["id"]: row for row in query.execute().data}
+
+
+def keyset_after(column: str, position: tuple[str, str]) -> str:
+    """PostgREST filter for rows after `position` in (column, id) order."""
+    value, row_id = position
+    # Timestamps contain '+', ':' and '.', so they must be quoted
+    return f'{column}.gt."{value}",and({column}.eq."{value}",id.gt.{row_id})'
+
+
+def fetch_attempt_page(
+    client: Client,
+    drill_ids: list[str],
+    after: tuple[str, str] | None,
+    page_size: int,
+) -> list[dict[str, Any]]:
+    """Fetch the next keyset page of attempts ordered by (created_at, id)."""
+    query = (
+        client.table("drill_attempts")
+        .select("id, user_id, drill_id, user_response, created_at")
+        .in_("drill_id", drill_ids)
+    )
+    if after:
+        query = query.or_(keyset_after("created_at", after))
+    return query.order("created_at").order("id").limit(page_size).execute().data
+
+
+def write_regrades(client: Client, rows: list[dict[str, Any]]) -> None:
+    """Upsert a batch of re-grade rows in a single request."""
+    client.table("drill_attempt_regrades").upsert(
+        rows, on_conflict="attempt_id,rubric_version"
+    ).execute()
+
+
+# =============================================================================
+# RE-GRADING
+# =============================================================================
+
+
+async def regrade_page(
+    attempts: list[dict[str, Any]],
+    drills: dict[str, dict[str, Any]],
+    grading_service: GradingService,
+    limiter: TokenBucket,
+    concurrency: int,
+    stats: RegradeStats,
+) -> list[dict[str, Any]]:
+    """Grade one page of attempts with a bounded worker pool."""
+    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    for attempt in attempts:
+        queue.put_nowait(attempt)
+    results: list[dict[str, Any]] = []
+
+    async def worker() -> None:
+        while True:
+            try:
+                attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            drill = drills[attempt["drill_id"]]
+            await limiter.acquire()
+            try:
+                feedback = await grading_service.grade_drill_response(
+                    drill_id=drill["id"],
+                    prompt=drill["prompt_markdown"],
+                    rubric=drill["rubric"],
+                    user_response=attempt["user_response"],
+                    drill_type=drill["drill_type"],
+                    estimated_minutes=drill["estimated_minutes"],
+                )
+            except Exception as e:
+                stats.failed += 1
+                print(f"   ❌ attempt {attempt['id']}: {e}")
+                continue
+
+            stats.regraded += 1
+            results.append(
+                {
+                    "attempt_id": attempt["id"],
+                    "user_id": attempt["user_id"],
+                    "drill_id": drill["id"],
+                    "rubric_version": drill["updated_at"],
+                    "attempt_created_at": attempt["created_at"],
+                    "ai_feedback": feedback,
+                    "score": feedback["total_score"],
+                    "max_score": feedback["max_score"],
+                }
+            )
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def build_grading_service() -> GradingService:
+    """Grading service for this process, with its own caller and breaker."""
+    # Own caller: batch failures must not trip the interactive circuit breaker
+    caller = ResilientCaller(
+        policy=RetryPolicy(
+            max_attempts=settings.ai_max_attempts,
+            attempt_timeout=settings.ai_call_timeout_seconds,
+            total_deadline=settings.ai_total_deadline_seconds,
+        )
+    )
+    pregrader = PreGrader.from_settings() if settings.pregrade_enabled else None
+    return GradingService(OpenAIClient(caller=caller), pregrader=pregrader)
+
+
+async def run_regrade(
+    client: Client,
+    drills: dict[str, dict[str, Any]],
+    grading_service: GradingService,
+    args,
+) -> RegradeStats:
+    """Stream, grade, write and checkpoint every affected attempt."""
+    stats = RegradeStats()
+    run_key = ",".join(sorted(f"{d['id']}@{d['updated_at']}" for d in drills.values()))
+    drill_ids = list(drills)
+
+    position = load_checkpoint(args.checkpoint, run_key) if args.resume else None
+    if position:
+        print(f"Resuming after attempt {position[1]} ({position[0]})")
+
+    limiter = TokenBucket(rate=args.rate, burst=args.concurrency)
+
+    while True:
+        page = await asyncio.to_thread(fetch_attempt_page, client, drill_ids, position, args.page_size)
+        if not page:
+            break
+        stats.attempts_seen += len(page)
+        failed_before = stats.failed
+
+        results = await regrade_page(page, drills, grading_service, limiter, args.concurrency, stats)
+
+        if not args.dry_run:
+            for start in range(0, len(results), args.batch_size):
+                batch = results[start : start + args.batch_size]
+                await asyncio.to_thread(write_regrades, client, batch)
+                stats.written += len(batch)
+
+        # Don't checkpoint past failures; --resume re-grades this page (writes are idempotent)
+        if stats.failed > failed_before:
+            break
+
+        position = (page[-1]["created_at"], page[-1]["id"])
+        if not args.dry_run:
+            save_checkpoint(args.checkpoint, run_key, position)
+
+        elapsed = time.monotonic() - stats.started_at
+        print(
+            f"   {stats.attempts_seen} attempts, {stats.regraded} graded, "
+            f"{stats.failed} failed ({stats.regraded / elapsed:.1f}/s)"
+        )
+
+    return stats
+
+
+# =============================================================================
+# MASTERY RECALIBRATION
+# =============================================================================
+
+
+def recalibrate_mastery(
+    client: Client,
+    drills: dict[str, dict[str, Any]],
+    grading_service: GradingService,
+    dry_run: bool,
+) -> int:
+    """Replay re-graded scores in order to recompute mastery per user and drill."""
+    history: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+
+    for drill in drills.values():
+        after: tuple[str, str] | None = None
+        while True:
+            query = (
+                client.table("drill_attempt_regrades")
+                .select("id, user_id, drill_id, attempt_created_at, score, max_score")
+                .eq("drill_id", drill["id"])
+                .eq("rubric_version", drill["updated_at"])
+            )
+            if after:
+                query = query.or_(keyset_after("attempt_created_at", after))
+            rows = query.order("attempt_created_at").order("id").limit(1000).execute().data
+            if not rows:
+                break
+            for row in rows:
+                history[(row["user_id"], row["drill_id"])].append(row)
+            after = (rows[-1]["attempt_created_at"], rows[-1]["id"])
+
+    updated = 0
+    for (user_id, drill_id), rows in history.items():
+        mastery = 0
+        for row in rows:
+            pct = row["score"] / row["max_score"] if row["max_score"] else 0
+            mastery = grading_service.calculate_mastery_delta(mastery, pct)
+
+        last_attempt = datetime.fromisoformat(rows[-1]["attempt_created_at"])
+        next_review = calculate_next_review(mastery, last_attempt.astimezone(UTC))
+
+        if not dry_run:
+            (
+                client.table("user_drill_progress")
+                .update({"mastery_score": mastery, "next_review_due_at": next_review.isoformat()})
+                .eq("user_id", user_id)
+                .eq("drill_id", drill_id)
+                .execute()
+            )
+        updated += 1
+
+    return updated
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-grade historical attempts after a rubric change")
+    parser.add_argument("--drill-slug", action="append", default=[], help="Drill slug to re-grade (repeatable)")
+    parser.add_argument("--drills-updated-since", help="Re-grade drills whose rubric changed since this ISO date")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent grading calls")
+    parser.add_argument("--rate", type=float, default=2.0, help="Max grading calls per second")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50, help="Rows per write")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    parser.add_argument("--apply-mastery", action="store_true", help="Recompute mastery from re-grades")
+    parser.add_argument("--dry-run", action="store_true", help="Grade but don't write anything")
+    args = parser.parse_args()
+
+    if not args.drill_slug and not args.drills_updated_since:
+        parser.error("Pass --drill-slug and/or --drills-updated-since")
+
+    try:
+        client = create_client(settings.supabase_url, settings.supabase_service_key)
+    except Exception as e:
+        print(f"Error connecting to Supabase: {e}")
+        sys.exit(1)
+
+    drills = fetch_target_drills(client, args.drill_slug, args.drills_updated_since)
+    if not drills:
+        print("No matching drills")
+        return
+
+    print(f"Re-grading attempts for {len(drills)} drills: {', '.join(d['slug'] for d in drills.values())}")
+    grading_service = build_grading_service()
+    stats = asyncio.run(run_regrade(client, drills, grading_service, args))
+
+    print("\n" + "=" * 60)
+    print(f"REGRADE RESULT ({'DRY RUN' if args.dry_run else 'APPLIED'})")
+    print("=" * 60)
+    print(f"\nAttempts: {stats.attempts_seen}, graded: {stats.regraded}, failed: {stats.failed}, written: {stats.written}")
+
+    if args.apply_mastery:
+        updated = recalibrate_mastery(client, drills, grading_service, args.dry_run)
+        print(f"Mastery recalibrated for {updated} user/drill pairs")
+
+    if stats.failed:
+        print("\n⚠️  Some attempts failed; re-run with --resume after fixing the cause")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
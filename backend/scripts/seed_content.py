@@ -329,7 +329,7 @@ def upsert_drill(
         "slug": drill.slug,
         "drill_type": drill.drill_type.value,
         "prompt_markdown": drill.prompt_markdown,
-        "rubric": drill.rubric.model_dump(),
+        "rubric": drill.rubric.model_dump(mode="json", exclude_none=True),
         "difficulty": drill.difficulty,
         "estimated_minutes": drill.estimated_minutes,
         "concept_tags": drill.concept_tags,
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Stub AI Server
+
+Responsibility: Local OpenAI-compatible /v1/chat/completions endpoint backed
+by the deterministic StubProvider. Lets the full attempt path (including
+the HTTP provider and its connection handling) run on an isolated machine.
+
+Usage:
+    python -m scripts.stub_ai_server --port 9100 --latency-ms 800 --error-rate 0.02
+
+Then point the API at it:
+    AI_PROVIDER=openai OPENAI_BASE_URL=http://localhost:9100/v1 uvicorn app.main:app
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ai_providers import StubProvider
+from app.services.resilience import AIProviderError
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str = "stub-grader"
+    messages: list[ChatMessage]
+    temperature: float = 0.3
+    max_tokens: int | None = None
+    response_format: dict | None = None
+
+
+def create_app(provider: StubProvider) -> FastAPI:
+    """Build the stub server around a configured StubProvider."""
+    app = FastAPI(title="Init Stub AI Server")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: ChatCompletionRequest):
+        system_prompt = next((m.content for m in request.messages if m.role == "system"), "")
+        user_prompt = next((m.content for m in request.messages if m.role == "user"), "")
+        json_output = (request.response_format or {}).get("type") == "json_object"
+
+        try:
+            response = await provider.generate(
+                system_prompt,
+                user_prompt,
+                temperature=request.temperature,
+                max_output_tokens=request.max_tokens,
+                json_output=json_output,
+            )
+        except AIProviderError as e:
+            raise HTTPException(status_code=503, detail=str(e)) from e
+
+        return {
+            "id": f"stub-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": response.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": response.text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": response.prompt_tokens,
+                "completion_tokens": response.output_tokens,
+                "total_tokens": response.prompt_tokens + response.output_tokens,
+            },
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub grader")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal spread of latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    provider = StubProvider(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(provider), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
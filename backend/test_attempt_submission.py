@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""Test the attempt submission endpoint against a scripted provider and a fake database."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; grading and storage are faked below
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_user_id
+from app.core.config import settings
+from app.core.supabase import get_supabase_client
+from app.main import app
+from app.services import (
+    ai_providers,
+    content_snapshot,
+    grading_scheduler,
+    idempotency,
+    resilience,
+)
+from app.services.ai_providers import AIProvider, ProviderResponse
+from app.services.content_snapshot import ContentStore
+from app.services.grading import GradingService
+from app.services.grading_scheduler import FairGradingScheduler
+from app.services.resilience import AIProviderError, ResilientCaller, RetryPolicy
+from app.services.scheduler import calculate_next_review
+from test_content_snapshot import FakeContentDB
+
+ANSWER = "fork duplicates the calling process and exec replaces its program image"
+
+GRADE = {
+    "criterion_scores": {"accuracy": 7},
+    "total_score": 7,
+    "max_score": 10,
+    "feedback": "Mostly right.",
+    "strengths": ["Names both calls"],
+    "improvements": ["Mention file descriptors"],
+}
+
+
+class ScriptedProvider(AIProvider):
+    """Returns GRADE after `delay` seconds, or raises `error`."""
+
+    model = "scripted"
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay, self.error = delay, error
+        self.calls = 0
+        self.finished_at: float | None = None
+
+    async def generate(self, system_prompt, user_prompt, **_):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        self.finished_at = time.monotonic()
+        if self.error:
+            raise self.error
+        return ProviderResponse(
+            text=json.dumps(GRADE), model=self.model, prompt_tokens=100, output_tokens=20
+        )
+
+
+class FakeSubmitDB:
+    """user_drill_progress reads and the record_drill_attempt RPC, in memory."""
+
+    def __init__(
+        self, mastery: int | None = None, progress_delay: float = 0.0, rpc_delay: float = 0.0
+    ):
+        self.progress = [] if mastery is None else [{"mastery_score": mastery}]
+        self.progress_delay = progress_delay
+        self.rpc_delay = rpc_delay
+        self.progress_started_at: float | None = None
+        self.progress_done = threading.Event()
+        self.rpcs: list[tuple[str, dict]] = []
+
+    def table(self, name: str):
+        assert name == "user_drill_progress"
+        return _FakeProgressQuery(self)
+
+    def rpc(self, name: str, params: dict):
+        return _FakeRPC(self, name, params)
+
+
+class _FakeProgressQuery:
+    def __init__(self, db: FakeSubmitDB):
+        self.db = db
+
+    def select(self, *_):
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def execute(self):
+        self.db.progress_started_at = time.monotonic()
+        time.sleep(self.db.progress_delay)
+        self.db.progress_done.set()
+        return type("R", (), {"data": self.db.progress})
+
+
+class _FakeRPC:
+    def __init__(self, db: FakeSubmitDB, name: str, params: dict):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self):
+        assert self.name == "record_drill_attempt"
+        time.sleep(self.db.rpc_delay)
+        self.db.rpcs.append((self.name, self.params))
+        return type(
+            "R",
+            (),
+            {
+                "data": {
+                    "attempt_id": f"attempt-{len(self.db.rpcs)}",
+                    "attempt_created_at": "2026-10-19T12:00:00+00:00",
+                    "progress": {
+                        "user_id": self.params["p_user_id"],
+                        "drill_id": self.params["p_drill_id"],
+                        "mastery_score": self.params["p_mastery_score"],
+                    },
+                }
+            },
+        )
+
+
+@contextmanager
+def submitting(provider: AIProvider, db: FakeSubmitDB, scheduler: FairGradingScheduler | None = None):
+    """Route submissions for user-1 to `provider` and `db` with fresh per-process state."""
+    store = ContentStore(FakeContentDB, check_interval_seconds=3600)
+    asyncio.run(store.load())
+
+    saved = (
+        ai_providers._provider,
+        resilience._caller,
+        grading_scheduler._scheduler,
+        idempotency._store,
+        content_snapshot._store,
+        settings.follow_up_enabled,
+        settings.pregrade_enabled,
+        settings.duplicate_enabled,
+        settings.grading_on_disconnect,
+        settings.grading_disconnect_poll_seconds,
+    )
+    ai_providers._provider = provider
+    resilience._caller = ResilientCaller(policy=RetryPolicy(max_attempts=1))
+    grading_scheduler._scheduler = scheduler or FairGradingScheduler()
+    idempotency._store = None
+    content_snapshot._store = store
+    # Every submission reaches the provider exactly once
+    settings.follow_up_enabled = settings.pregrade_enabled = settings.duplicate_enabled = False
+    settings.grading_disconnect_poll_seconds = 0.01
+    app.dependency_overrides[get_supabase_client] = lambda: db
+    app.dependency_overrides[get_current_user_id] = lambda: "user-1"
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        (
+            ai_providers._provider,
+            resilience._caller,
+            grading_scheduler._scheduler,
+            idempotency._store,
+            content_snapshot._store,
+            settings.follow_up_enabled,
+            settings.pregrade_enabled,
+            settings.duplicate_enabled,
+            settings.grading_on_disconnect,
+            settings.grading_disconnect_poll_seconds,
+        ) = saved
+
+
+def submit(client: TestClient, answer: str = ANSWER, **headers):
+    return client.post("/drills/d1/attempts", json={"user_response": answer}, headers=headers)
+
+
+def timed_submit() -> tuple[httpx.Response, float, int]:
+    """
+    Submit on a loop that outlives the response.
+
+    TestClient's loop shuts down, waiting for worker threads, before the
+    call returns, so it can't show a response arriving ahead of a thread.
+    Returns the response, its latency and how many tasks it left running.
+    """
+
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            response = await client.post("/drills/d1/attempts", json={"user_response": ANSWER})
+            elapsed = time.perf_counter() - started
+            return response, elapsed, len(asyncio.all_tasks()) - 1
+
+    return asyncio.run(post())
+
+
+def submit_then_disconnect(after: float, idempotency_key: str | None = None) -> int:
+    """Submit over raw ASGI, going away `after` seconds in; returns the status sent."""
+    headers = [(b"content-type", b"application/json")]
+    if idempotency_key:
+        headers.append((b"idempotency-key", idempotency_key.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/drills/d1/attempts",
+        "raw_path": b"/drills/d1/attempts",
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("test", 50000),
+        "server": ("test", 80),
+    }
+    body = json.dumps({"user_response": ANSWER}).encode()
+
+    async def scenario():
+        gone = asyncio.Event()
+        asyncio.get_running_loop().call_later(after, gone.set)
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Must not suspend once gone: is_disconnected() polls under a cancelled scope
+            if not gone.is_set():
+                await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await app(scope, receive, send)
+        return statuses[0]
+
+    return asyncio.run(scenario())
+
+
+def test_user_over_limit_gets_429_with_retry_after():
+    """A user at their in-flight limit is turned away before any AI call."""
+    provider, db = ScriptedProvider(), FakeSubmitDB()
+    scheduler = FairGradingScheduler(max_in_flight_per_user=1)
+
+    with submitting(provider, db, scheduler) as client:
+        asyncio.run(scheduler.acquire("user-1"))
+        response = submit(client)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert provider.calls == 0 and db.rpcs == []
+
+        # The user's own call finishing frees their next one
+        scheduler.release("user-1")
+        assert submit(client).status_code == 200
+
+
+def test_progress_is_fetched_while_grading():
+    """The mastery read overlaps the provider call instead of following it."""
+    provider, db = ScriptedProvider(delay=0.2), FakeSubmitDB(mastery=2, progress_delay=0.2)
+
+    with submitting(provider, db) as client:
+        started = time.perf_counter()
+        response = submit(client)
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert db.progress_started_at < provider.finished_at
+    assert elapsed < 0.35, f"Progress fetch ran after grading ({elapsed:.2f}s)"
+
+
+def test_failed_grading_does_not_wait_for_progress():
+    """A grading error cancels the progress fetch and nothing is written."""
+    provider = ScriptedProvider(error=AIProviderError("provider down"))
+    db = FakeSubmitDB(mastery=2, progress_delay=0.5)
+
+    with submitting(provider, db):
+        response, elapsed, running = timed_submit()
+
+    assert response.status_code == 502
+    # The error is returned while the (uncancellable) thread is still
+    # reading, and the task awaiting it has been cancelled
+    assert elapsed < 0.4, f"Waited for the progress fetch ({elapsed:.2f}s)"
+    assert running == 0
+    assert db.rpcs == []
+
+
+
+def test_attempt_is_recorded_in_one_rpc():
+    """Grade, new mastery and review date go to record_drill_attempt; its row comes back."""
+    provider, db = ScriptedProvider(), FakeSubmitDB(mastery=2)
+
+    with submitting(provider, db) as client:
+        submitted_at = datetime.now(UTC)
+        response = submit(client)
+
+    assert response.status_code == 200
+    [(_, params)] = db.rpcs
+    mastery = GradingService(None).calculate_mastery_delta(current_mastery=2, score_percentage=0.7)
+    assert params["p_user_id"] == "user-1" and params["p_drill_id"] == "d1"
+    assert params["p_user_response"] == ANSWER
+    assert (params["p_score"], params["p_max_score"]) == (7, 10)
+    assert params["p_mastery_score"] == mastery
+    due = datetime.fromisoformat(params["p_next_review_due_at"])
+    assert abs(due - calculate_next_review(mastery, submitted_at)) < timedelta(seconds=5)
+
+    feedback = params["p_ai_feedback"]
+    assert feedback["grader"] == "ai" and feedback["criterion_scores"] == {"accuracy": 7}
+    assert feedback["usage"]["prompt_tokens"] == 100
+
+    # The response is built from the RPC's attempt row and progress
+    body = response.json()
+    assert body["attempt_id"] == "attempt-1"
+    assert datetime.fromisoformat(body["created_at"]) == datetime(2026, 10, 19, 12, tzinfo=UTC)
+    assert body["mastery_score"] == mastery
+    assert (body["total_score"], body["max_score"]) == (7, 10)
+    assert body["strengths"] == GRADE["strengths"]
+    assert body["improvements"] == GRADE["improvements"]
+
+
+
+def test_idempotency_key_replays_the_first_result():
+    """A retry with the same key and body is answered without grading or storing again."""
+    provider, db = ScriptedProvider(), FakeSubmitDB()
+
+    with submitting(provider, db) as client:
+        first = submit(client, **{"Idempotency-Key": "retry-1"})
+        second = submit(client, **{"Idempotency-Key": "retry-1"})
+        other = submit(client, **{"Idempotency-Key": "retry-2"})
+
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    # A new key is a new attempt
+    assert other.json()["attempt_id"] != first.json()["attempt_id"]
+    assert provider.calls == 2 and len(db.rpcs) == 2
+
+
+def test_reused_key_with_a_different_answer_is_rejected():
+    """The same key with a different body is a client bug, not a retry."""
+    provider, db = ScriptedProvider(), FakeSubmitDB()
+
+    with submitting(provider, db) as client:
+        assert submit(client, **{"Idempotency-Key": "retry-1"}).status_code == 200
+        conflict = submit(client, ANSWER + " and wait reaps it", **{"Idempotency-Key": "retry-1"})
+
+    assert conflict.status_code == 422
+    assert "Idempotent-Replayed" not in conflict.headers
+    assert provider.calls == 1 and len(db.rpcs) == 1
+
+
+
+def test_disconnect_during_grading_cancels_it():
+    """In abort mode the provider call is cancelled, its slot and key released."""
+    provider, db = ScriptedProvider(delay=0.5), FakeSubmitDB()
+    scheduler = FairGradingScheduler()
+
+    with submitting(provider, db, scheduler) as client:
+        settings.grading_on_disconnect = "abort"
+        started = time.perf_counter()
+        status = submit_then_disconnect(0.1, idempotency_key="retry-1")
+        elapsed = time.perf_counter() - started
+
+        assert status == 499
+        assert elapsed < 0.4, f"Grading ran to completion ({elapsed:.2f}s)"
+        assert provider.finished_at is None
+        assert scheduler.running == 0 and scheduler.queued == 0
+        assert db.rpcs == []
+
+        # Nothing was stored, so a retry with the same key grades normally
+        retry = submit(client, **{"Idempotency-Key": "retry-1"})
+        assert retry.status_code == 200
+        assert "Idempotent-Replayed" not in retry.headers
+        assert len(db.rpcs) == 1
+
+
+def test_disconnect_while_recording_stores_the_attempt_once():
+    """A finished grade is recorded despite the disconnect; a retry replays it."""
+    provider, db = ScriptedProvider(), FakeSubmitDB(rpc_delay=0.3)
+
+    with submitting(provider, db) as client:
+        settings.grading_on_disconnect = "abort"
+        assert submit_then_disconnect(0.1, idempotency_key="retry-1") == 499
+        assert len(db.rpcs) == 1
+
+        retry = submit(client, **{"Idempotency-Key": "retry-1"})
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["attempt_id"] == "attempt-1"
+    assert provider.calls == 1 and len(db.rpcs) == 1
+
+
+def test_finish_mode_grades_and_stores_after_disconnect():
+    """In finish mode the client going away changes nothing."""
+    provider, db = ScriptedProvider(delay=0.3), FakeSubmitDB()
+    scheduler = FairGradingScheduler()
+
+    with submitting(provider, db, scheduler):
+        settings.grading_on_disconnect = "finish"
+        assert submit_then_disconnect(0.1) == 200
+
+    assert provider.finished_at is not None
+    assert len(db.rpcs) == 1
+    assert scheduler.running == 0
+
+
+if __name__ == "__main__":
+    test_user_over_limit_gets_429_with_retry_after()
+    test_progress_is_fetched_while_grading()
+    test_failed_grading_does_not_wait_for_progress()
+    test_attempt_is_recorded_in_one_rpc()
+    test_idempotency_key_replays_the_first_result()
+    test_reused_key_with_a_different_answer_is_rejected()
+    test_disconnect_during_grading_cancels_it()
+    test_disconnect_while_recording_stores_the_attempt_once()
+    test_finish_mode_grades_and_stores_after_disconnect()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""Test the in-memory content snapshot, the endpoints served from it and their ETags."""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; content is served from a fake database below
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+from app.services import content_snapshot
+from app.services.content_snapshot import ContentStore
+
+
+class FakeContentDB:
+    """Serves content tables with PostgREST-style range paging."""
+
+    def __init__(self, version: int = 1):
+        self.version = version
+        self.reads = 0
+        self.tables = {
+            "tracks": [
+                {"id": "t1", "slug": "systems-foundations", "title": "Systems", "description": "OS"},
+            ],
+            "units": [
+                {"id": "u1", "track_id": "t1", "order_index": 1, "title": "Processes", "summary_markdown": ""},
+                {"id": "u0", "track_id": "t1", "order_index": 0, "title": "Shell", "summary_markdown": ""},
+            ],
+            "drills": [
+                self._drill("d1", "u0", "explain-fork-exec"),
+                self._drill("d2", "u0", "debug-zombie"),
+                self._drill("d3", "u1", "explain-context-switch"),
+            ],
+        }
+
+    @staticmethod
+    def _drill(drill_id: str, unit_id: str, slug: str) -> dict:
+        return {
+            "id": drill_id,
+            "unit_id": unit_id,
+            "slug": slug,
+            "drill_type": "explain",
+            "difficulty": 1,
+            "estimated_minutes": 5,
+            "concept_tags": [],
+            "prompt_markdown": "Explain.",
+            "rubric": {"criteria": [], "expected_key_points": []},
+            "created_at": f"2026-01-0{drill_id[1]}T00:00:00+00:00",
+        }
+
+    def table(self, name: str):
+        return _FakeQuery(self, name)
+
+
+class _FakeQuery:
+    def __init__(self, db: FakeContentDB, name: str):
+        self.db, self.name, self.bounds = db, name, None
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_):
+        return self
+
+    def limit(self, *_):
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.db.reads += 1
+        if self.name == "content_version":
+            return type("R", (), {"data": [{"version": self.db.version}]})
+        rows = sorted(self.db.tables[self.name], key=lambda r: r["id"])
+        start, end = self.bounds
+        return type("R", (), {"data": rows[start : end + 1]})
+
+
+def test_snapshot_indexes_content():
+    """Lookups match the queries the routers used to run."""
+    store = ContentStore(FakeContentDB)
+    snapshot = asyncio.run(store.load())
+
+    assert snapshot.version == 1
+    assert snapshot.tracks_by_slug["systems-foundations"]["id"] == "t1"
+    assert [u["id"] for u in snapshot.units_by_track["t1"]] == ["u0", "u1"]
+    assert snapshot.unit_by_position[("t1", 1)]["id"] == "u1"
+    assert [d["slug"] for d in snapshot.drills_by_unit["u0"]] == ["debug-zombie", "explain-fork-exec"]
+    assert snapshot.drill_by_unit_slug[("u1", "explain-context-switch")]["id"] == "d3"
+    assert [d["id"] for d in snapshot.drills] == ["d1", "d2", "d3"]
+
+
+def test_version_change_swaps_snapshot_in_background():
+    """Requests keep the old snapshot until the new one is built."""
+
+    async def scenario():
+        db = FakeContentDB()
+        store = ContentStore(lambda: db, check_interval_seconds=0)
+        first = await store.load()
+
+        # Unchanged version: the check is one tiny read, no reload
+        assert await store.current() is first
+        await store._refresh
+        assert await store.current() is first
+
+        db.version = 2
+        db.tables["drills"].append(FakeContentDB._drill("d4", "u1", "explain-pipes"))
+        await asyncio.sleep(0)
+        stale = await store.current()
+        assert stale is first  # Served while revalidating
+        await store._refresh
+        fresh = await store.current()
+        assert fresh.version == 2 and "d4" in fresh.drills_by_id
+
+    asyncio.run(scenario())
+
+
+def test_read_endpoints_serve_from_snapshot():
+    """Track and unit endpoints make no database calls with a snapshot."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    asyncio.run(store.load())
+    reads_after_load = db.reads
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        units = client.get("/tracks/systems-foundations/units").json()
+        assert [(u["id"], u["drill_count"]) for u in units] == [("u0", 2), ("u1", 1)]
+        assert client.get("/tracks/systems-foundations/units/1").json()["title"] == "Processes"
+        assert client.get("/units/u0/drills/debug-zombie").json()["id"] == "d2"
+        assert client.get("/tracks/nope").status_code == 404
+        assert db.reads == reads_after_load
+    finally:
+        content_snapshot._store = previous
+
+
+def test_requests_revalidate_the_snapshot_after_the_interval():
+    """Once the interval passes, a request schedules the refresh and still gets a 200."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=0)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        # One event loop for every request, so refreshes run between them
+        with TestClient(app) as client:
+            assert client.get("/tracks").status_code == 200
+            db.version = 2
+            db.tables["tracks"][0]["title"] = "Systems, revised"
+
+            for _ in range(100):
+                response = client.get("/tracks")
+                assert response.status_code == 200
+                if response.json()[0]["title"] == "Systems, revised":
+                    break
+                time.sleep(0.01)
+            else:
+                raise AssertionError("snapshot was never refreshed")
+            assert store._snapshot.version == 2
+    finally:
+        content_snapshot._store = previous
+
+
+def test_track_bundle_nests_units_and_drills():
+    """The bundle matches what the three browse endpoints return separately."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        bundle = client.get("/tracks/systems-foundations/bundle").json()
+        units = client.get("/tracks/systems-foundations/units").json()
+
+        assert bundle["slug"] == "systems-foundations"
+        assert [{k: v for k, v in u.items() if k != "drills"} for u in bundle["units"]] == units
+        for unit in bundle["units"]:
+            assert unit["drills"] == client.get(f"/units/{unit['id']}/drills").json()
+        assert client.get("/tracks/nope/bundle").status_code == 404
+    finally:
+        content_snapshot._store = previous
+
+
+def test_prerendered_responses_match_model_serialization():
+    """Bytes stored with the snapshot are what the response models produce."""
+    from app.main import app
+    from app.models.drill import DrillSummary
+    from app.models.track import Track, Unit
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    snapshot = asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        track = client.get("/tracks/systems-foundations")
+        assert track.content == Track(**snapshot.tracks[0]).model_dump_json().encode()
+        assert "etag" in track.headers and track.headers["content-type"] == "application/json"
+
+        unit = client.get("/tracks/systems-foundations/units/0").json()
+        assert unit == Unit(**snapshot.units_by_id["u0"]).model_dump(mode="json")
+
+        drills = client.get("/units/u0/drills").json()
+        assert drills == [DrillSummary(**d).model_dump(mode="json") for d in snapshot.drills_by_unit["u0"]]
+        # A page smaller than the unit is built per request and matches
+        assert client.get("/units/u0/drills", params={"limit": 1}).json() == drills[:1]
+    finally:
+        content_snapshot._store = previous
+
+
+def test_trusted_rows_skip_validation_outside_debug():
+    """trusted() projects rows onto the response model; only debug validates them."""
+    import json
+
+    from fastapi import Response
+    from pydantic import ValidationError
+
+    from app.core.config import settings
+    from app.core.responses import trusted
+    from app.models.drill import DrillSummary, DrillView
+
+    row = FakeContentDB._drill("d1", "u0", "explain-fork-exec")
+    del row["concept_tags"]  # Filled in from the model's default
+    headers = Response(headers={"X-Next-Cursor": "abc"})
+
+    served = trusted([row], list[DrillSummary], headers)
+    assert json.loads(served.body) == [DrillSummary(**row).model_dump(mode="json")]
+    assert served.headers["x-next-cursor"] == "abc"
+
+    sparse = trusted({"id": "d1", "slug": "explain-fork-exec"}, DrillView, headers, exclude_unset=True)
+    assert json.loads(sparse.body) == {"id": "d1", "slug": "explain-fork-exec"}
+
+    bad = {**row, "difficulty": "hard"}
+    debug = settings.debug
+    try:
+        settings.debug = True
+        try:
+            trusted([bad], list[DrillSummary], headers)
+            raise AssertionError("expected a ValidationError")
+        except ValidationError:
+            pass
+        settings.debug = False
+        assert json.loads(trusted([bad], list[DrillSummary], headers).body)[0]["difficulty"] == "hard"
+    finally:
+        settings.debug = debug
+
+
+def test_msgpack_is_negotiated_with_its_own_etag():
+    """Accept: application/msgpack returns the same data as MessagePack."""
+    import msgpack
+
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        packed = {"Accept": "application/msgpack, application/json;q=0.5"}
+        for url in (
+            "/tracks/systems-foundations/bundle",  # Pre-rendered
+            "/units/u0/drills?limit=1",  # Encoded per request
+            "/units/u0/drills/debug-zombie?fields=slug",
+        ):
+            as_json = client.get(url)
+            as_msgpack = client.get(url, headers=packed)
+            assert as_msgpack.headers["content-type"] == "application/msgpack"
+            assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+            assert as_msgpack.headers["etag"] != as_json.headers["etag"]
+            assert "Accept" in as_msgpack.headers["vary"]
+
+        # JSON's ETag doesn't validate a MessagePack copy
+        etag = client.get("/tracks", headers=packed).headers["etag"]
+        assert client.get("/tracks", headers={**packed, "If-None-Match": etag}).status_code == 304
+        assert client.get("/tracks", headers={"If-None-Match": etag}).status_code == 200
+
+        # Errors stay JSON
+        missing = client.get("/tracks/nope", headers=packed)
+        assert missing.status_code == 404 and missing.json()["detail"]
+    finally:
+        content_snapshot._store = previous
+
+
+def test_large_content_is_compressed_once_and_small_content_is_not():
+    """Pre-rendered bodies are served precompressed; others are compressed per request."""
+    import brotli
+
+    from app.core.compression import COMPRESSED_RESPONSES, negotiate_encoding
+    from app.main import app
+
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+
+    db = FakeContentDB()
+    db.tables["drills"][1]["prompt_markdown"] = "Explain how `wait` reaps a zombie. " * 100
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    snapshot = asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        url = "/units/u0/drills/debug-zombie"
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        ahead = COMPRESSED_RESPONSES.value(encoding="br", source="ahead")
+        compressed = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+        assert compressed.headers["content-encoding"] == "br"
+        assert compressed.json() == plain.json()
+        assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-br"'
+        assert "Accept-Encoding" in compressed.headers["vary"]
+        assert COMPRESSED_RESPONSES.value(encoding="br", source="ahead") == ahead + 1
+        stored = snapshot.rendered[("drill", "u0", "debug-zombie")]
+        assert brotli.decompress(stored.compressed["br"].json) == plain.content
+
+        # Built per request: compressed by the middleware
+        sparse = client.get(url, params={"fields": "prompt_markdown"}, headers={"Accept-Encoding": "gzip"})
+        assert sparse.headers["content-encoding"] == "gzip"
+        assert sparse.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+        assert sparse.json()["prompt_markdown"] == plain.json()["prompt_markdown"]
+
+        # Either validator revalidates; the 304 echoes the one the client holds
+        for etag in (compressed.headers["etag"], plain.headers["etag"]):
+            revalidated = client.get(url, headers={"Accept-Encoding": "br", "If-None-Match": etag})
+            assert revalidated.status_code == 304 and revalidated.headers["etag"] == etag
+
+        # Below the size threshold: sent as-is, so the validator is unchanged
+        small = client.get("/tracks", headers={"Accept-Encoding": "gzip, br"})
+        assert "content-encoding" not in small.headers
+        assert small.headers["etag"] == plain.headers["etag"]
+    finally:
+        content_snapshot._store = previous
+
+
+def test_drill_fields_are_sparse_and_hide_the_rubric():
+    """fields= narrows the drill; the rubric can't be requested at all."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        url = "/units/u0/drills/debug-zombie"
+        full = client.get(url).json()
+        assert "prompt_markdown" in full and "rubric" not in full
+
+        assert client.get(url, params={"fields": "slug,difficulty"}).json() == {
+            "id": "d2",
+            "slug": "debug-zombie",
+            "difficulty": 1,
+        }
+        assert client.get(url, params={"fields": "rubric"}).status_code == 400
+    finally:
+        content_snapshot._store = previous
+
+
+def test_conditional_get_returns_304_until_content_changes():
+    """Matching If-None-Match gets an empty 304; reseeding changes the ETag."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        client = TestClient(app)
+        first = client.get("/units/u0/drills")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and "max-age" in first.headers["cache-control"]
+
+        # Every content route shares the snapshot's ETag
+        assert client.get("/tracks").headers["etag"] == etag
+
+        revalidated = client.get("/units/u0/drills", headers={"If-None-Match": f"W/{etag}"})
+        assert revalidated.status_code == 304 and revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        # Errors aren't cacheable
+        missing = client.get("/tracks/nope")
+        assert missing.status_code == 404 and "etag" not in missing.headers
+
+        db.tables["drills"][0]["prompt_markdown"] = "Explain again."
+        asyncio.run(store.load())
+        changed = client.get("/units/u0/drills", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+    finally:
+        content_snapshot._store = previous
+
+
+def test_conditional_get_while_revalidating():
+    """With every request checking the version, a current copy still gets a 304."""
+    from app.main import app
+
+    db = FakeContentDB()
+    store = ContentStore(lambda: db, check_interval_seconds=0)
+    asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        with TestClient(app) as client:
+            etag = client.get("/units/u0/drills").headers["etag"]
+            for _ in range(3):
+                revalidated = client.get("/units/u0/drills", headers={"If-None-Match": etag})
+                assert revalidated.status_code == 304 and revalidated.headers["etag"] == etag
+
+            db.version = 2
+            db.tables["drills"][0]["prompt_markdown"] = "Explain again."
+            for _ in range(100):
+                response = client.get("/units/u0/drills", headers={"If-None-Match": etag})
+                if response.status_code == 200:
+                    break
+                assert response.status_code == 304
+                time.sleep(0.01)
+            else:
+                raise AssertionError("snapshot was never refreshed")
+            assert response.headers["etag"] != etag
+    finally:
+        content_snapshot._store = previous
+
+
+if __name__ == "__main__":
+    test_snapshot_indexes_content()
+    test_version_change_swaps_snapshot_in_background()
+    test_read_endpoints_serve_from_snapshot()
+    test_requests_revalidate_the_snapshot_after_the_interval()
+    test_track_bundle_nests_units_and_drills()
+    test_prerendered_responses_match_model_serialization()
+    test_trusted_rows_skip_validation_outside_debug()
+    test_msgpack_is_negotiated_with_its_own_etag()
+    test_large_content_is_compressed_once_and_small_content_is_not()
+    test_drill_fields_are_sparse_and_hide_the_rubric()
+    test_conditional_get_returns_304_until_content_changes()
+    test_conditional_get_while_revalidating()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test near-duplicate grade reuse."""
+
+import asyncio
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; the stub never talks to either service
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from app.services.ai_providers import StubProvider
+from app.services.duplicate_index import (
+    DUPLICATE_AUDITS,
+    DuplicateIndex,
+    hamming_distance,
+)
+from app.services.grading import GradingService
+from app.services.openai_client import OpenAIClient
+from app.services.resilience import ResilientCaller
+
+CONTENT_DIR = Path(__file__).parent.parent / "content" / "systems-foundations"
+DRILL = json.loads((CONTENT_DIR / "drills" / "unit-00" / "explain-fork-exec.json").read_text())
+
+TEXTBOOK = (
+    "fork creates a new child process by duplicating the calling parent process. "
+    "The child gets a copy of the address space and file descriptors, and fork "
+    "returns zero in the child and the child pid in the parent. exec then replaces "
+    "the current process image with a new program loaded from disk, keeping the pid."
+)
+PASTED = TEXTBOOK.replace("The child gets", "the child gets").replace("disk,", "disk;") + " "
+REWORDED = TEXTBOOK.replace("loaded from disk", "loaded from the filesystem")
+DIFFERENT = (
+    "A pipe is a unidirectional byte stream between processes. The writer blocks "
+    "when the kernel buffer is full and the reader sees end of file once every "
+    "write end has been closed, which is why unused ends must be closed early."
+)
+
+
+class CountingProvider(StubProvider):
+    """Stub provider that counts grading calls."""
+
+    def __init__(self):
+        super().__init__(latency_ms=0)
+        self.grading_calls = 0
+
+    async def generate(self, system_prompt, user_prompt, **kwargs):
+        if kwargs.get("json_output", True):
+            self.grading_calls += 1
+        return await super().generate(system_prompt, user_prompt, **kwargs)
+
+
+def test_matches_near_duplicates_only():
+    """Cosmetic edits match; different answers and other rubrics don't."""
+    index = DuplicateIndex(audit_rate=0)
+    index.add("drill-1", DRILL["rubric"], TEXTBOOK, {"total_score": 7, "max_score": 10})
+
+    assert hamming_distance(index.fingerprint(TEXTBOOK), index.fingerprint(PASTED)) == 0
+    assert index.lookup("drill-1", DRILL["rubric"], PASTED).grade["total_score"] == 7
+    assert index.lookup("drill-1", DRILL["rubric"], REWORDED) is not None
+    assert index.lookup("drill-1", DRILL["rubric"], DIFFERENT) is None
+    assert index.lookup("drill-2", DRILL["rubric"], PASTED) is None
+
+    # Editing the rubric invalidates previously reused grades
+    edited = {**DRILL["rubric"], "expected_key_points": ["something new"]}
+    assert index.lookup("drill-1", edited, PASTED) is None
+
+    # Short answers are never matched
+    assert index.lookup("drill-1", DRILL["rubric"], "fork copies, exec replaces") is None
+
+
+def grade(service: GradingService, response: str) -> dict:
+    return asyncio.run(
+        service.grade_drill_response(
+            drill_id=DRILL["slug"],
+            prompt=DRILL["prompt_markdown"],
+            rubric=DRILL["rubric"],
+            user_response=response,
+            drill_type=DRILL["drill_type"],
+        )
+    )
+
+
+def test_grading_reuses_duplicate_grades():
+    """The second near-identical answer skips the model."""
+    provider = CountingProvider()
+    service = GradingService(
+        OpenAIClient(provider=provider, caller=ResilientCaller()),
+        duplicate_index=DuplicateIndex(audit_rate=0),
+    )
+
+    first = grade(service, TEXTBOOK)
+    second = grade(service, PASTED)
+
+    assert provider.grading_calls == 1
+    assert first["grader"] == "ai" and second["grader"] == "duplicate"
+    assert second["total_score"] == first["total_score"]
+    assert second["usage"] is None
+
+
+def test_audited_duplicates_measure_agreement():
+    """Sampled hits still call the model and record agreement."""
+    provider = CountingProvider()
+    service = GradingService(
+        OpenAIClient(provider=provider, caller=ResilientCaller()),
+        duplicate_index=DuplicateIndex(audit_rate=1.0, rng=random.Random(0)),
+    )
+    labels = {"drill_type": DRILL["drill_type"]}
+    audits_before = sum(
+        DUPLICATE_AUDITS.value(agreed=agreed, **labels) for agreed in ("true", "false")
+    )
+
+    grade(service, TEXTBOOK)
+    audited = grade(service, PASTED)
+
+    assert provider.grading_calls == 2
+    assert audited["grader"] == "ai"
+    audits_after = sum(
+        DUPLICATE_AUDITS.value(agreed=agreed, **labels) for agreed in ("true", "false")
+    )
+    assert audits_after == audits_before + 1
+
+
+if __name__ == "__main__":
+    test_matches_near_duplicates_only()
+    test_grading_reuses_duplicate_grades()
+    test_audited_duplicates_measure_agreement()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Test per-user fair scheduling of AI grading slots."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; the scheduler never talks to either service
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from app.services.grading_scheduler import (
+    IN_FLIGHT,
+    FairGradingScheduler,
+    GradingRejected,
+)
+
+
+async def run_jobs(scheduler: FairGradingScheduler, jobs: list[tuple[str, str]]) -> list[str]:
+    """Submit jobs in order while one slot is busy; return the service order."""
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("blocker"):
+            await gate.wait()
+
+    async def job(name: str, user_id: str, priority: str):
+        async with scheduler.slot(user_id, priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    blocking = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = []
+    for name, priority in jobs:
+        tasks.append(asyncio.create_task(job(name, name.rstrip("0123456789"), priority)))
+        await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(blocking, *tasks)
+    return order
+
+
+def test_users_are_interleaved_fairly():
+    """A user with a backlog doesn't block a user who arrives later."""
+    scheduler = FairGradingScheduler(max_concurrency=1, max_in_flight_per_user=10)
+    order = asyncio.run(
+        run_jobs(
+            scheduler,
+            [("a1", "interactive"), ("a2", "interactive"), ("a3", "interactive"),
+             ("b1", "interactive"), ("b2", "interactive")],
+        )
+    )
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_interactive_beats_batch():
+    """Queued interactive work is served before earlier batch work."""
+    scheduler = FairGradingScheduler(max_concurrency=1, max_in_flight_per_user=10)
+    order = asyncio.run(
+        run_jobs(scheduler, [("bulk1", "batch"), ("bulk2", "batch"), ("live1", "interactive")])
+    )
+    assert order == ["live1", "bulk1", "bulk2"]
+
+
+def test_rejects_over_limit_with_retry_after():
+    """Per-user and queue limits raise GradingRejected with a Retry-After hint."""
+
+    async def scenario():
+        scheduler = FairGradingScheduler(
+            max_concurrency=1, max_in_flight_per_user=1, max_queue_depth=1
+        )
+        gate = asyncio.Event()
+
+        async def hold(user_id: str):
+            async with scheduler.slot(user_id):
+                await gate.wait()
+
+        holding = [asyncio.create_task(hold("a")), asyncio.create_task(hold("b"))]
+        await asyncio.sleep(0)
+        assert scheduler.running == 1 and scheduler.queued == 1
+
+        for user_id, reason in (("a", "user_limit"), ("c", "queue_full")):
+            try:
+                await scheduler.acquire(user_id)
+                raise AssertionError("Expected rejection")
+            except GradingRejected as e:
+                assert e.reason == reason and e.retry_after >= 1
+
+        gate.set()
+        await asyncio.gather(*holding)
+        assert scheduler.running == 0 and scheduler.queued == 0
+
+    in_flight_before = IN_FLIGHT.value()
+    asyncio.run(scenario())
+    assert IN_FLIGHT.value() == in_flight_before
+
+
+def test_cancelled_waiters_free_their_place():
+    """A client that gives up while queued doesn't leak capacity."""
+
+    async def scenario():
+        scheduler = FairGradingScheduler(max_concurrency=1, max_in_flight_per_user=1)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("a"):
+                await gate.wait()
+
+        holding = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.queued == 0
+
+        # "b" is no longer counted against its limit
+        gate.set()
+        await holding
+        await scheduler.acquire("b")
+        scheduler.release("b")
+        assert scheduler.running == 0
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_users_are_interleaved_fairly()
+    test_interactive_beats_batch()
+    test_rejects_over_limit_with_retry_after()
+    test_cancelled_waiters_free_their_place()
+    print("✅ ALL TESTS PASSED")
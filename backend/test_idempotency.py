@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test Idempotency-Key handling for retried submissions."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; the store never talks to either service
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from app.services.idempotency import (
+    IdempotencyKeyConflict,
+    IdempotencyStore,
+    request_fingerprint,
+)
+
+BODY = request_fingerprint("drill-1", "fork copies the process")
+
+
+class CountingGrader:
+    """Stands in for grading + recording; counts how often it really runs."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return {"attempt_id": f"attempt-{self.calls}"}
+
+
+def test_replay_and_concurrent_duplicates_run_once():
+    """Retries, in flight or after the fact, share the original result."""
+
+    async def scenario():
+        store = IdempotencyStore()
+        grader = CountingGrader()
+
+        first, joined = await asyncio.gather(
+            store.run("u1:key-1", BODY, grader), store.run("u1:key-1", BODY, grader)
+        )
+        replay = await store.run("u1:key-1", BODY, grader)
+
+        assert grader.calls == 1
+        assert first == ({"attempt_id": "attempt-1"}, False)
+        assert joined == ({"attempt_id": "attempt-1"}, True)
+        assert replay == ({"attempt_id": "attempt-1"}, True)
+
+        # Keys are independent
+        await store.run("u1:key-2", BODY, grader)
+        assert grader.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_reused_key_with_different_body_is_rejected():
+    """A key can't be replayed against another request."""
+
+    async def scenario():
+        store = IdempotencyStore()
+        await store.run("u1:key-1", BODY, CountingGrader())
+        try:
+            await store.run("u1:key-1", request_fingerprint("drill-1", "other"), CountingGrader())
+            raise AssertionError("Expected conflict")
+        except IdempotencyKeyConflict:
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_failures_are_not_remembered():
+    """After a failed attempt the client's retry runs again."""
+
+    async def scenario():
+        store = IdempotencyStore()
+        failing = CountingGrader(fail=True)
+        for _ in range(2):
+            try:
+                await store.run("u1:key-1", BODY, failing)
+                raise AssertionError("Expected failure")
+            except RuntimeError:
+                pass
+        assert failing.calls == 2
+
+        result, replayed = await store.run("u1:key-1", BODY, CountingGrader())
+        assert not replayed and result == {"attempt_id": "attempt-1"}
+
+    asyncio.run(scenario())
+
+
+def test_expired_keys_run_again():
+    """Results are only kept for the TTL."""
+
+    async def scenario():
+        store = IdempotencyStore(ttl_seconds=0)
+        grader = CountingGrader()
+        await store.run("u1:key-1", BODY, grader)
+        _, replayed = await store.run("u1:key-1", BODY, grader)
+        assert not replayed and grader.calls == 2
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_replay_and_concurrent_duplicates_run_once()
+    test_reused_key_with_different_body_is_rejected()
+    test_failures_are_not_remembered()
+    test_expired_keys_run_again()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test keyset pagination of unit drills and attempt history."""
+
+import asyncio
+import os
+import re
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; all data comes from fakes below
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+import msgpack
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_user_id
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.supabase import get_supabase_client
+from app.main import app
+from app.services import content_snapshot
+from app.services.content_snapshot import ContentStore
+from test_content_snapshot import FakeContentDB
+
+ATTEMPTS = [
+    {
+        "id": str(uuid.UUID(int=i)),
+        "user_id": "user-1",
+        "drill_id": "d1",
+        "user_response": f"answer {i}",
+        "ai_feedback": {},
+        "score": 5,
+        "max_score": 10,
+        # Pairs share a timestamp so the id tie-break matters
+        "created_at": f"2026-01-01T00:00:{i // 2:02d}+00:00",
+    }
+    for i in range(7)
+]
+
+
+class FakeAttemptsQuery:
+    """Applies the filters the attempts endpoint sends to an in-memory table."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.columns = None
+        self.limit_rows = None
+
+    def select(self, columns):
+        self.columns = columns.split(",")
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def or_(self, condition):
+        created_at, attempt_id = re.search(r'lt\."([^"]+)".*id\.lt\.([^)]+)', condition).groups()
+        self.rows = [r for r in self.rows if (r["created_at"], r["id"]) < (created_at, attempt_id)]
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def limit(self, n):
+        self.limit_rows = n
+        return self
+
+    def execute(self):
+        rows = sorted(self.rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        rows = [{c: r[c] for c in self.columns} for r in rows[: self.limit_rows]]
+        return type("R", (), {"data": rows})
+
+
+class FakeDB:
+    def table(self, name):
+        assert name == "drill_attempts"
+        return FakeAttemptsQuery(ATTEMPTS)
+
+
+def walk(client: TestClient, url: str) -> list[list[str]]:
+    """Follow X-Next-Cursor to the end, returning the ids on each page."""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params, headers={"Authorization": "Bearer t"})
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    """Cursors are opaque but reversible; tampered ones are a 400."""
+    cursor = encode_cursor("2026-01-01T00:00:00+00:00", "abc")
+    assert decode_cursor(cursor, 2) == ["2026-01-01T00:00:00+00:00", "abc"]
+    for bad in ("not-base64!", encode_cursor("only-one"), encode_cursor("a", "b")[:-2]):
+        try:
+            decode_cursor(bad, 2)
+            raise AssertionError(f"Expected 400 for {bad!r}")
+        except HTTPException as e:
+            assert e.status_code == 400
+
+
+def test_attempt_history_pages_newest_first():
+    """Every attempt appears once, newest first, across timestamp ties."""
+    app.dependency_overrides[get_supabase_client] = FakeDB
+    app.dependency_overrides[get_current_user_id] = lambda: "user-1"
+    try:
+        client = TestClient(app)
+        pages = walk(client, "/drills/attempts")
+        expected = [a["id"] for a in sorted(ATTEMPTS, key=lambda a: (a["created_at"], a["id"]), reverse=True)]
+        assert [len(p) for p in pages] == [3, 3, 1]
+        assert sum(pages, []) == expected
+
+        bad = client.get("/drills/attempts", params={"cursor": encode_cursor("yesterday", "x")})
+        assert bad.status_code == 400
+
+        # Default projection leaves out the response text and feedback
+        first = client.get("/drills/attempts").json()[0]
+        assert set(first) == {"id", "created_at", "drill_id", "score", "max_score"}
+        trimmed = client.get("/drills/attempts", params={"fields": "score"}).json()[0]
+        assert set(trimmed) == {"id", "created_at", "score"}
+
+        packed = client.get("/drills/attempts", headers={"Accept": "application/msgpack"})
+        assert msgpack.unpackb(packed.content) == client.get("/drills/attempts").json()
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_unit_drills_page_by_slug():
+    """Snapshot-served drill lists page in slug order."""
+    db = FakeContentDB()
+    for i in range(5):
+        db.tables["drills"].append(FakeContentDB._drill(f"d{i + 4}", "u0", f"quiz-{i}"))
+    store = ContentStore(lambda: db, check_interval_seconds=3600)
+    snapshot = asyncio.run(store.load())
+
+    previous, content_snapshot._store = content_snapshot._store, store
+    try:
+        pages = walk(TestClient(app), "/units/u0/drills")
+        assert [len(p) for p in pages] == [3, 3, 1]
+        assert sum(pages, []) == [d["id"] for d in snapshot.drills_by_unit["u0"]]
+    finally:
+        content_snapshot._store = previous
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip_and_rejects_garbage()
+    test_attempt_history_pages_newest_first()
+    test_unit_drills_page_by_slug()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test the local pre-grader against a real drill rubric."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; the pre-grader never talks to either service
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from app.services.pregrader import PreGrader
+
+CONTENT_DIR = Path(__file__).parent.parent / "content" / "systems-foundations"
+RUBRIC = json.loads(
+    (CONTENT_DIR / "drills" / "unit-00" / "explain-fork-exec.json").read_text()
+)["rubric"]
+
+
+def test_short_circuits_failing_answers():
+    """Empty, low-effort, gibberish and off-topic answers skip the AI."""
+    pregrader = PreGrader()
+
+    cases = [
+        ("... ??? !!!", "empty"),
+        ("I don't know lol", "low_effort"),
+        ("asdfghjkl qwrtzxcv bbbbbbbb mnbvcxz", "gibberish"),
+        ("process process process process process", "gibberish"),
+        (
+            "My favourite recipe uses tomatoes, basil, garlic and olive oil "
+            "simmered slowly for an hour.",
+            "off_topic",
+        ),
+    ]
+
+    for response, expected_reason in cases:
+        result = pregrader.evaluate(RUBRIC, response)
+        assert result.short_circuit, f"{response!r} should short-circuit"
+        assert result.reason == expected_reason, (response, result.reason)
+
+
+def test_lets_real_answers_through():
+    """Genuine attempts, even weak ones, still go to the AI grader."""
+    pregrader = PreGrader()
+
+    responses = [
+        "fork creates a child process that is a copy of the parent, and exec "
+        "replaces the current program with a new one. Keeping them separate "
+        "lets the shell set up pipes and redirection in between.",
+        "idk, I think fork makes a new process?",
+        "exec loads a new program",
+    ]
+
+    for response in responses:
+        result = pregrader.evaluate(RUBRIC, response)
+        assert not result.short_circuit, (response, result)
+
+
+def test_no_verdict_without_a_reference():
+    """A rubric without key points or an outline never short-circuits."""
+    pregrader = PreGrader()
+    rubric = {**RUBRIC, "expected_key_points": [], "model_answer_outline": []}
+
+    for response in ("... ??? !!!", "My favourite recipe uses tomatoes and basil."):
+        result = pregrader.evaluate(rubric, response)
+        assert not result.short_circuit and result.reason is None, (response, result)
+        assert result.signals.reference_terms == 0
+
+
+def test_templated_feedback_shape():
+    """Short-circuit feedback matches the AI grader's result shape."""
+    pregrader = PreGrader()
+    result = pregrader.evaluate(RUBRIC, "I don't know lol")
+    feedback = pregrader.build_feedback(RUBRIC, result)
+
+    assert feedback["total_score"] == 0
+    assert feedback["max_score"] == sum(c["max_score"] for c in RUBRIC["criteria"])
+    assert set(feedback["criterion_scores"]) == {c["name"] for c in RUBRIC["criteria"]}
+    assert feedback["feedback"]
+    assert feedback["follow_up_question"] is None
+
+
+if __name__ == "__main__":
+    test_short_circuits_failing_answers()
+    test_lets_real_answers_through()
+    test_no_verdict_without_a_reference()
+    test_templated_feedback_shape()
+    print("✅ ALL TESTS PASSED")
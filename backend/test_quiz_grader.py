@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test deterministic local grading of quiz drills."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; quiz grading never talks to either service
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from app.schemas.content import DrillContent
+from app.services.grading import GradingService
+from app.services.quiz_grader import grade_quiz_response, is_correct
+
+CONTENT_DIR = Path(__file__).parent.parent / "content" / "systems-foundations"
+QUIZ = DrillContent(
+    **json.loads(
+        (CONTENT_DIR / "drills" / "unit-00" / "quiz-fork-return-value.json").read_text()
+    )
+)
+RUBRIC = QUIZ.rubric.model_dump(mode="json", exclude_none=True)
+
+
+def test_choice_matching():
+    """Choice keys are matched leniently; wrong picks score zero."""
+    for response in ["c", "C", "(c)", "c)", "Option C", " answer c ", "0"]:
+        result = grade_quiz_response(RUBRIC, response)
+        assert result["total_score"] == result["max_score"] == 1, response
+
+    for response in ["a", "b, c", "zero-ish", "The PID of the parent process"]:
+        result = grade_quiz_response(RUBRIC, response)
+        assert result["total_score"] == 0, response
+        assert "C (0)" in result["feedback"]
+
+
+def test_exact_and_normalized_matching():
+    """Exact mode is strict; normalized mode ignores case and punctuation."""
+    exact = {"match_mode": "exact", "accepted_answers": ["SIGCHLD"]}
+    assert is_correct(exact, " SIGCHLD ")
+    assert not is_correct(exact, "sigchld")
+
+    normalized = {"match_mode": "normalized", "accepted_answers": ["copy-on-write"]}
+    assert is_correct(normalized, "Copy on Write.")
+    assert not is_correct(normalized, "copy on read")
+
+
+def test_quiz_requires_answer_key():
+    """Quiz content without an answer key fails validation."""
+    data = QUIZ.model_dump(mode="json")
+    data["rubric"].pop("answer_key")
+    try:
+        DrillContent(**data)
+    except ValueError:
+        return
+    raise AssertionError("Quiz without answer_key should not validate")
+
+
+def test_grading_service_skips_ai():
+    """Quiz drills are graded in-process without touching the AI client."""
+    service = GradingService(openai_client=None)
+
+    feedback = asyncio.run(
+        service.grade_drill_response(
+            drill_id="quiz",
+            prompt=QUIZ.prompt_markdown,
+            rubric=RUBRIC,
+            user_response="c",
+            drill_type="quiz",
+        )
+    )
+    assert feedback["grader"] == "quiz"
+    assert feedback["total_score"] == 1
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        grade_quiz_response(RUBRIC, "Option C")
+    per_call_us = (time.perf_counter() - start) * 1000
+    print(f"Quiz grading: {per_call_us:.1f}µs per call")
+
+
+if __name__ == "__main__":
+    test_choice_matching()
+    test_exact_and_normalized_matching()
+    test_quiz_requires_answer_key()
+    test_grading_service_skips_ai()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Test the offline re-grading CLI: rate limiting, keyset paging and checkpoint/resume."""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; all data comes from fakes below
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from scripts.regrade_attempts import (
+    TokenBucket,
+    fetch_attempt_page,
+    load_checkpoint,
+    run_regrade,
+    save_checkpoint,
+)
+
+DRILL = {
+    "id": "d1",
+    "slug": "explain-fork-exec",
+    "drill_type": "explain",
+    "prompt_markdown": "Explain.",
+    "rubric": {"criteria": [], "expected_key_points": []},
+    "estimated_minutes": 5,
+    "updated_at": "2026-10-01T00:00:00+00:00",
+}
+
+ATTEMPTS = [
+    {
+        "id": f"a{i}",
+        "user_id": "user-1",
+        "drill_id": "d1",
+        "user_response": f"answer {i}",
+        # Pairs share a timestamp so the id tie-break matters; PostgREST
+        # timestamps carry '.', ':' and '+'
+        "created_at": f"2026-01-01T00:00:0{i // 2}.5+00:00",
+    }
+    for i in range(7)
+]
+
+# The quoted keyset filter keyset_after() builds
+KEYSET = re.compile(r'^(\w+)\.gt\."([^"]+)",and\(\1\.eq\."\2",id\.gt\.([^)]+)\)$')
+
+
+class FakeQuery:
+    """Applies the filters the script sends to an in-memory table."""
+
+    def __init__(self, db: "FakeRegradeDB", name: str):
+        self.db, self.name = db, name
+        self.rows = list(db.tables.get(name, ()))
+        self.limit_rows = None
+
+    def select(self, *_):
+        return self
+
+    def in_(self, column, values):
+        self.rows = [r for r in self.rows if r[column] in values]
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def or_(self, condition):
+        match = KEYSET.match(condition)
+        assert match, f"unparseable keyset filter: {condition}"
+        column, value, row_id = match.groups()
+        self.rows = [r for r in self.rows if (r[column], r["id"]) > (value, row_id)]
+        return self
+
+    def order(self, *_):
+        return self
+
+    def limit(self, n):
+        self.limit_rows = n
+        return self
+
+    def upsert(self, rows, on_conflict):
+        assert on_conflict == "attempt_id,rubric_version"
+        for row in rows:
+            self.db.regrades[(row["attempt_id"], row["rubric_version"])] = row
+        self.db.writes += 1
+        return self
+
+    def execute(self):
+        rows = sorted(self.rows, key=lambda r: (r["created_at"], r["id"]))
+        return type("R", (), {"data": rows[: self.limit_rows]})
+
+
+class FakeRegradeDB:
+    """drill_attempts to read and drill_attempt_regrades keyed like the upsert."""
+
+    def __init__(self):
+        self.tables = {"drill_attempts": ATTEMPTS}
+        self.regrades: dict[tuple[str, str], dict] = {}
+        self.writes = 0
+
+    def table(self, name: str):
+        return FakeQuery(self, name)
+
+
+class StubGradingService:
+    """Grades every attempt 7/10; attempts in `fail_once` fail on their first try."""
+
+    def __init__(self, fail_once: set[str] = frozenset()):
+        self.fail_once = set(fail_once)
+
+    async def grade_drill_response(self, user_response: str, **_):
+        attempt_id = "a" + user_response.split()[-1]
+        if attempt_id in self.fail_once:
+            self.fail_once.discard(attempt_id)
+            raise RuntimeError("provider unavailable")
+        return {"total_score": 7, "max_score": 10}
+
+
+def test_token_bucket_allows_a_burst_then_limits_the_rate():
+    """`burst` acquisitions go through at once; the rest wait for refills."""
+
+    async def scenario():
+        bucket = TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        burst = time.monotonic() - start
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(scenario())
+    assert burst < 0.02, burst
+    # 5 more tokens at 50/s take at least 0.1s
+    assert total >= 0.09, total
+
+
+def test_keyset_pages_cover_every_attempt_once():
+    """Paging by (created_at, id) visits each attempt once, ties included."""
+    db = FakeRegradeDB()
+    seen, position = [], None
+    while page := fetch_attempt_page(db, ["d1"], position, page_size=3):
+        seen += [a["id"] for a in page]
+        position = (page[-1]["created_at"], page[-1]["id"])
+    assert seen == [a["id"] for a in ATTEMPTS]
+
+
+def test_checkpoint_round_trip():
+    """Checkpoints are only reused by the run that wrote them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "checkpoint.json"
+        assert load_checkpoint(path, "d1@v1") is None
+
+        save_checkpoint(path, "d1@v1", ("2026-01-01T00:00:00.5+00:00", "a1"))
+        assert load_checkpoint(path, "d1@v1") == ("2026-01-01T00:00:00.5+00:00", "a1")
+        assert load_checkpoint(path, "d1@v2") is None
+
+
+def test_resume_continues_after_the_last_complete_page():
+    """A failed page stops the run before checkpointing; --resume finishes it."""
+    db = FakeRegradeDB()
+    grading = StubGradingService(fail_once={"a3"})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args = argparse.Namespace(
+            checkpoint=Path(tmp) / "checkpoint.json",
+            resume=False,
+            dry_run=False,
+            page_size=2,
+            batch_size=10,
+            concurrency=2,
+            rate=1000.0,
+        )
+        first = asyncio.run(run_regrade(db, {"d1": DRILL}, grading, args))
+        assert first.failed == 1 and first.attempts_seen == 4
+        # The checkpoint stops after the first page; a3's page gets re-graded
+        assert load_checkpoint(args.checkpoint, f"d1@{DRILL['updated_at']}")[1] == "a1"
+
+        args.resume = True
+        second = asyncio.run(run_regrade(db, {"d1": DRILL}, grading, args))
+        assert second.failed == 0 and second.attempts_seen == 5
+
+    assert sorted(attempt_id for attempt_id, _ in db.regrades) == [a["id"] for a in ATTEMPTS]
+    assert all(row["score"] == 7 for row in db.regrades.values())
+
+
+if __name__ == "__main__":
+    test_token_bucket_allows_a_burst_then_limits_the_rate()
+    test_keyset_pages_cover_every_attempt_once()
+    test_checkpoint_round_trip()
+    test_resume_continues_after_the_last_complete_page()
+    print("✅ ALL TESTS PASSED")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test AI call resilience against a fake provider with injected faults."""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; no real provider is contacted
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from app.services.resilience import (
+    AIProviderError,
+    AIProviderTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryPolicy,
+)
+
+
+class FakeProvider:
+    """Scripted provider: each call pops (latency_seconds, fail) from a plan."""
+
+    def __init__(self, plan: list[tuple[float, bool]], default=(0.0, False)):
+        self.plan = list(plan)
+        self.default = default
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        latency, fail = self.plan.pop(0) if self.plan else self.default
+        self.calls += 1
+        await asyncio.sleep(latency)
+        if fail:
+            raise RuntimeError("injected provider fault")
+        return {"total_score": 1, "call": self.calls}
+
+
+async def no_sleep(_: float) -> None:
+    return None
+
+
+def fast_policy(**overrides) -> RetryPolicy:
+    options = {
+        "max_attempts": 3,
+        "base_delay": 0.01,
+        "max_delay": 0.01,
+        "attempt_timeout": 0.2,
+        "total_deadline": 2.0,
+    }
+    options.update(overrides)
+    return RetryPolicy(**options)
+
+
+def test_retries_then_succeeds():
+    """Transient faults are retried within the attempt budget."""
+    provider = FakeProvider([(0, True), (0, True)])
+    caller = ResilientCaller(policy=fast_policy(), sleep=no_sleep)
+
+    result = asyncio.run(caller.call(provider))
+    assert result["call"] == 3
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_deadline_bounds_stuck_calls():
+    """A hung provider call is cut off at the per-attempt deadline."""
+    provider = FakeProvider([], default=(5.0, False))
+    caller = ResilientCaller(policy=fast_policy(max_attempts=2, attempt_timeout=0.05), sleep=no_sleep)
+
+    start = time.monotonic()
+    try:
+        asyncio.run(caller.call(provider))
+        raise AssertionError("Expected timeout")
+    except AIProviderTimeout:
+        pass
+    assert time.monotonic() - start < 1.0
+    assert provider.calls == 2
+
+
+def test_circuit_breaker_fails_fast():
+    """After repeated failures the breaker opens and skips the provider."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30, clock=lambda: now[0])
+    provider = FakeProvider([], default=(0, True))
+    caller = ResilientCaller(policy=fast_policy(), breaker=breaker, sleep=no_sleep)
+
+    try:
+        asyncio.run(caller.call(provider))
+    except AIProviderError:
+        pass
+    assert breaker.state == CircuitBreaker.OPEN
+    calls_before = provider.calls
+
+    try:
+        asyncio.run(caller.call(provider))
+        raise AssertionError("Expected open circuit")
+    except CircuitOpenError as e:
+        assert e.retry_after == 30
+    assert provider.calls == calls_before
+
+    # After the recovery window a single trial call closes the circuit again
+    now[0] = 31
+    provider.default = (0, False)
+    asyncio.run(caller.call(provider))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_hedged_request_beats_slow_primary():
+    """A duplicate call fired after p95 latency wins over a slow primary."""
+    provider = FakeProvider([(1.0, False)], default=(0.01, False))
+    caller = ResilientCaller(
+        policy=fast_policy(attempt_timeout=2.0),
+        hedge_enabled=True,
+        hedge_min_samples=5,
+        sleep=no_sleep,
+    )
+    for _ in range(5):
+        caller.latency.record(0.02)
+
+    start = time.monotonic()
+    result = asyncio.run(caller.call(provider))
+    assert time.monotonic() - start < 0.5
+    assert result["call"] == 2
+
+
+if __name__ == "__main__":
+    test_retries_then_succeeds()
+    test_deadline_bounds_stuck_calls()
+    test_circuit_breaker_fails_fast()
+    test_hedged_request_beats_slow_primary()
+    print("✅ ALL TESTS PASSED")
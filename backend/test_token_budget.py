@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test grading token budgets for responses and outputs."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Settings require these; no real provider is contacted
+os.environ.setdefault("SUPABASE_URL", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+from app.core.config import settings
+from app.services.ai_providers import StubProvider
+from app.services.openai_client import OpenAIClient
+from app.services.resilience import ResilientCaller
+from app.services.token_budget import (
+    TRUNCATION_MARKER,
+    ResponseTooLongError,
+    apply_response_budget,
+    estimate_tokens,
+    response_token_budget,
+)
+
+RUBRIC = {
+    "criteria": [{"name": "accuracy", "description": "Is it right", "max_score": 3}],
+    "expected_key_points": ["fork copies the parent"],
+}
+
+
+def test_budget_scales_with_estimated_minutes():
+    """Longer drills allow longer answers, up to a hard ceiling."""
+    assert response_token_budget(2) < response_token_budget(10)
+    assert response_token_budget(60) == settings.grading_response_max_tokens
+
+
+def test_truncate_policy_fits_budget():
+    """Over-budget responses are cut on a word boundary."""
+    response = "fork copies the parent process " * 400
+    budget = response_token_budget(1)
+
+    fitted, truncated = apply_response_budget(response, budget)
+    assert truncated
+    assert fitted.endswith(TRUNCATION_MARKER)
+    assert estimate_tokens(fitted) <= budget
+
+    unchanged, truncated = apply_response_budget("short answer", budget)
+    assert unchanged == "short answer" and not truncated
+
+
+def test_reject_policy_raises():
+    """The reject policy refuses over-budget responses before any AI call."""
+    original = settings.grading_response_overflow
+    settings.grading_response_overflow = "reject"
+    try:
+        client = OpenAIClient(provider=StubProvider(latency_ms=0), caller=ResilientCaller())
+        asyncio.run(
+            client.grade_response(
+                prompt="Explain fork",
+                rubric=RUBRIC,
+                user_response="word " * 5000,
+                drill_type="explain",
+                estimated_minutes=1,
+            )
+        )
+        raise AssertionError("Expected ResponseTooLongError")
+    except ResponseTooLongError as e:
+        assert e.budget == response_token_budget(1)
+    finally:
+        settings.grading_response_overflow = original
+
+
+def test_usage_reports_budget():
+    """Grading usage records the output cap and truncation."""
+    client = OpenAIClient(provider=StubProvider(latency_ms=0), caller=ResilientCaller())
+    result = asyncio.run(
+        client.grade_response(
+            prompt="Explain fork",
+            rubric=RUBRIC,
+            user_response="word " * 5000,
+            drill_type="debug",
+            estimated_minutes=1,
+        )
+    )
+    assert result["usage"]["response_truncated"]
+    assert result["usage"]["max_output_tokens"] == settings.grading_max_output_tokens["debug"]
+
+
+if __name__ == "__main__":
+    test_budget_scales_with_estimated_minutes()
+    test_truncate_policy_fits_budget()
+    test_reject_policy_raises()
+    test_usage_reports_budget()
+    print("✅ ALL TESTS PASSED")
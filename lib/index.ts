@@ -4,4 +4,5 @@
  * Responsibility: Re-exports all utility modules for clean imports.
  */
 
+export * from "./msgpack";
 export * from "./utils";
@@ -0,0 +1,168 @@
+/**
+ * MessagePack Decoder
+ *
+ * Responsibility: Decodes MessagePack API responses into plain objects.
+ * Covers every type the backend emits (nil, booleans, integers,
+ * floats, strings, binary, arrays and maps); extension types are rejected.
+ */
+
+/**
+ * Decodes one MessagePack document
+ */
+export function decodeMsgpack(buffer: ArrayBuffer): unknown {
+  const reader = new Reader(buffer);
+  const value = reader.read();
+  if (reader.offset !== buffer.byteLength) {
+    throw new Error("MessagePack: trailing bytes after document");
+  }
+  return value;
+}
+
+class Reader {
+  offset = 0;
+  private view: DataView;
+  private bytes: Uint8Array;
+
+  constructor(buffer: ArrayBuffer) {
+    this.view = new DataView(buffer);
+    this.bytes = new Uint8Array(buffer);
+  }
+
+  read(): unknown {
+    const type = this.uint8();
+
+    if (type <= 0x7f) return type; // positive fixint
+    if (type >= 0xe0) return type - 0x100; // negative fixint
+    if (type >= 0xa0 && type <= 0xbf) return this.str(type & 0x1f);
+    if (type >= 0x90 && type <= 0x9f) return this.array(type & 0x0f);
+    if (type >= 0x80 && type <= 0x8f) return this.map(type & 0x0f);
+
+    switch (type) {
+      case 0xc0:
+        return null;
+      case 0xc2:
+        return false;
+      case 0xc3:
+        return true;
+      case 0xc4:
+        return this.bin(this.uint8());
+      case 0xc5:
+        return this.bin(this.uint16());
+      case 0xc6:
+        return this.bin(this.uint32());
+      case 0xca:
+        return this.advance(4, (o) => this.view.getFloat32(o));
+      case 0xcb:
+        return this.advance(8, (o) => this.view.getFloat64(o));
+      case 0xcc:
+        return this.uint8();
+      case 0xcd:
+        return this.uint16();
+      case 0xce:
+        return this.uint32();
+      case 0xcf:
+        return this.advance(8, (o) => Number(this.view.getBigUint64(o)));
+      case 0xd0:
+        return this.advance(1, (o) => this.view.getInt8(o));
+      case 0xd1:
+        return this.advance(2, (o) => this.view.getInt16(o));
+      case 0xd2:
+        return this.advance(4, (o) => this.view.getInt32(o));
+      case 0xd3:
+        return this.advance(8, (o) => Number(this.view.getBigInt64(o)));
+      case 0xd9:
+        return this.str(this.uint8());
+      case 0xda:
+        return this.str(this.uint16());
+      case 0xdb:
+        return this.str(this.uint32());
+      case 0xdc:
+        return this.array(this.uint16());
+      case 0xdd:
+        return this.array(this.uint32());
+      case 0xde:
+        return this.map(this.uint16());
+      case 0xdf:
+        return this.map(this.uint32());
+      default:
+        throw new Error(`MessagePack: unsupported type 0x${type.toString(16)}`);
+    }
+  }
+
+  private advance<T>(size: number, get: (offset: number) => T): T {
+    if (this.offset + size > this.bytes.length) {
+      throw new Error("MessagePack: unexpected end of data");
+    }
+    const value = get(this.offset);
+    this.offset += size;
+    return value;
+  }
+
+  private uint8(): number {
+    return this.advance(1, (o) => this.view.getUint8(o));
+  }
+
+  private uint16(): number {
+    return this.advance(2, (o) => this.view.getUint16(o));
+  }
+
+  private uint32(): number {
+    return this.advance(4, (o) => this.view.getUint32(o));
+  }
+
+  private bin(length: number): Uint8Array {
+    return this.advance(length, (o) => this.bytes.slice(o, o + length));
+  }
+
+  private array(length: number): unknown[] {
+    const items = new Array(length);
+    for (let i = 0; i < length; i++) items[i] = this.read();
+    return items;
+  }
+
+  private map(length: number): Record<string, unknown> {
+    const object: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = this.read();
+      object[String(key)] = this.read();
+    }
+    return object;
+  }
+
+  private str(length: number): string {
+    return this.advance(length, (o) => utf8(this.bytes, o, o + length));
+  }
+}
+
+/**
+ * UTF-8 to string without TextDecoder, which Hermes lacks
+ */
+function utf8(bytes: Uint8Array, start: number, end: number): string {
+  const units: number[] = [];
+  let out = "";
+  let i = start;
+  while (i < end) {
+    const byte = bytes[i++];
+    if (byte < 0x80) {
+      units.push(byte);
+    } else if (byte < 0xe0) {
+      units.push(((byte & 0x1f) << 6) | (bytes[i++] & 0x3f));
+    } else if (byte < 0xf0) {
+      units.push(((byte & 0x0f) << 12) | ((bytes[i++] & 0x3f) << 6) | (bytes[i++] & 0x3f));
+    } else {
+      const codePoint =
+        (((byte & 0x07) << 18) |
+          ((bytes[i++] & 0x3f) << 12) |
+          ((bytes[i++] & 0x3f) << 6) |
+          (bytes[i++] & 0x3f)) -
+        0x10000;
+      units.push(0xd800 + (codePoint >> 10), 0xdc00 + (codePoint & 0x3ff));
+    }
+    // Flush in chunks to stay under engine argument limits
+    if (units.length >= 4096) {
+      out += String.fromCharCode(...units);
+      units.length = 0;
+    }
+  }
+  return out + String.fromCharCode(...units);
+}
@@ -9,8 +9,27 @@
  * TODO: Add error handling and retry logic
  */
 
+import { decodeMsgpack } from "@/lib/msgpack";
+
 const API_URL = process.env.EXPO_PUBLIC_API_URL || "http://localhost:8000";
 
+/**
+ * Content and queue endpoints can answer in MessagePack, which is about
+ * 15% smaller than JSON for the large browse payloads, and responses are
+ * decoded by Content-Type either way. JSON stays the default: under Node
+ * the JS decoder took about twice as long as JSON.parse, and decode time
+ * on Hermes hasn't been measured yet. Switch to
+ * "application/msgpack, application/json;q=0.9" only once it has, and
+ * only if it's faster.
+ */
+const ACCEPT = "application/json";
+
+/**
+ * Last body and ETag per GET URL. Content endpoints answer a matching
+ * If-None-Match with an empty 304, so remounting a screen reuses the body.
+ */
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
 /**
  * Base fetch wrapper with common configuration
  */
@@ -20,9 +39,14 @@ async function request<T>(
 ): Promise<T> {
   const url = `${API_URL}${endpoint}`;
 
+  const isGet = (options.method ?? "GET").toUpperCase() === "GET";
+  const cached = isGet ? etagCache.get(url) : undefined;
+
   // TODO: Get auth token from session and inject into headers
   const headers: HeadersInit = {
     "Content-Type": "application/json",
+    Accept: ACCEPT,
+    ...(cached ? { "If-None-Match": cached.etag } : {}),
     ...options.headers,
   };
 
@@ -31,12 +55,24 @@ async function request<T>(
     headers,
   });
 
+  if (response.status === 304 && cached) {
+    return cached.body as T;
+  }
+
   if (!response.ok) {
     // TODO: Implement proper error handling
     throw new Error(`API Error: ${response.status}`);
   }
 
-  return response.json();
+  const contentType = response.headers.get("Content-Type") ?? "";
+  const body = contentType.startsWith("application/msgpack")
+    ? decodeMsgpack(await response.arrayBuffer())
+    : await response.json();
+  const etag = response.headers.get("ETag");
+  if (isGet && etag) {
+    etagCache.set(url, { etag, body });
+  }
+  return body as T;
 }
 
 /**